@@ -0,0 +1,14 @@
+# benchmarks/__init__.py
+"""
+Search benchmark suite.
+
+corpus    - fills a local Postgres with a deterministic synthetic corpus
+workload  - the fixed mix of keyword, vector, hybrid, facet and filter queries
+runner    - drives SearchService.search and the search view at each corpus size
+report    - latency percentiles and throughput, written as JSON
+
+Point BENCHMARK_DATABASE_URL at a scratch database with the migrations
+applied, then:
+
+    python -m benchmarks.runner --sizes 10000,100000,1000000 --output results.json
+"""
@@ -0,0 +1,352 @@
+# benchmarks/corpus.py
+"""
+Deterministic synthetic corpus for search benchmarks.
+
+Document i is generated from (seed, i) alone, so a 100k corpus is the 10k
+corpus plus 90k more documents and growing the corpus between runs never
+rewrites what is already there. Benchmark documents are named
+bench-NNNNNNN.pdf and can be removed with --reset.
+"""
+
+import argparse
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import func, text
+
+from src.catalog import db
+from src.catalog.constants import DOCUMENT_STATUSES
+from src.catalog.models import (
+    CommunicationFocus, DesignElement, Document, Entity, ExtractedText,
+    KeywordSynonym, KeywordTaxonomy, LLMAnalysis, LLMKeyword
+)
+
+logger = logging.getLogger(__name__)
+
+FILENAME_PREFIX = 'bench-'
+EMBEDDING_DIMENSIONS = 1536
+BATCH_SIZE = 2000
+
+# Synthetic taxonomy: primary category -> subcategory -> terms
+TAXONOMY = {
+    'Policy Issues': {
+        'Economy': ['taxes', 'jobs', 'inflation', 'minimum wage', 'small business', 'trade'],
+        'Healthcare': ['medicare', 'prescription drugs', 'insurance', 'hospitals', 'mental health'],
+        'Education': ['public schools', 'teachers', 'student debt', 'school choice', 'universities'],
+        'Public Safety': ['police', 'crime', 'gun safety', 'first responders', 'border security'],
+        'Environment': ['climate', 'clean energy', 'water quality', 'conservation', 'pollution'],
+    },
+    'Candidate Messaging': {
+        'Biography': ['veteran', 'small business owner', 'working family', 'local roots'],
+        'Endorsements': ['sheriff endorsement', 'union endorsement', 'newspaper endorsement'],
+        'Record': ['voting record', 'legislation passed', 'town hall', 'constituent services'],
+    },
+    'Opposition Research': {
+        'Contrast': ['career politician', 'special interests', 'broken promises', 'attendance'],
+        'Funding': ['lobbyist money', 'dark money', 'out of state donors'],
+    },
+    'Voter Engagement': {
+        'Turnout': ['early voting', 'absentee ballot', 'polling place', 'voter registration'],
+        'Outreach': ['seniors', 'young voters', 'suburban families', 'rural communities'],
+    },
+}
+
+SYNONYMS = {
+    'taxes': ['tax cuts', 'taxation'],
+    'jobs': ['employment', 'workforce'],
+    'medicare': ['senior healthcare'],
+    'climate': ['climate change', 'global warming'],
+    'police': ['law enforcement'],
+    'early voting': ['vote early'],
+    'dark money': ['undisclosed donors'],
+}
+
+CAMPAIGN_TYPES = ['primary', 'general', 'special', 'runoff', 'ballot measure']
+TONES = ['positive', 'negative', 'contrast', 'informational']
+LOCATIONS = ['Ohio', 'Pennsylvania', 'Michigan', 'Arizona', 'Georgia', 'Wisconsin',
+             'Nevada', 'North Carolina', 'Texas', 'Florida', 'Virginia', 'Colorado']
+AUDIENCES = ['seniors', 'young voters', 'suburban women', 'union households',
+             'rural voters', 'independents', 'veterans']
+FIRST_NAMES = ['Alex', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery']
+LAST_NAMES = ['Smith', 'Garcia', 'Johnson', 'Lee', 'Brown', 'Martinez', 'Davis', 'Clark']
+MESSAGE_TEMPLATES = [
+    "{name} will fight for {a} and {b}",
+    "Tell {opponent} to stop ignoring {a}",
+    "{name} has a plan for {a}, {b} and {c}",
+    "The truth about {opponent} and {a}",
+    "Vote for {name} to protect {a}",
+]
+SUMMARY_TEMPLATES = [
+    "A {tone} {campaign} mailer from {location} focused on {a} and {b}.",
+    "{campaign} election piece contrasting {name} with {opponent} on {a}.",
+    "Direct mail to {audience} in {location} about {a}, {b} and {c}.",
+]
+
+EPOCH = datetime(2016, 1, 1, tzinfo=timezone.utc)
+
+
+def _flatten_taxonomy():
+    for primary, subcategories in TAXONOMY.items():
+        for subcategory, terms in subcategories.items():
+            for term in terms:
+                yield primary, subcategory, term
+
+
+def ensure_taxonomy() -> List[Dict]:
+    """
+    Taxonomy terms to tag documents with, creating the synthetic ones if the
+    keyword_taxonomy table is empty
+
+    Returns:
+        List of {'id', 'term', 'primary_category', 'subcategory'}
+    """
+    if db.session.query(func.count(KeywordTaxonomy.id)).scalar() == 0:
+        for primary, subcategory, term in _flatten_taxonomy():
+            entry = KeywordTaxonomy(term=term, primary_category=primary,
+                                    subcategory=subcategory, specific_term=term)
+            for synonym in SYNONYMS.get(term, []):
+                entry.synonyms.append(KeywordSynonym(synonym=synonym))
+            db.session.add(entry)
+        db.session.commit()
+
+    rows = db.session.query(
+        KeywordTaxonomy.id, KeywordTaxonomy.term,
+        KeywordTaxonomy.primary_category, KeywordTaxonomy.subcategory
+    ).order_by(KeywordTaxonomy.id).all()
+    return [dict(row._mapping) for row in rows]
+
+
+def existing_documents() -> int:
+    """Number of benchmark documents already in the database"""
+    return db.session.query(func.count(Document.id)).filter(
+        Document.filename.like(f'{FILENAME_PREFIX}%')).scalar()
+
+
+def _embedding(seed: int, index: int) -> List[float]:
+    vector = np.random.default_rng([seed, index]).standard_normal(
+        EMBEDDING_DIMENSIONS).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+    return vector.tolist()
+
+
+def _person(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def build_document(seed: int, index: int, document_id: int, analysis_id: int,
+                   taxonomy: List[Dict], with_embeddings: bool) -> Dict[str, list]:
+    """
+    Rows for one synthetic document and everything hanging off it
+
+    Returns:
+        Dictionary of table name to list of row dictionaries
+    """
+    rng = random.Random(seed * 1_000_003 + index)
+
+    tagged = rng.sample(taxonomy, k=min(len(taxonomy), rng.randint(3, 8)))
+    a, b, c = (tagged * 3)[:3]
+    name, opponent = _person(rng), _person(rng)
+    location = rng.choice(LOCATIONS)
+    audience = rng.choice(AUDIENCES)
+    campaign = rng.choice(CAMPAIGN_TYPES)
+    tone = rng.choice(TONES)
+    upload_date = EPOCH + timedelta(seconds=rng.randint(0, 9 * 365 * 86400))
+    year = str(upload_date.year + (upload_date.year % 2))
+    words = {'name': name, 'opponent': opponent, 'location': location, 'audience': audience,
+             'campaign': campaign, 'tone': tone,
+             'a': a['term'], 'b': b['term'], 'c': c['term']}
+
+    document = {
+        'id': document_id,
+        'filename': f"{FILENAME_PREFIX}{index:07d}.pdf",
+        'upload_date': upload_date,
+        'processing_time': round(rng.uniform(5, 60), 2),
+        'file_size': rng.randint(50_000, 5_000_000),
+        'page_count': rng.randint(1, 4),
+        'status': DOCUMENT_STATUSES['COMPLETED'],
+    }
+    analysis = {
+        'id': analysis_id,
+        'document_id': document_id,
+        'summary_description': rng.choice(SUMMARY_TEMPLATES).format(**words),
+        'content_analysis': ' '.join(term['term'] for term in tagged),
+        'campaign_type': campaign,
+        'election_year': year,
+        'document_tone': tone,
+        'confidence_score': round(rng.uniform(0.6, 0.99), 3),
+        'analysis_date': upload_date,
+        'model_version': 'benchmark',
+    }
+    if with_embeddings:
+        embedding = _embedding(seed, index)
+        document['embeddings'] = embedding
+        document['embedding_date'] = upload_date
+        analysis['embeddings'] = embedding
+        analysis['embedding_date'] = upload_date
+
+    main_message = rng.choice(MESSAGE_TEMPLATES).format(**words)
+    return {
+        'documents': [document],
+        'llm_analysis': [analysis],
+        'extracted_text': [{
+            'document_id': document_id,
+            'page_number': 1,
+            'text_content': f"{main_message}. " + rng.choice(SUMMARY_TEMPLATES).format(**words),
+            'main_message': main_message,
+            'candidate_name': name,
+            'opponent_name': opponent,
+            'confidence': rng.randint(60, 99),
+            'extraction_date': upload_date,
+        }],
+        'design_elements': [{
+            'document_id': document_id,
+            'geographic_location': location,
+            'target_audience': audience,
+            'mail_piece_type': rng.choice(['postcard', 'letter', 'brochure']),
+            'confidence': rng.randint(60, 99),
+            'created_date': upload_date,
+        }],
+        'entities': [{
+            'document_id': document_id,
+            'client_name': name,
+            'opponent_name': opponent,
+            'created_date': upload_date,
+        }],
+        'communication_focus': [{
+            'document_id': document_id,
+            'primary_issue': a['term'],
+            'secondary_issues': ', '.join(term['term'] for term in tagged[1:3]),
+            'created_date': upload_date,
+        }],
+        'llm_keywords': [{
+            'llm_analysis_id': analysis_id,
+            'keyword': term['term'],
+            'category': term['primary_category'],
+            'relevance_score': rng.randint(50, 100),
+            'taxonomy_id': term['id'],
+        } for term in tagged],
+    }
+
+
+TABLES = [
+    ('documents', Document),
+    ('llm_analysis', LLMAnalysis),
+    ('extracted_text', ExtractedText),
+    ('design_elements', DesignElement),
+    ('entities', Entity),
+    ('communication_focus', CommunicationFocus),
+    ('llm_keywords', LLMKeyword),
+]
+
+
+def _reset_sequences():
+    for table, _ in TABLES:
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT max(id) FROM {table}), 0) + 1, false)"))
+
+
+def generate(target: int, seed: int = 42, with_embeddings: bool = True,
+             batch_size: int = BATCH_SIZE) -> int:
+    """
+    Grow the benchmark corpus to target documents
+
+    Args:
+        target: Number of benchmark documents wanted
+        seed: Corpus seed; the same seed always produces the same documents
+        with_embeddings: Store random unit vectors in the embedding columns
+        batch_size: Documents inserted per transaction
+
+    Returns:
+        Number of documents added
+    """
+    taxonomy = ensure_taxonomy()
+    start = existing_documents()
+    if start >= target:
+        return 0
+
+    with_embeddings = with_embeddings and hasattr(Document, 'embeddings')
+    next_document_id = (db.session.query(func.max(Document.id)).scalar() or 0) + 1
+    next_analysis_id = (db.session.query(func.max(LLMAnalysis.id)).scalar() or 0) + 1
+
+    started = time.time()
+    for batch_start in range(start, target, batch_size):
+        batch_end = min(batch_start + batch_size, target)
+        rows = {table: [] for table, _ in TABLES}
+        for index in range(batch_start, batch_end):
+            document_rows = build_document(
+                seed, index, next_document_id, next_analysis_id, taxonomy, with_embeddings)
+            for table, table_rows in document_rows.items():
+                rows[table].extend(table_rows)
+            next_document_id += 1
+            next_analysis_id += 1
+
+        for table, model in TABLES:
+            db.session.execute(model.__table__.insert(), rows[table])
+        db.session.commit()
+
+        logger.info(f"Generated {batch_end}/{target} benchmark documents "
+                    f"({time.time() - started:.1f}s)")
+
+    _reset_sequences()
+    db.session.commit()
+    return target - start
+
+
+def refresh_derived_data():
+    """Rebuild facet counts, result cards, search rows and planner statistics after loading documents"""
+    from src.catalog.services.card_service import document_cards
+    from src.catalog.services.facet_service import facet_service
+    from src.catalog.services.search_document_service import search_documents
+
+    facet_service.rebuild()
+    document_cards.rebuild_all()
+    search_documents.rebuild_all()
+    for table, _ in TABLES:
+        db.session.execute(text(f"ANALYZE {table}"))
+    db.session.execute(text("ANALYZE document_cards"))
+    db.session.execute(text("ANALYZE search_documents"))
+    db.session.commit()
+
+
+def reset():
+    """Delete every benchmark document and its dependent rows"""
+    documents = text(f"SELECT id FROM documents WHERE filename LIKE '{FILENAME_PREFIX}%'")
+    db.session.execute(text(
+        f"DELETE FROM llm_keywords WHERE llm_analysis_id IN "
+        f"(SELECT id FROM llm_analysis WHERE document_id IN ({documents.text}))"))
+    for table, _ in TABLES[1:-1]:
+        db.session.execute(text(f"DELETE FROM {table} WHERE document_id IN ({documents.text})"))
+    db.session.execute(text(f"DELETE FROM documents WHERE filename LIKE '{FILENAME_PREFIX}%'"))
+    db.session.commit()
+
+
+def main(argv: Optional[List[str]] = None):
+    from benchmarks.runner import create_benchmark_app
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--documents', type=int, default=10000,
+                        help='Grow the benchmark corpus to this many documents')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-embeddings', action='store_true',
+                        help='Leave the embedding columns empty')
+    parser.add_argument('--reset', action='store_true',
+                        help='Delete the benchmark corpus before generating')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    app = create_benchmark_app()
+    with app.app_context():
+        if args.reset:
+            reset()
+        added = generate(args.documents, args.seed, not args.no_embeddings)
+        refresh_derived_data()
+        print(f"Added {added} documents; corpus now has {existing_documents()}.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/report.py
+"""
+Latency summaries for benchmark runs
+"""
+
+import json
+import math
+import platform
+import subprocess
+from datetime import datetime, timezone
+from typing import Dict, List
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Linear-interpolated percentile of an already sorted list
+
+    Args:
+        sorted_values: Ascending latencies
+        fraction: Percentile as a fraction, e.g. 0.95
+
+    Returns:
+        Percentile value, or 0.0 for an empty list
+    """
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return sorted_values[lower]
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def summarize(latencies_ms: List[float], wall_seconds: float, errors: int = 0) -> Dict:
+    """
+    Summary statistics for one set of timed queries
+
+    Args:
+        latencies_ms: Per-query latency in milliseconds
+        wall_seconds: Wall-clock time for the whole set, for throughput
+        errors: Number of queries that failed
+
+    Returns:
+        Dictionary of count, errors, p50/p95/p99/mean/max in ms and qps
+    """
+    values = sorted(latencies_ms)
+    return {
+        'count': len(values),
+        'errors': errors,
+        'p50_ms': round(percentile(values, 0.50), 3),
+        'p95_ms': round(percentile(values, 0.95), 3),
+        'p99_ms': round(percentile(values, 0.99), 3),
+        'mean_ms': round(sum(values) / len(values), 3) if values else 0.0,
+        'max_ms': round(values[-1], 3) if values else 0.0,
+        'qps': round(len(values) / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return 'unknown'
+
+
+def run_metadata(**settings) -> Dict:
+    """Enough context to tell two result files apart"""
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'git_revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': settings,
+    }
+
+
+def write_report(report: Dict, path: str):
+    """Write a report as indented JSON ('-' for stdout)"""
+    payload = json.dumps(report, indent=2, sort_keys=False)
+    if path == '-':
+        print(payload)
+        return
+    with open(path, 'w') as f:
+        f.write(payload + '\n')
@@ -0,0 +1,246 @@
+# benchmarks/runner.py
+"""
+Search benchmark runner.
+
+For each corpus size the runner grows the synthetic corpus, then replays the
+fixed workload twice: directly through SearchService.search, and through the
+search view with the Flask test client (JSON responses, as the frontend
+requests them). Latency percentiles and throughput are written as JSON,
+overall and per query kind, together with the mean time spent in each
+search stage.
+
+Query embeddings come from a deterministic local function unless
+--live-embeddings is given, and queued preview renders are counted instead
+of sent to Celery, so results don't depend on OpenAI or a broker.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from unittest import mock
+
+import numpy as np
+
+from src.catalog import cache, create_app, db
+from src.catalog.services.embeddings_service import EmbeddingsService
+from src.catalog.utils.search_profiler import SearchProfile
+from benchmarks import corpus
+from benchmarks.report import run_metadata, summarize, write_report
+from benchmarks.workload import build_workload, query_string, search_kwargs
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def create_benchmark_app(use_cache: bool = False):
+    """
+    Flask app bound to the benchmark database
+
+    Args:
+        use_cache: Keep the in-process result caches; by default every query
+            does the full amount of work
+
+    Returns:
+        Flask app
+    """
+    database_url = os.environ.get('BENCHMARK_DATABASE_URL')
+    if not database_url:
+        raise SystemExit(
+            "Set BENCHMARK_DATABASE_URL to a scratch Postgres database with the migrations applied")
+    if database_url.startswith('postgres://'):
+        database_url = database_url.replace('postgres://', 'postgresql://', 1)
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+    })
+    if not use_cache:
+        cache.init_app(app, config={'CACHE_TYPE': 'NullCache'})
+    return app
+
+
+async def _offline_embeddings(self, text, max_wait=None):
+    """Deterministic unit vector per text, in place of the OpenAI call"""
+    seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'little')
+    vector = np.random.default_rng(seed).standard_normal(
+        corpus.EMBEDDING_DIMENSIONS).astype(np.float32)
+    await asyncio.sleep(0)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class _QueuedPreviews:
+    """Stands in for generate_preview.delay and counts the calls"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+def _time_queries(workload: List[Dict], run_query) -> Dict:
+    """Run each query once and summarise latencies, overall and per kind"""
+    latencies = []
+    by_kind = defaultdict(list)
+    errors = defaultdict(int)
+    stage_totals = defaultdict(float)
+
+    started = time.perf_counter()
+    for query in workload:
+        query_started = time.perf_counter()
+        try:
+            ok, stages = run_query(query)
+        except Exception as e:
+            logger.error(f"Benchmark query failed: {str(e)}")
+            ok, stages = False, {}
+        elapsed = (time.perf_counter() - query_started) * 1000
+
+        latencies.append(elapsed)
+        by_kind[query['kind']].append(elapsed)
+        if not ok:
+            errors[query['kind']] += 1
+        for name, ms in stages.items():
+            stage_totals[name] += ms
+    wall = time.perf_counter() - started
+
+    result = {
+        'overall': summarize(latencies, wall, sum(errors.values())),
+        'by_kind': {
+            # Per-kind throughput is relative to the time spent on that kind
+            kind: summarize(values, sum(values) / 1000, errors[kind])
+            for kind, values in sorted(by_kind.items())
+        },
+    }
+    if stage_totals:
+        result['stages_mean_ms'] = {
+            name: round(total / len(workload), 3) for name, total in stage_totals.items()
+        }
+    return result
+
+
+def run_service(search_service, workload: List[Dict]) -> Dict:
+    """Time SearchService.search for every workload query"""
+    def run_query(query):
+        profile = SearchProfile()
+        _, pagination, _, _, _ = search_service.search(
+            query['q'], profile=profile, **search_kwargs(query))
+        db.session.rollback()
+        return pagination is not None, profile.stages
+
+    return _time_queries(workload, run_query)
+
+
+def run_view(client, workload: List[Dict]) -> Dict:
+    """Time the search view, through the test client, for every workload query"""
+    def run_query(query):
+        response = client.get('/api/search/', query_string=query_string(query),
+                              headers={'X-Requested-With': 'XMLHttpRequest'})
+        payload = response.get_json(silent=True) or {}
+        return response.status_code == 200 and 'error' not in payload, {}
+
+    return _time_queries(workload, run_query)
+
+
+def run_size(app, size: int, workload: List[Dict], args) -> Dict:
+    """Grow the corpus to size and benchmark both entry points"""
+    from src.catalog.web.search_routes import search_service
+
+    with app.app_context():
+        current = corpus.existing_documents()
+        if current > size:
+            logger.warning(f"Corpus already has {current} documents; skipping size {size}")
+            return {'documents': current, 'skipped': True}
+
+        added = corpus.generate(size, args.seed, not args.no_embeddings)
+        if added or args.refresh:
+            corpus.refresh_derived_data()
+
+        for query in workload[:args.warmup]:
+            search_service.search(query['q'], **search_kwargs(query))
+            db.session.rollback()
+
+        result = {'documents': size, 'targets': {}}
+        if 'service' in args.targets:
+            logger.info(f"Benchmarking SearchService.search at {size} documents")
+            result['targets']['service'] = run_service(search_service, workload)
+        db.session.remove()
+
+    if 'view' in args.targets:
+        logger.info(f"Benchmarking the search view at {size} documents")
+        client = app.test_client()
+        for query in workload[:args.warmup]:
+            client.get('/api/search/', query_string=query_string(query),
+                       headers={'X-Requested-With': 'XMLHttpRequest'})
+        result['targets']['view'] = run_view(client, workload)
+
+    return result
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Search latency benchmark')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='Comma-separated corpus sizes, grown in ascending order')
+    parser.add_argument('--queries', type=int, default=500, help='Workload size')
+    parser.add_argument('--warmup', type=int, default=25,
+                        help='Untimed queries run before each measurement')
+    parser.add_argument('--seed', type=int, default=42, help='Corpus seed')
+    parser.add_argument('--workload-seed', type=int, default=7)
+    parser.add_argument('--targets', default='service,view',
+                        help='Entry points to benchmark: service, view or both')
+    parser.add_argument('--use-cache', action='store_true',
+                        help='Keep result caches enabled (measures cache hits too)')
+    parser.add_argument('--live-embeddings', action='store_true',
+                        help='Call the OpenAI API for query embeddings')
+    parser.add_argument('--no-embeddings', action='store_true',
+                        help='Generate documents without embeddings')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Rebuild facet counts and ANALYZE even if no documents were added')
+    parser.add_argument('--reset', action='store_true',
+                        help='Delete the benchmark corpus first')
+    parser.add_argument('--output', default='-', help="Result file, or '-' for stdout")
+    args = parser.parse_args(argv)
+    args.targets = {target.strip() for target in args.targets.split(',')}
+
+    logging.basicConfig(level=logging.INFO)
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+    workload = build_workload(args.queries, args.workload_seed)
+
+    app = create_benchmark_app(args.use_cache)
+    if args.reset:
+        with app.app_context():
+            corpus.reset()
+
+    queued_previews = _QueuedPreviews()
+    patches = [mock.patch('tasks.preview_tasks.generate_preview.delay', queued_previews)]
+    if not args.live_embeddings:
+        patches.append(mock.patch.object(EmbeddingsService, 'generate_embeddings', _offline_embeddings))
+
+    report = {
+        'metadata': run_metadata(
+            sizes=sizes, queries=len(workload), warmup=args.warmup, seed=args.seed,
+            workload_seed=args.workload_seed, use_cache=args.use_cache,
+            live_embeddings=args.live_embeddings, targets=sorted(args.targets)),
+        'results': [],
+    }
+    for patcher in patches:
+        patcher.start()
+    try:
+        for size in sizes:
+            report['results'].append(run_size(app, size, workload, args))
+    finally:
+        for patcher in patches:
+            patcher.stop()
+
+    report['metadata']['previews_queued'] = queued_previews.count
+    write_report(report, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# benchmarks/workload.py
+"""
+Fixed query workload for search benchmarks.
+
+The workload is generated from a seed and the synthetic vocabulary in
+benchmarks.corpus, so every run issues exactly the same queries in the same
+order. Each query is the keyword arguments of SearchService.search plus the
+query text, tagged with a kind for per-kind reporting.
+"""
+
+import random
+from typing import Dict, List
+
+from src.catalog.constants import SEARCH_TYPES
+from benchmarks.corpus import LOCATIONS, SYNONYMS, TONES, _flatten_taxonomy
+
+# Share of each kind in the workload
+MIX = {
+    'keyword': 0.25,
+    'vector': 0.15,
+    'hybrid': 0.25,
+    'facet': 0.15,
+    'filter': 0.20,
+}
+
+FREE_TEXT = [
+    'mailer about lowering costs for families',
+    'attack ad on voting record',
+    'healthcare for seniors',
+    'protect social security and medicare',
+    'clean water and conservation',
+    'support our police officers',
+    'get out the vote early',
+]
+
+
+def _search_text(rng: random.Random, terms: List[str]) -> str:
+    choice = rng.random()
+    if choice < 0.5:
+        return rng.choice(terms)
+    if choice < 0.7:
+        return rng.choice(sorted(synonym for values in SYNONYMS.values() for synonym in values))
+    if choice < 0.85:
+        return f"{rng.choice(terms)} {rng.choice(terms)}"
+    return rng.choice(FREE_TEXT)
+
+
+def _sort_and_page(rng: random.Random, query: Dict, relevance: bool):
+    if relevance and rng.random() < 0.6:
+        query['sort_by'] = 'relevance'
+    else:
+        query['sort_by'] = rng.choice(['upload_date', 'upload_date', 'filename'])
+        query['sort_dir'] = rng.choice(['desc', 'asc'])
+    # Mostly first pages, with some deep paging
+    query['page'] = rng.choice([1, 1, 1, 1, 2, 3, 10])
+    query['per_page'] = 12
+
+
+def build_workload(size: int = 500, seed: int = 7) -> List[Dict]:
+    """
+    The benchmark queries
+
+    Args:
+        size: Number of queries
+        seed: Workload seed
+
+    Returns:
+        List of {'kind', 'q', **search kwargs}
+    """
+    rng = random.Random(seed)
+    taxonomy = list(_flatten_taxonomy())
+    terms = [term for _, _, term in taxonomy]
+    kinds = list(MIX)
+    weights = [MIX[kind] for kind in kinds]
+
+    workload = []
+    for _ in range(size):
+        kind = rng.choices(kinds, weights)[0]
+        query = {'kind': kind, 'q': ''}
+
+        if kind in ('keyword', 'vector', 'hybrid'):
+            query['q'] = _search_text(rng, terms)
+            query['search_type'] = SEARCH_TYPES[kind.upper()]
+            _sort_and_page(rng, query, relevance=True)
+        elif kind == 'facet':
+            primary, subcategory, term = rng.choice(taxonomy)
+            query['primary_category'] = primary
+            depth = rng.random()
+            if depth > 0.3:
+                query['subcategory'] = subcategory
+            if depth > 0.7:
+                query['specific_term'] = term
+            _sort_and_page(rng, query, relevance=False)
+        else:
+            query['q'] = rng.choice(terms) if rng.random() < 0.6 else ''
+            query['search_type'] = SEARCH_TYPES['HYBRID']
+            # filter_type matches the document tone
+            query['filter_type'] = rng.choice(TONES) if rng.random() < 0.6 else ''
+            query['filter_year'] = str(rng.choice(range(2016, 2026, 2))) if rng.random() < 0.5 else ''
+            query['filter_location'] = rng.choice(LOCATIONS) if rng.random() < 0.5 else ''
+            if not (query['filter_type'] or query['filter_year'] or query['filter_location']):
+                query['filter_location'] = rng.choice(LOCATIONS)
+            _sort_and_page(rng, query, relevance=bool(query['q']))
+
+        workload.append(query)
+    return workload
+
+
+def search_kwargs(query: Dict) -> Dict:
+    """SearchService.search keyword arguments for a workload entry"""
+    return {key: value for key, value in query.items() if key not in ('kind', 'q')}
+
+
+def query_string(query: Dict) -> Dict:
+    """Request arguments for the search view for a workload entry"""
+    args = {'q': query['q']}
+    args.update({key: str(value) for key, value in search_kwargs(query).items()})
+    return args
+
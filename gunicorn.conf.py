@@ -31,4 +31,13 @@ tmp_upload_dir = None
 
 # SSL
 keyfile = None
-certfile = None
\ No newline at end of file
+certfile = None
+
+# Server hooks
+def worker_exit(server, worker):
+    """Close pooled upstream connections and the shared event loop thread"""
+    try:
+        from src.catalog.services.http_clients import shutdown_http_clients
+        shutdown_http_clients()
+    except Exception as e:
+        server.log.warning(f"Error shutting down HTTP clients: {str(e)}")
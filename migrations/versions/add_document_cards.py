@@ -0,0 +1,36 @@
+# migrations/versions/add_document_cards.py
+"""add precomputed search result cards
+
+Revision ID: add_document_cards
+Revises: add_taxonomy_facet_counts
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_document_cards'
+down_revision = 'add_taxonomy_facet_counts'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled by scripts/rebuild_document_cards.py, and lazily by search for
+    # any document without a current card
+    op.create_table(
+        'document_cards',
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('card', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False,
+                  server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('document_id')
+    )
+
+
+def downgrade():
+    op.drop_table('document_cards')
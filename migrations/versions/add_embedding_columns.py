@@ -0,0 +1,57 @@
+# migrations/versions/add_embedding_columns.py
+"""add embedding columns for vector search
+
+Revision ID: add_embedding_columns
+Revises: 38338ee4e36e
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_embedding_columns'
+down_revision = '38338ee4e36e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Restore the pgvector columns dropped in d95570e991c6; databases created
+    # from master_migrations.sql already have them
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.execute(
+        "ALTER TABLE documents ADD COLUMN IF NOT EXISTS embeddings vector(1536)")
+    op.execute(
+        "ALTER TABLE llm_analysis ADD COLUMN IF NOT EXISTS embeddings vector(1536)")
+
+    # Track when embeddings were written so the in-process vector index can
+    # pick up re-embedded rows incrementally
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('embedding_date', sa.DateTime(timezone=True), nullable=True))
+
+    with op.batch_alter_table('llm_analysis', schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column('embedding_date', sa.DateTime(timezone=True), nullable=True))
+
+    op.create_index(op.f('ix_documents_embedding_date'), 'documents', [
+                    'embedding_date'], unique=False)
+    op.create_index(op.f('ix_llm_analysis_embedding_date'), 'llm_analysis', [
+                    'embedding_date'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_llm_analysis_embedding_date'),
+                  table_name='llm_analysis')
+    op.drop_index(op.f('ix_documents_embedding_date'),
+                  table_name='documents')
+
+    with op.batch_alter_table('llm_analysis', schema=None) as batch_op:
+        batch_op.drop_column('embedding_date')
+
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_column('embedding_date')
+
+    op.execute("ALTER TABLE llm_analysis DROP COLUMN IF EXISTS embeddings")
+    op.execute("ALTER TABLE documents DROP COLUMN IF EXISTS embeddings")
@@ -0,0 +1,46 @@
+# migrations/versions/add_llm_response_cache.py
+"""add the content-addressed LLM response cache
+
+Revision ID: add_llm_response_cache
+Revises: add_search_documents
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_llm_response_cache'
+down_revision = 'add_search_documents'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'llm_response_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('file_sha256', sa.String(length=64), nullable=False),
+        sa.Column('component', sa.Text(), nullable=False),
+        sa.Column('prompt_hash', sa.String(length=64), nullable=False),
+        sa.Column('model', sa.Text(), nullable=False),
+        sa.Column('response', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('size_bytes', sa.Integer(), nullable=False),
+        sa.Column('hits', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False,
+                  server_default=sa.text('now()')),
+        sa.Column('last_used_at', sa.DateTime(timezone=True), nullable=False,
+                  server_default=sa.text('now()')),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('file_sha256', 'component', 'prompt_hash', 'model',
+                            name='uq_llm_response_cache_key')
+    )
+    # Eviction drops the least recently used entries first
+    op.create_index('ix_llm_response_cache_last_used_at', 'llm_response_cache',
+                    ['last_used_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_llm_response_cache_last_used_at', table_name='llm_response_cache')
+    op.drop_table('llm_response_cache')
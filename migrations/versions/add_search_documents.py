@@ -0,0 +1,288 @@
+# migrations/versions/add_search_documents.py
+"""add the denormalized search_documents table and its maintenance triggers
+
+Revision ID: add_search_documents
+Revises: add_document_cards
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_search_documents'
+down_revision = 'add_document_cards'
+branch_labels = None
+depends_on = None
+
+# One row per document, recomputed from the source tables. ts_rank_cd weights
+# (FULL_TEXT_SEARCH_SETTINGS['WEIGHTS']) apply per label: A filename and
+# summary, B main message, C text content, D everything else. Filenames are
+# split on punctuation first so 'tax-reform_mailer.pdf' yields words rather
+# than a single file token. search_text holds the short headline
+# fields, lowercased, for the pg_trgm fallback on misspelled queries; full
+# page text is left out so its trigrams do not match everything. Analysis
+# and design fields come from the latest row; extracted text is every page,
+# in page order.
+REFRESH_FUNCTION = """
+    CREATE OR REPLACE FUNCTION refresh_search_documents(ids integer[]) RETURNS void
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF ids IS NULL OR cardinality(ids) = 0 THEN
+                RETURN;
+            END IF;
+
+            INSERT INTO search_documents (
+                document_id, filename, search_vector, search_text, election_year, document_tone,
+                campaign_type, location, taxonomy_ids, embedding, analysis_embedding,
+                updated_at
+            )
+            SELECT
+                d.id,
+                d.filename,
+                setweight(to_tsvector('english',
+                    regexp_replace(COALESCE(d.filename, ''), '[^[:alnum:]]+', ' ', 'g')), 'A') ||
+                setweight(to_tsvector('english', COALESCE(la.summary_description, '')), 'A') ||
+                setweight(to_tsvector('english', COALESCE(et.main_message, '')), 'B') ||
+                setweight(to_tsvector('english', COALESCE(et.text_content, '')), 'C') ||
+                setweight(to_tsvector('english', concat_ws(' ',
+                    la.campaign_type, la.election_year, la.document_tone,
+                    et.supporting_text, et.call_to_action)), 'D'),
+                lower(concat_ws(' ',
+                    regexp_replace(COALESCE(d.filename, ''), '[^[:alnum:]]+', ' ', 'g'),
+                    la.summary_description, la.campaign_type, la.election_year,
+                    et.main_message, et.supporting_text, de.geographic_location)),
+                la.election_year,
+                la.document_tone,
+                la.campaign_type,
+                NULLIF(lower(btrim(de.geographic_location)), ''),
+                COALESCE(kw.taxonomy_ids, '{}'),
+                d.embeddings,
+                la.embeddings,
+                now()
+            FROM documents d
+            LEFT JOIN LATERAL (
+                SELECT summary_description, campaign_type, election_year,
+                       document_tone, embeddings
+                FROM llm_analysis
+                WHERE document_id = d.id
+                ORDER BY id DESC
+                LIMIT 1
+            ) la ON true
+            LEFT JOIN LATERAL (
+                SELECT string_agg(text_content, ' ' ORDER BY page_number, id) AS text_content,
+                       string_agg(main_message, ' ' ORDER BY page_number, id) AS main_message,
+                       string_agg(supporting_text, ' ' ORDER BY page_number, id) AS supporting_text,
+                       string_agg(call_to_action, ' ' ORDER BY page_number, id) AS call_to_action
+                FROM extracted_text
+                WHERE document_id = d.id
+            ) et ON true
+            LEFT JOIN LATERAL (
+                SELECT geographic_location
+                FROM design_elements
+                WHERE document_id = d.id
+                ORDER BY id DESC
+                LIMIT 1
+            ) de ON true
+            LEFT JOIN LATERAL (
+                SELECT array_agg(DISTINCT lk.taxonomy_id) AS taxonomy_ids
+                FROM llm_analysis a
+                JOIN llm_keywords lk ON lk.llm_analysis_id = a.id
+                WHERE a.document_id = d.id AND lk.taxonomy_id IS NOT NULL
+            ) kw ON true
+            WHERE d.id = ANY(ids)
+            ON CONFLICT (document_id) DO UPDATE SET
+                filename = EXCLUDED.filename,
+                search_vector = EXCLUDED.search_vector,
+                search_text = EXCLUDED.search_text,
+                election_year = EXCLUDED.election_year,
+                document_tone = EXCLUDED.document_tone,
+                campaign_type = EXCLUDED.campaign_type,
+                location = EXCLUDED.location,
+                taxonomy_ids = EXCLUDED.taxonomy_ids,
+                embedding = EXCLUDED.embedding,
+                analysis_embedding = EXCLUDED.analysis_embedding,
+                updated_at = EXCLUDED.updated_at;
+        END
+        $$;
+"""
+
+# Document IDs touched by a statement, selected from its transition table
+# ({rows} is new_rows or old_rows). Document status updates are frequent
+# and change nothing searchable, so documents updates only count when the
+# filename or embedding changed; deleted documents cascade instead.
+AFFECTED_DOCUMENTS = {
+    'documents': "SELECT id FROM {rows}",
+    'llm_analysis': "SELECT document_id FROM {rows}",
+    'extracted_text': "SELECT document_id FROM {rows}",
+    'design_elements': "SELECT document_id FROM {rows}",
+    'llm_keywords': (
+        "SELECT a.document_id FROM {rows} r "
+        "JOIN llm_analysis a ON a.id = r.llm_analysis_id"),
+}
+
+CHANGED_DOCUMENTS = (
+    "SELECT n.id FROM new_rows n JOIN old_rows o ON o.id = n.id "
+    "WHERE n.filename IS DISTINCT FROM o.filename "
+    "OR n.embeddings IS DISTINCT FROM o.embeddings")
+
+# Per-table vectors maintained by the {table}_search_vector_update triggers
+# from the original schema (master_migrations.sql), with the column their
+# downgrade recompute touches. Search reads search_documents.search_vector
+# instead, so once it is populated these triggers and GIN indexes only slow
+# down writes. The trigger functions are kept so downgrade() can reattach them.
+SEARCH_VECTOR_TRIGGERS = {
+    'documents': 'filename',
+    'llm_analysis': 'summary_description',
+    'extracted_text': 'text_content',
+}
+SEARCH_VECTOR_INDEXES = {
+    'ix_documents_search_vector': 'documents',
+    'ix_llm_analysis_search_vector': 'llm_analysis',
+    'ix_extracted_text_search_vector': 'extracted_text',
+}
+
+# Transition tables allow a single event per trigger
+EVENTS = {
+    'INSERT': 'REFERENCING NEW TABLE AS new_rows',
+    'UPDATE': 'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'DELETE': 'REFERENCING OLD TABLE AS old_rows',
+}
+
+
+def _trigger_function(table):
+    affected = AFFECTED_DOCUMENTS[table]
+    if table == 'documents':
+        updated = CHANGED_DOCUMENTS
+        deleted = None
+    else:
+        updated = (affected.format(rows='new_rows') + " UNION " +
+                   affected.format(rows='old_rows'))
+        deleted = affected.format(rows='old_rows')
+
+    delete_branch = (
+        f"""
+                ELSIF TG_OP = 'DELETE' THEN
+                    PERFORM refresh_search_documents(ARRAY({deleted}));"""
+        if deleted else '')
+
+    return f"""
+        CREATE OR REPLACE FUNCTION {table}_refresh_search_documents() RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    PERFORM refresh_search_documents(ARRAY({affected.format(rows='new_rows')}));
+                ELSIF TG_OP = 'UPDATE' THEN
+                    PERFORM refresh_search_documents(ARRAY({updated}));{delete_branch}
+                END IF;
+                RETURN NULL;
+            END
+            $$;
+    """
+
+
+def _trigger_events(table):
+    # Deleting a document removes its row through the foreign key
+    return [event for event in EVENTS if not (table == 'documents' and event == 'DELETE')]
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    op.create_table(
+        'search_documents',
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('filename', sa.Text(), nullable=False),
+        sa.Column('search_vector', postgresql.TSVECTOR(), nullable=False),
+        sa.Column('search_text', sa.Text(), nullable=False, server_default=''),
+        sa.Column('election_year', sa.Text(), nullable=True),
+        sa.Column('document_tone', sa.Text(), nullable=True),
+        sa.Column('campaign_type', sa.Text(), nullable=True),
+        sa.Column('location', sa.Text(), nullable=True),
+        sa.Column('taxonomy_ids', postgresql.ARRAY(sa.Integer()), nullable=False,
+                  server_default=sa.text("'{}'")),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False,
+                  server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('document_id')
+    )
+    # pgvector columns, as in add_embedding_columns
+    op.execute("ALTER TABLE search_documents ADD COLUMN embedding vector(1536)")
+    op.execute("ALTER TABLE search_documents ADD COLUMN analysis_embedding vector(1536)")
+    op.create_index('ix_search_documents_search_vector', 'search_documents',
+                    ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_search_documents_taxonomy_ids', 'search_documents',
+                    ['taxonomy_ids'], unique=False, postgresql_using='gin')
+    op.create_index('ix_search_documents_search_text_trgm', 'search_documents',
+                    ['search_text'], unique=False, postgresql_using='gin',
+                    postgresql_ops={'search_text': 'gin_trgm_ops'})
+    op.create_index('ix_search_documents_location_trgm', 'search_documents',
+                    ['location'], unique=False, postgresql_using='gin',
+                    postgresql_ops={'location': 'gin_trgm_ops'})
+    op.create_index('ix_search_documents_election_year', 'search_documents',
+                    ['election_year'], unique=False)
+    op.create_index('ix_search_documents_document_tone', 'search_documents',
+                    ['document_tone'], unique=False)
+
+    op.execute(REFRESH_FUNCTION)
+    for table in AFFECTED_DOCUMENTS:
+        op.execute(_trigger_function(table))
+        for event in _trigger_events(table):
+            name = f"{table}_refresh_search_documents_{event.lower()}"
+            op.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+            op.execute(f"""
+                CREATE TRIGGER {name}
+                    AFTER {event} ON {table}
+                    {EVENTS[event]}
+                    FOR EACH STATEMENT
+                    EXECUTE FUNCTION {table}_refresh_search_documents()
+            """)
+
+    # Backfill; scripts/rebuild_search_documents.py does the same in batches
+    op.execute("SELECT refresh_search_documents(ARRAY(SELECT id FROM documents))")
+
+    # search_documents is populated; stop maintaining the per-table vectors
+    for table in SEARCH_VECTOR_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_update ON {table}")
+    for index in SEARCH_VECTOR_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index}")
+
+
+def downgrade():
+    for table in AFFECTED_DOCUMENTS:
+        for event in _trigger_events(table):
+            op.execute(
+                f"DROP TRIGGER IF EXISTS {table}_refresh_search_documents_{event.lower()} ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {table}_refresh_search_documents()")
+    op.execute("DROP FUNCTION IF EXISTS refresh_search_documents(integer[])")
+
+    # Reattach the per-table vector triggers once the search_documents
+    # triggers are gone, and recompute the vectors left stale meanwhile.
+    # Databases created without master_migrations.sql have no functions.
+    for table, column in SEARCH_VECTOR_TRIGGERS.items():
+        op.execute(f"""
+            DO $$
+            BEGIN
+                IF to_regprocedure('{table}_search_vector_update()') IS NOT NULL THEN
+                    CREATE TRIGGER {table}_search_vector_update
+                        BEFORE INSERT OR UPDATE ON {table}
+                        FOR EACH ROW
+                        EXECUTE FUNCTION {table}_search_vector_update();
+                    UPDATE {table} SET {column} = {column};
+                END IF;
+            END
+            $$;
+        """)
+    for index, table in SEARCH_VECTOR_INDEXES.items():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} USING gin (search_vector)")
+
+    op.drop_index('ix_search_documents_document_tone', table_name='search_documents')
+    op.drop_index('ix_search_documents_election_year', table_name='search_documents')
+    op.drop_index('ix_search_documents_location_trgm', table_name='search_documents')
+    op.drop_index('ix_search_documents_search_text_trgm', table_name='search_documents')
+    op.drop_index('ix_search_documents_taxonomy_ids', table_name='search_documents')
+    op.drop_index('ix_search_documents_search_vector', table_name='search_documents')
+    op.drop_table('search_documents')
@@ -0,0 +1,29 @@
+# migrations/versions/add_search_sort_indexes.py
+"""add composite indexes for keyset pagination of search results
+
+Revision ID: add_search_sort_indexes
+Revises: add_embedding_columns
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_search_sort_indexes'
+down_revision = 'add_embedding_columns'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Cursor pages resume with (sort column, id) > (value, id), which these
+    # indexes answer as a range scan in either direction
+    op.create_index('ix_documents_upload_date_id', 'documents', [
+                    'upload_date', 'id'], unique=False)
+    op.create_index('ix_documents_filename_id', 'documents', [
+                    'filename', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_documents_filename_id', table_name='documents')
+    op.drop_index('ix_documents_upload_date_id', table_name='documents')
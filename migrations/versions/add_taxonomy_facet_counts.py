@@ -0,0 +1,214 @@
+# migrations/versions/add_taxonomy_facet_counts.py
+"""add materialized taxonomy facet counts and their maintenance triggers
+
+Revision ID: add_taxonomy_facet_counts
+Revises: add_search_sort_indexes
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_taxonomy_facet_counts'
+down_revision = 'add_search_sort_indexes'
+branch_labels = None
+depends_on = None
+
+# Recomputes every count from the keyword tables; a document counts once per
+# facet however many of its keywords fall under it. Seeds the table, runs
+# when taxonomy terms are renamed or moved, and backs
+# scripts/rebuild_facet_counts.py. Returns the number of facet rows written.
+REBUILD_FUNCTION = """
+    CREATE OR REPLACE FUNCTION rebuild_taxonomy_facet_counts() RETURNS integer
+        LANGUAGE plpgsql
+        AS $$
+        DECLARE
+            written integer;
+        BEGIN
+            DELETE FROM taxonomy_facet_counts;
+            INSERT INTO taxonomy_facet_counts
+                (level, primary_category, subcategory, term, document_count)
+            SELECT 'primary', kt.primary_category, '', '', COUNT(DISTINCT la.document_id)
+            FROM keyword_taxonomy kt
+            JOIN llm_keywords lk ON lk.taxonomy_id = kt.id
+            JOIN llm_analysis la ON la.id = lk.llm_analysis_id
+            WHERE kt.primary_category IS NOT NULL AND la.document_id IS NOT NULL
+            GROUP BY kt.primary_category
+            UNION ALL
+            SELECT 'subcategory', kt.primary_category, kt.subcategory, '', COUNT(DISTINCT la.document_id)
+            FROM keyword_taxonomy kt
+            JOIN llm_keywords lk ON lk.taxonomy_id = kt.id
+            JOIN llm_analysis la ON la.id = lk.llm_analysis_id
+            WHERE kt.primary_category IS NOT NULL AND kt.subcategory IS NOT NULL
+              AND la.document_id IS NOT NULL
+            GROUP BY kt.primary_category, kt.subcategory
+            UNION ALL
+            SELECT 'term', kt.primary_category, COALESCE(kt.subcategory, ''), kt.term,
+                   COUNT(DISTINCT la.document_id)
+            FROM keyword_taxonomy kt
+            JOIN llm_keywords lk ON lk.taxonomy_id = kt.id
+            JOIN llm_analysis la ON la.id = lk.llm_analysis_id
+            WHERE kt.primary_category IS NOT NULL AND kt.term IS NOT NULL
+              AND la.document_id IS NOT NULL
+            GROUP BY kt.primary_category, COALESCE(kt.subcategory, ''), kt.term;
+            GET DIAGNOSTICS written = ROW_COUNT;
+            RETURN written;
+        END
+        $$;
+"""
+
+# Facets of (document_id, taxonomy_id) rows, with the same rules as the rebuild
+FACET_KEYS = """
+    SELECT DISTINCT k.document_id, f.level, f.primary_category, f.subcategory, f.term
+    FROM {rows} k
+    JOIN keyword_taxonomy kt ON kt.id = k.taxonomy_id
+    CROSS JOIN LATERAL (VALUES
+        ('primary', kt.primary_category, '', ''),
+        ('subcategory', kt.primary_category, kt.subcategory, ''),
+        ('term', kt.primary_category, COALESCE(kt.subcategory, ''), kt.term)
+    ) f(level, primary_category, subcategory, term)
+    WHERE kt.primary_category IS NOT NULL
+      AND f.subcategory IS NOT NULL AND f.term IS NOT NULL
+"""
+
+# Keyword rows of the affected documents before the statement: the current
+# rows less the ones it inserted or rewrote, plus the ones it deleted or
+# rewrote. Keywords are always written under an existing llm_analysis row,
+# so the statement's rows map to documents through the current analyses.
+BEFORE_ROWS = {
+    'INSERT': "SELECT * FROM llm_keywords WHERE id NOT IN (SELECT id FROM new_rows)",
+    'UPDATE': ("SELECT * FROM llm_keywords WHERE id NOT IN (SELECT id FROM new_rows) "
+               "UNION ALL SELECT * FROM old_rows"),
+    'DELETE': "SELECT * FROM llm_keywords UNION ALL SELECT * FROM old_rows",
+}
+CHANGED_ROWS = {
+    'INSERT': "SELECT llm_analysis_id FROM new_rows",
+    'UPDATE': "SELECT llm_analysis_id FROM new_rows UNION SELECT llm_analysis_id FROM old_rows",
+    'DELETE': "SELECT llm_analysis_id FROM old_rows",
+}
+
+# Transition tables allow a single event per trigger
+EVENTS = {
+    'INSERT': 'REFERENCING NEW TABLE AS new_rows',
+    'UPDATE': 'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'DELETE': 'REFERENCING OLD TABLE AS old_rows',
+}
+
+
+def _delta_function(event):
+    # Add the facets each affected document gained and subtract the ones it
+    # lost; deltas commute, so concurrent writers cannot overwrite each
+    # other's counts. Keys are upserted in order to avoid deadlocks.
+    return f"""
+        CREATE OR REPLACE FUNCTION llm_keywords_facet_counts_{event.lower()}() RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+            BEGIN
+                WITH analyses AS (
+                    SELECT id, document_id
+                    FROM llm_analysis
+                    WHERE document_id IN (
+                        SELECT document_id FROM llm_analysis
+                        WHERE id IN ({CHANGED_ROWS[event]}) AND document_id IS NOT NULL)
+                ),
+                after_rows AS (
+                    SELECT a.document_id, lk.taxonomy_id
+                    FROM llm_keywords lk JOIN analyses a ON a.id = lk.llm_analysis_id
+                ),
+                before_rows AS (
+                    SELECT a.document_id, lk.taxonomy_id
+                    FROM ({BEFORE_ROWS[event]}) lk JOIN analyses a ON a.id = lk.llm_analysis_id
+                ),
+                after_keys AS ({FACET_KEYS.format(rows='after_rows')}),
+                before_keys AS ({FACET_KEYS.format(rows='before_rows')}),
+                deltas AS (
+                    SELECT level, primary_category, subcategory, term, SUM(delta) AS delta
+                    FROM (
+                        SELECT added.*, 1 AS delta
+                        FROM (SELECT * FROM after_keys EXCEPT SELECT * FROM before_keys) added
+                        UNION ALL
+                        SELECT removed.*, -1 AS delta
+                        FROM (SELECT * FROM before_keys EXCEPT SELECT * FROM after_keys) removed
+                    ) changes
+                    GROUP BY level, primary_category, subcategory, term
+                )
+                INSERT INTO taxonomy_facet_counts
+                    (level, primary_category, subcategory, term, document_count)
+                SELECT level, primary_category, subcategory, term, delta
+                FROM deltas
+                WHERE delta <> 0
+                ORDER BY level, primary_category, subcategory, term
+                ON CONFLICT (level, primary_category, subcategory, term) DO UPDATE
+                    SET document_count = taxonomy_facet_counts.document_count + EXCLUDED.document_count;
+                RETURN NULL;
+            END
+            $$;
+    """
+
+
+# Renaming or moving a term changes which facets every tagged document falls
+# under; that is rare enough to recount everything
+TAXONOMY_FUNCTION = """
+    CREATE OR REPLACE FUNCTION keyword_taxonomy_facet_counts() RETURNS trigger
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            PERFORM rebuild_taxonomy_facet_counts();
+            RETURN NULL;
+        END
+        $$;
+"""
+
+
+def upgrade():
+    op.create_table(
+        'taxonomy_facet_counts',
+        sa.Column('level', sa.String(length=16), nullable=False),
+        sa.Column('primary_category', sa.Text(), nullable=False),
+        sa.Column('subcategory', sa.Text(), nullable=False, server_default=''),
+        sa.Column('term', sa.Text(), nullable=False, server_default=''),
+        sa.Column('document_count', sa.Integer(),
+                  nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint(
+            'level', 'primary_category', 'subcategory', 'term')
+    )
+
+    op.execute(REBUILD_FUNCTION)
+
+    # Every keyword write, including deletes and repairs made outside the
+    # pipeline, adjusts the counts in the writing transaction
+    for event in EVENTS:
+        op.execute(_delta_function(event))
+        name = f"llm_keywords_facet_counts_{event.lower()}"
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON llm_keywords")
+        op.execute(f"""
+            CREATE TRIGGER {name}
+                AFTER {event} ON llm_keywords
+                {EVENTS[event]}
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION {name}()
+        """)
+
+    op.execute(TAXONOMY_FUNCTION)
+    op.execute("DROP TRIGGER IF EXISTS keyword_taxonomy_facet_counts ON keyword_taxonomy")
+    op.execute("""
+        CREATE TRIGGER keyword_taxonomy_facet_counts
+            AFTER UPDATE OF primary_category, subcategory, term ON keyword_taxonomy
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION keyword_taxonomy_facet_counts()
+    """)
+
+    # Seed the counts from the keywords already stored
+    op.execute("SELECT rebuild_taxonomy_facet_counts()")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS keyword_taxonomy_facet_counts ON keyword_taxonomy")
+    op.execute("DROP FUNCTION IF EXISTS keyword_taxonomy_facet_counts()")
+    for event in EVENTS:
+        name = f"llm_keywords_facet_counts_{event.lower()}"
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON llm_keywords")
+        op.execute(f"DROP FUNCTION IF EXISTS {name}()")
+    op.execute("DROP FUNCTION IF EXISTS rebuild_taxonomy_facet_counts()")
+    op.drop_table('taxonomy_facet_counts')
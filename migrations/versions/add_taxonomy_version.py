@@ -0,0 +1,61 @@
+# migrations/versions/add_taxonomy_version.py
+"""add a taxonomy version counter bumped by taxonomy and synonym writes
+
+Revision ID: add_taxonomy_version
+Revises: add_llm_response_cache
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_taxonomy_version'
+down_revision = 'add_llm_response_cache'
+branch_labels = None
+depends_on = None
+
+# TaxonomyIndex reloads when the single row's version moves, so checking
+# reads one row instead of scanning both tables. The triggers are deferred
+# to commit: the bump becomes visible together with the change it counts,
+# and the counter row is only locked for the commit itself, not for the
+# rest of a document-processing transaction that adds terms.
+TABLES = ['keyword_taxonomy', 'keyword_synonyms']
+
+
+def upgrade():
+    op.create_table(
+        'taxonomy_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.CheckConstraint('id = 1', name='ck_taxonomy_version_single_row'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO taxonomy_version (id, version) VALUES (1, 0)")
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_taxonomy_version() RETURNS trigger
+            LANGUAGE plpgsql
+            AS $$
+            BEGIN
+                UPDATE taxonomy_version SET version = version + 1 WHERE id = 1;
+                RETURN NULL;
+            END
+            $$;
+    """)
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_bump_taxonomy_version ON {table}")
+        op.execute(f"""
+            CREATE CONSTRAINT TRIGGER {table}_bump_taxonomy_version
+                AFTER INSERT OR UPDATE OR DELETE ON {table}
+                DEFERRABLE INITIALLY DEFERRED
+                FOR EACH ROW
+                EXECUTE FUNCTION bump_taxonomy_version()
+        """)
+
+
+def downgrade():
+    for table in TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_bump_taxonomy_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_taxonomy_version()")
+    op.drop_table('taxonomy_version')
@@ -0,0 +1,24 @@
+from src.catalog import db
+from src.catalog import create_app
+from src.catalog.services.card_service import document_cards
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def rebuild_document_cards():
+    """Rewrite the search result card of every document"""
+    app = create_app()
+    with app.app_context():
+        try:
+            written = document_cards.rebuild_all()
+            print(f"Rebuilt {written} document cards.")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error rebuilding document cards: {str(e)}")
+
+
+if __name__ == "__main__":
+    rebuild_document_cards()
@@ -0,0 +1,24 @@
+from src.catalog import db
+from src.catalog import create_app
+from src.catalog.services.facet_service import facet_service
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def rebuild_facet_counts():
+    """Recompute taxonomy_facet_counts from the stored keywords"""
+    app = create_app()
+    with app.app_context():
+        try:
+            written = facet_service.rebuild()
+            print(f"Rebuilt {written} taxonomy facet counts.")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error rebuilding taxonomy facet counts: {str(e)}")
+
+
+if __name__ == "__main__":
+    rebuild_facet_counts()
@@ -0,0 +1,24 @@
+from src.catalog import db
+from src.catalog import create_app
+from src.catalog.services.search_document_service import search_documents
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def rebuild_search_documents():
+    """Recompute the search_documents row of every document"""
+    app = create_app()
+    with app.app_context():
+        try:
+            written = search_documents.rebuild_all()
+            print(f"Rebuilt {written} search documents.")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error rebuilding search documents: {str(e)}")
+
+
+if __name__ == "__main__":
+    rebuild_search_documents()
@@ -105,6 +105,11 @@ def configure_app(app):
         os.environ.get("BEHIND_PROXY", "false").lower() == "true"
     )
 
+    # Per-stage search timings (?debug=true) and /api/search/explain
+    app.config["SEARCH_DEBUG_ENABLED"] = (
+        os.environ.get("SEARCH_DEBUG_ENABLED", "false").lower() == "true"
+    )
+
     # File upload settings
     app.config["UPLOAD_FOLDER"] = os.environ.get("UPLOAD_FOLDER", "./uploads")
     app.config["MAX_CONTENT_LENGTH"] = int(
@@ -13,9 +13,8 @@ DOCUMENT_STATUSES = {
     'FAILED': 'FAILED'
 }
 
+# API calls are paced by the shared rate limiter, not by sync delays
 DROPBOX_SYNC_SETTINGS = {
-    'DOCUMENT_PROCESSING_DELAY': 40,  # seconds between batches
-    'DROPBOX_BATCH_SIZE': 5,          # documents per batch
     'MAX_CONCURRENT_PROCESSING': 3    # maximum concurrent processing tasks
 }
 
@@ -51,12 +50,35 @@ SEARCH_TYPES = {
     'HYBRID': 'hybrid'
 }
 
-# API Rate Limits
+# API Rate Limits, enforced across workers by services.rate_limiter
+# (override with <API>_REQUESTS_PER_MINUTE / <API>_TOKENS_PER_MINUTE)
 API_RATE_LIMITS = {
     'CLAUDE': 10,  # requests per minute
     'OPENAI': 20   # requests per minute
 }
 
+API_TOKEN_LIMITS = {
+    'CLAUDE': 40000,   # tokens per minute
+    'OPENAI': 1000000  # tokens per minute
+}
+
+# Share of each bucket that only priority calls (search query embeddings) may
+# take, so a backfill cannot leave interactive searches waiting for capacity
+API_PRIORITY_RESERVE = {
+    'CLAUDE': 0.0,  # no interactive Claude calls
+    'OPENAI': 0.2   # fraction of the request and token buckets
+}
+
+RATE_LIMITER_SETTINGS = {
+    'KEY_PREFIX': 'api_rate_limit:',
+    'MAX_WAIT': 300,                 # seconds a call waits for capacity before giving up without calling
+    'QUERY_MAX_WAIT': 2,             # seconds a search query waits; past that it skips the embedding
+    'DEFAULT_HOLD': 10,              # seconds to pause an API after a 429 without Retry-After
+    'IMAGE_TOKEN_ESTIMATE': 1600,    # tokens reserved for the page image in a Claude call
+    'TASK_RETRY_DELAY': 300,         # seconds before a document that ran out of Claude capacity is retried
+    'TASK_MAX_RETRIES': 5            # capacity retries before the document is marked FAILED
+}
+
 # Default Settings
 DEFAULTS = {
     'SEARCH_RESULTS_PER_PAGE': 12,
@@ -65,11 +87,104 @@ DEFAULTS = {
     'VECTOR_SIMILARITY_THRESHOLD': 0.7
 }
 
+# Query Embedding Cache Settings
+EMBEDDING_CACHE_SETTINGS = {
+    'MAX_ENTRIES': 2048,             # in-process LRU size
+    'TTL': 604800,                   # 7 days
+    'KEY_PREFIX': 'query_embedding:'
+}
+
+# Relevance Ranking Settings
+SEARCH_RANKING_SETTINGS = {
+    'FUSION_METHOD': 'rrf',          # 'rrf' or 'weighted'
+    'RRF_K': 60,                     # reciprocal rank fusion damping constant
+    'KEYWORD_WEIGHT': 1.0,
+    'VECTOR_WEIGHT': 1.0,
+    'KEYWORD_CANDIDATES': 1000       # maximum keyword matches ranked per query
+}
+
+# Batch Search API Settings
+BATCH_SEARCH_SETTINGS = {
+    'MAX_QUERIES': 500,              # queries accepted per /api/search/batch request
+    'MAX_PER_PAGE': 100,             # page size cap per query
+    'EMBEDDING_BATCH_SIZE': 256      # texts per embeddings API call
+}
+
+# Full-Text Search Settings
+FULL_TEXT_SEARCH_SETTINGS = {
+    'CONFIG': 'english',             # text search configuration
+    'WEIGHTS': [0.1, 0.2, 0.4, 1.0], # ts_rank_cd weights for D, C, B, A
+                                     # A filename/summary, B main_message, C text_content, D the rest
+    'NORMALIZATION': 1,              # divide the rank by 1 + log(document length)
+    'MAX_TERMS': 32,                 # expanded terms compiled into one tsquery
+    'PREFIX_MIN_LENGTH': 3           # shorter final words are not prefix-matched
+}
+
+# Trigram Fallback Settings (pg_trgm over search_documents.search_text)
+TRIGRAM_SEARCH_SETTINGS = {
+    'WORD_SIMILARITY_THRESHOLD': 0.5 # least word similarity (0-1) for a fuzzy match
+}
+
+# Denormalized Search Table Settings
+SEARCH_DOCUMENT_SETTINGS = {
+    'REBUILD_BATCH_SIZE': 1000       # documents per refresh_search_documents() call when rebuilding
+}
+
+# Search Result Card Snapshot Settings
+DOCUMENT_CARD_SETTINGS = {
+    'VERSION': 1,                    # bump when the card fields change; older cards are rebuilt
+    'MAX_KEYWORDS': 25,              # keywords kept per card, most relevant first
+    'REBUILD_BATCH_SIZE': 500        # documents per statement when rebuilding all cards
+}
+
+# In-process Vector Index Settings
+VECTOR_INDEX_SETTINGS = {
+    'TOP_K': 500,                    # maximum documents returned per query
+    'NPROBE': 8,                     # IVF lists scanned per query
+    'BRUTE_FORCE_THRESHOLD': 2000,   # exact scan below this many vectors
+    'REFRESH_INTERVAL': 30,          # seconds between incremental refreshes
+    'FULL_RELOAD_INTERVAL': 3600     # seconds between full reloads
+}
+
+# In-process Taxonomy Index Settings
+TAXONOMY_INDEX_SETTINGS = {
+    'VERSION_CHECK_INTERVAL': 30,    # seconds between taxonomy version checks
+    'FULL_RELOAD_INTERVAL': 3600,    # seconds between unconditional reloads
+    'FREQUENCY_REFRESH_INTERVAL': 300,  # seconds between document frequency refreshes
+    'SUGGESTION_LIMIT': 10,          # autocomplete suggestions returned
+    'SUGGESTION_MAX_AGE': 60         # seconds clients may reuse an autocomplete response
+}
+
+# In-process Filter Index Settings
+FILTER_INDEX_SETTINGS = {
+    'REFRESH_INTERVAL': 30,          # seconds between incremental refreshes
+    'FULL_RELOAD_INTERVAL': 3600,    # seconds between full reloads
+    'FACET_LIMIT': 20                # values returned per filter facet
+}
+
+# Shared HTTP Client Settings (override with HTTP_<NAME> environment variables)
+HTTP_CLIENT_SETTINGS = {
+    'MAX_CONNECTIONS': 20,           # per upstream, per process
+    'MAX_KEEPALIVE_CONNECTIONS': 10,
+    'KEEPALIVE_EXPIRY': 60.0,        # seconds an idle connection is kept
+    'TIMEOUT': 60.0,                 # default request timeout in seconds
+    'CONNECT_TIMEOUT': 10.0,
+    'HTTP2': True,                   # used when the h2 package is installed
+    'LOOP_TIMEOUT': 120.0            # seconds sync callers wait on the shared loop
+}
+
 # Model Settings
 MODEL_SETTINGS = {
     'CLAUDE': {
         'MODEL': 'claude-3-opus-20240229',
-        'MAX_TOKENS': 4096
+        'MAX_TOKENS': 4096,
+        'OUTPUT_TOKEN_LIMITS': {     # most output tokens per response, by model name prefix; others get MAX_TOKENS
+            'claude-3-5-sonnet': 8192,
+            'claude-3-5-haiku': 8192,
+            'claude-3-7-sonnet': 64000,
+            'claude-sonnet-4': 64000,
+            'claude-opus-4': 32000
+        }
     },
     'EMBEDDINGS': {
         'MODEL': 'text-embedding-3-small',
@@ -77,6 +192,35 @@ MODEL_SETTINGS = {
     }
 }
 
+# LLM Document Analysis Settings
+LLM_ANALYSIS_SETTINGS = {
+    'MODE': 'fused',                 # 'fused' groups components into one call, 'modular' calls each (LLM_ANALYSIS_MODE)
+    'FUSED_GROUPS': [                # components asked for together in fused mode; each fits the default model's output
+        ['metadata', 'text', 'classification', 'entities'],
+        ['design', 'keywords', 'communication']
+    ],
+    'FUSED_TOKENS_PER_COMPONENT': 1024,  # output budget per section; groups the model cannot fit run modular
+    'MAX_PARALLEL_COMPONENTS': 4,    # concurrent Claude calls per document (LLM_MAX_PARALLEL_COMPONENTS); 1 runs in order
+    'METADATA_DEPENDENT_COMPONENTS': [  # wait for the metadata result and use it as prompt context
+        'classification', 'entities', 'keywords', 'communication'
+    ]
+}
+
+# LLM Response Cache Settings
+LLM_RESPONSE_CACHE_SETTINGS = {
+    'ENABLED': True,                 # reuse stored responses for identical files (LLM_RESPONSE_CACHE)
+    'MAX_BYTES': 512 * 1024 * 1024,  # total response size kept before eviction
+    'EVICT_TO_FRACTION': 0.9,        # eviction keeps the most recently used entries up to this share
+    'EVICT_CHECK_INTERVAL': 60       # seconds between total size checks
+}
+
+# Per-document Working Set Settings
+WORKING_SET_SETTINGS = {
+    'SCRATCH_ROOTS': ['/dev/shm'],   # tmpfs tried first; DOCUMENT_SCRATCH_DIR overrides, system temp dir is the fallback
+    'MIN_FREE_BYTES': 256 * 1024 * 1024,  # skip a scratch root with less space free
+    'RASTER_DPI': 200                # first page rendering sent to Claude
+}
+
 # Error Messages
 ERROR_MESSAGES = {
     'FILE_NOT_FOUND': 'The requested file could not be found.',
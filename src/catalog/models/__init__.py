@@ -1,11 +1,12 @@
 from src.catalog.models.document import (
     Document, BatchJob, LLMAnalysis, ExtractedText,
     DesignElement, Classification, LLMKeyword, Client,
-    Entity, CommunicationFocus, DropboxSync
+    Entity, CommunicationFocus, DropboxSync, DocumentCard,
+    SearchDocument, LLMResponseCacheEntry
 )
 
 from src.catalog.models.keyword import (
-    KeywordTaxonomy, KeywordSynonym, SearchFeedback
+    KeywordTaxonomy, KeywordSynonym, SearchFeedback, TaxonomyFacetCount
 )
 
 from src.catalog.models.scoring import DocumentScorecard
@@ -14,5 +15,6 @@ __all__ = [
     "Document", "BatchJob", "LLMAnalysis", "ExtractedText",
     "DesignElement", "Classification", "LLMKeyword", "Client",
     "Entity", "CommunicationFocus", "KeywordTaxonomy", "KeywordSynonym",
-    "SearchFeedback", "DocumentScorecard", "DropboxSync"
+    "SearchFeedback", "DocumentScorecard", "DropboxSync", "TaxonomyFacetCount",
+    "DocumentCard", "SearchDocument", "LLMResponseCacheEntry"
 ]
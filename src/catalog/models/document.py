@@ -1,6 +1,11 @@
 from src.catalog import db
 from datetime import datetime
-from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
+
+try:
+    from pgvector.sqlalchemy import Vector
+except ImportError:
+    Vector = None
 
 
 class BatchJob(db.Model):
@@ -25,22 +30,69 @@ class Document(db.Model):
     page_count = db.Column(db.Integer, nullable=False)
     status = db.Column(db.Text, nullable=False)
     batch_jobs_id = db.Column(db.Integer, db.ForeignKey('batch_jobs.id'))
+    # Superseded by search_documents.search_vector; no longer maintained
     search_vector = db.Column(TSVECTOR)
+    if Vector is not None:
+        embeddings = db.Column(Vector(1536))
+        embedding_date = db.Column(db.DateTime(timezone=True))
 
+    # Relationships load lazily; call sites pick what to eager-load with a
+    # named profile from utils.query_builders.DOCUMENT_LOADING_PROFILES
     scorecard = db.relationship(
         'DocumentScorecard', backref='document_parent', uselist=False, cascade="all, delete-orphan")
     llm_analysis = db.relationship(
-        'LLMAnalysis', backref='document', lazy='joined', uselist=False)
+        'LLMAnalysis', backref='document', lazy='select', uselist=False)
     extracted_text = db.relationship(
-        'ExtractedText', backref='document', lazy='joined', uselist=False)
+        'ExtractedText', backref='document', lazy='select', uselist=False)
     design_elements = db.relationship(
-        'DesignElement', backref='document', lazy='joined', uselist=False)
+        'DesignElement', backref='document', lazy='select', uselist=False)
     classification = db.relationship(
-        'Classification', backref='document', lazy='joined', uselist=False)
+        'Classification', backref='document', lazy='select', uselist=False)
     entity = db.relationship('Entity', backref='document',
-                             lazy='joined', uselist=False)
+                             lazy='select', uselist=False)
     communication_focus = db.relationship(
-        'CommunicationFocus', backref='document', lazy='joined', uselist=False)
+        'CommunicationFocus', backref='document', lazy='select', uselist=False)
+
+
+class DocumentCard(db.Model):
+    """
+    Precomputed search result card for a document: the analysis fields and
+    top keywords a result shows, rewritten by the worker after processing
+    """
+    __tablename__ = 'document_cards'
+    document_id = db.Column(db.Integer, db.ForeignKey(
+        'documents.id', ondelete='CASCADE'), primary_key=True)
+    version = db.Column(db.Integer, nullable=False)
+    card = db.Column(JSONB, nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True),
+                           nullable=False, default=datetime.utcnow)
+
+
+class SearchDocument(db.Model):
+    """
+    Denormalized search row for a document: the combined weighted text
+    vector, the filter columns and the embeddings. Maintained by the
+    refresh_search_documents() triggers; every search strategy reads only
+    this table.
+    """
+    __tablename__ = 'search_documents'
+    document_id = db.Column(db.Integer, db.ForeignKey(
+        'documents.id', ondelete='CASCADE'), primary_key=True)
+    filename = db.Column(db.Text, nullable=False)
+    search_vector = db.deferred(db.Column(TSVECTOR, nullable=False))
+    # Lowercased headline fields for the trigram fallback
+    search_text = db.deferred(db.Column(db.Text, nullable=False, default=''))
+    election_year = db.Column(db.Text)
+    document_tone = db.Column(db.Text)
+    campaign_type = db.Column(db.Text)
+    # Lowercased and trimmed geographic location
+    location = db.Column(db.Text)
+    taxonomy_ids = db.Column(ARRAY(db.Integer), nullable=False, default=list)
+    if Vector is not None:
+        embedding = db.deferred(db.Column(Vector(1536)))
+        analysis_embedding = db.deferred(db.Column(Vector(1536)))
+    updated_at = db.Column(db.DateTime(timezone=True),
+                           nullable=False, default=datetime.utcnow)
 
 
 class Entity(db.Model):
@@ -97,8 +149,37 @@ class LLMAnalysis(db.Model):
     confidence_score = db.Column(db.Float)
     analysis_date = db.Column(db.DateTime(timezone=True))
     model_version = db.Column(db.Text)
-
-    keywords = db.relationship('LLMKeyword', backref='analysis', lazy='joined')
+    # Superseded by search_documents.search_vector; no longer maintained
+    search_vector = db.deferred(db.Column(TSVECTOR))
+    if Vector is not None:
+        embeddings = db.Column(Vector(1536))
+        embedding_date = db.Column(db.DateTime(timezone=True))
+
+    keywords = db.relationship('LLMKeyword', backref='analysis', lazy='select')
+
+
+class LLMResponseCacheEntry(db.Model):
+    """
+    Stored Claude response for one analysis component of a file, keyed by
+    the file's SHA-256, the component, its prompt template hash and the model
+    """
+    __tablename__ = 'llm_response_cache'
+    __table_args__ = (
+        db.UniqueConstraint('file_sha256', 'component', 'prompt_hash', 'model',
+                            name='uq_llm_response_cache_key'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    file_sha256 = db.Column(db.String(64), nullable=False)
+    component = db.Column(db.Text, nullable=False)
+    prompt_hash = db.Column(db.String(64), nullable=False)
+    model = db.Column(db.Text, nullable=False)
+    response = db.Column(JSONB, nullable=False)
+    size_bytes = db.Column(db.Integer, nullable=False)
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime(timezone=True),
+                           nullable=False, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime(timezone=True),
+                             nullable=False, default=datetime.utcnow)
 
 
 class Client(db.Model):
@@ -121,7 +202,7 @@ class LLMKeyword(db.Model):
     taxonomy_id = db.Column(db.Integer, db.ForeignKey(
         'keyword_taxonomy.id'), nullable=True)
     taxonomy = db.relationship(
-        'KeywordTaxonomy', backref='llm_keywords', lazy='joined')
+        'KeywordTaxonomy', backref='llm_keywords', lazy='select')
 
 
 class Classification(db.Model):
@@ -146,6 +227,8 @@ class ExtractedText(db.Model):
     opponent_name = db.Column(db.Text)
     confidence = db.Column(db.BigInteger)
     extraction_date = db.Column(db.DateTime(timezone=True))
+    # Superseded by search_documents.search_vector; no longer maintained
+    search_vector = db.deferred(db.Column(TSVECTOR))
 
 
 class DropboxSync(db.Model):
@@ -91,6 +91,24 @@ class KeywordSynonym(db.Model):
         return f"<KeywordSynonym {self.synonym}>"
 
 
+class TaxonomyFacetCount(db.Model):
+    """
+    Number of documents tagged under each taxonomy facet.
+    Rows exist per primary category, subcategory and term ('level'); the
+    parts a level doesn't use hold an empty string so the key stays a plain
+    primary key. Maintained incrementally whenever keywords are written.
+    """
+    __tablename__ = 'taxonomy_facet_counts'
+    level = db.Column(db.String(16), primary_key=True)
+    primary_category = db.Column(db.Text, primary_key=True)
+    subcategory = db.Column(db.Text, primary_key=True, default='')
+    term = db.Column(db.Text, primary_key=True, default='')
+    document_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TaxonomyFacetCount {self.level} {self.primary_category}/{self.subcategory}/{self.term}={self.document_count}>"
+
+
 class SearchFeedback(db.Model):
     """
     User feedback on search results for improving search functionality.
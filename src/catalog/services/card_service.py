@@ -0,0 +1,214 @@
+# src/catalog/services/card_service.py
+"""
+Precomputed search result cards.
+
+document_cards holds one JSONB snapshot per document with the analysis
+fields a search result shows (summary, type, year, tone, client and
+opponent, location, audience, primary issue, main message and the top
+keywords). The worker rewrites a document's card when processing finishes,
+and the search plan joins the table by primary key instead of assembling
+five relations and the keyword list for every result row.
+
+The live document columns (filename, status, upload date) are read with the
+page, and previews stay in the preview cache: they are base64 images, far
+larger than the rest of the card.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import func, select, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+
+from src.catalog import db
+from src.catalog.constants import DOCUMENT_CARD_SETTINGS
+from src.catalog.models import (
+    CommunicationFocus, DesignElement, Document, DocumentCard, Entity,
+    ExtractedText, LLMAnalysis, LLMKeyword
+)
+
+logger = logging.getLogger(__name__)
+
+
+def card_from_row(row) -> Dict:
+    """
+    Card fields for one row of the card statement
+
+    Args:
+        row: Row with the analysis, entity, design, focus, text and keyword columns
+
+    Returns:
+        Card dictionary, in the key order of a search result
+    """
+    keywords = (row.keywords or [])[:DOCUMENT_CARD_SETTINGS['MAX_KEYWORDS']]
+    return {
+        'summary': row.summary_description or '',
+        'document_type': row.campaign_type or '',
+        'election_year': row.election_year or '',
+        'document_tone': row.document_tone or '',
+        'client': row.client_name or '',
+        'opponent': row.opponent_name or '',
+        'location': row.geographic_location or '',
+        'target_audience': row.target_audience or '',
+        'primary_issue': row.primary_issue or '',
+        'main_message': row.main_message or '',
+        'hierarchical_keywords': [
+            {
+                'term': kw['term'],
+                'primary_category': kw['category'],
+                'subcategory': '',  # LLMKeyword doesn't have subcategory
+                'relevance_score': kw['relevance_score'] / 100 if kw['relevance_score'] else 0
+            } for kw in keywords
+        ]
+    }
+
+
+class DocumentCardService:
+    """Builds, stores and repairs the document_cards snapshots"""
+
+    def _card_statement(self, document_ids: List[int]):
+        """Every card field for the given documents, one row each"""
+        def related(model, *columns):
+            """Latest row of a per-document relation, joined laterally"""
+            return select(*columns).where(
+                model.document_id == Document.id
+            ).order_by(model.id.desc()).limit(1).lateral()
+
+        analysis = related(LLMAnalysis, LLMAnalysis.id, LLMAnalysis.summary_description,
+                           LLMAnalysis.campaign_type, LLMAnalysis.election_year,
+                           LLMAnalysis.document_tone)
+        entity = related(Entity, Entity.client_name, Entity.opponent_name)
+        design = related(DesignElement, DesignElement.geographic_location,
+                         DesignElement.target_audience)
+        focus = related(CommunicationFocus, CommunicationFocus.primary_issue)
+        extracted = related(ExtractedText, ExtractedText.main_message)
+        keywords = select(
+            func.json_agg(aggregate_order_by(
+                func.json_build_object(
+                    'term', LLMKeyword.keyword,
+                    'category', LLMKeyword.category,
+                    'relevance_score', LLMKeyword.relevance_score
+                ),
+                LLMKeyword.relevance_score.desc().nullslast(),
+                LLMKeyword.id
+            )).label('keywords')
+        ).where(LLMKeyword.llm_analysis_id == analysis.c.id).lateral()
+
+        return select(
+            Document.id,
+            analysis.c.summary_description, analysis.c.campaign_type,
+            analysis.c.election_year, analysis.c.document_tone,
+            entity.c.client_name, entity.c.opponent_name,
+            design.c.geographic_location, design.c.target_audience,
+            focus.c.primary_issue, extracted.c.main_message,
+            keywords.c.keywords
+        ).select_from(Document).outerjoin(
+            analysis, true()
+        ).outerjoin(
+            entity, true()
+        ).outerjoin(
+            design, true()
+        ).outerjoin(
+            focus, true()
+        ).outerjoin(
+            extracted, true()
+        ).outerjoin(
+            keywords, true()
+        ).where(Document.id.in_(document_ids))
+
+    def build(self, document_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Compute cards from the analysis tables without storing them
+
+        Args:
+            document_ids: Document IDs
+
+        Returns:
+            Dictionary mapping document ID to card; unknown IDs are left out
+        """
+        if not document_ids:
+            return {}
+        rows = db.session.execute(self._card_statement(document_ids)).all()
+        return {row.id: card_from_row(row) for row in rows}
+
+    def refresh(self, document_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Rebuild and upsert cards; the caller commits
+
+        Args:
+            document_ids: Documents whose analysis changed
+
+        Returns:
+            Dictionary mapping document ID to the card written
+        """
+        cards = self.build(document_ids)
+        if not cards:
+            return cards
+
+        now = datetime.utcnow()
+        stmt = insert(DocumentCard.__table__).values([
+            {'document_id': document_id, 'version': DOCUMENT_CARD_SETTINGS['VERSION'],
+             'card': card, 'updated_at': now}
+            for document_id, card in cards.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['document_id'],
+            set_={'version': stmt.excluded.version, 'card': stmt.excluded.card,
+                  'updated_at': stmt.excluded.updated_at}
+        )
+        db.session.execute(stmt)
+        return cards
+
+    def ensure(self, document_ids: List[int]) -> Dict[int, Dict]:
+        """
+        Cards for documents found without a current snapshot, stored for next time
+
+        Used on the read path, so a failed write still returns the cards.
+
+        Args:
+            document_ids: Documents missing a current card
+
+        Returns:
+            Dictionary mapping document ID to card
+        """
+        try:
+            cards = self.refresh(document_ids)
+            db.session.commit()
+            return cards
+        except Exception as e:
+            logger.error(f"Error storing document cards: {str(e)}")
+            db.session.rollback()
+            try:
+                return self.build(document_ids)
+            except Exception as build_error:
+                logger.error(f"Error building document cards: {str(build_error)}")
+                return {}
+
+    def rebuild_all(self) -> int:
+        """
+        Rewrite the card of every document, in batches
+
+        Returns:
+            Number of cards written
+        """
+        written = 0
+        last_id = 0
+        batch_size = DOCUMENT_CARD_SETTINGS['REBUILD_BATCH_SIZE']
+        while True:
+            document_ids = [
+                document_id for (document_id,) in db.session.query(Document.id)
+                .filter(Document.id > last_id)
+                .order_by(Document.id)
+                .limit(batch_size)
+            ]
+            if not document_ids:
+                break
+            written += len(self.refresh(document_ids))
+            db.session.commit()
+            last_id = document_ids[-1]
+        return written
+
+
+# Shared instance
+document_cards = DocumentCardService()
@@ -0,0 +1,227 @@
+# src/catalog/services/embedding_cache.py
+"""
+Two-tier cache for search query embeddings.
+
+An in-process LRU answers repeated queries without leaving the worker, and a
+Redis tier keeps vectors across restarts and between workers. Concurrent
+requests for the same uncached query share a single upstream call.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Awaitable, Callable, List, Optional
+
+import numpy as np
+
+from src.catalog.constants import EMBEDDING_CACHE_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query_text(text: str) -> str:
+    """Lowercase and collapse whitespace so equivalent queries share a key"""
+    return re.sub(r'\s+', ' ', text.strip().lower())
+
+
+class QueryEmbeddingCache:
+    """LRU + Redis cache of query embeddings with single-flight computation"""
+
+    def __init__(self, max_entries: int, ttl: int, key_prefix: str):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._in_flight = {}
+
+        self._redis = None
+        self._redis_retry_at = 0.0
+
+        self.stats = {'memory_hits': 0, 'redis_hits': 0,
+                      'misses': 0, 'coalesced': 0}
+
+    def make_key(self, text: str, model: str) -> str:
+        """Hash of the model and normalised text"""
+        digest = hashlib.sha256(
+            f"{model}\n{normalize_query_text(text)}".encode('utf-8')).hexdigest()
+        return f"{self.key_prefix}{digest}"
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Look up an embedding in memory, then in Redis"""
+        vector = self._memory_get(key)
+        if vector is not None:
+            return vector
+
+        vector = self._redis_get(key)
+        if vector is not None:
+            self.stats['redis_hits'] += 1
+            self._remember(key, vector)
+        return vector
+
+    def set(self, key: str, vector: List[float]):
+        """Store an embedding in both tiers"""
+        self._remember(key, vector)
+        self._redis_set(key, vector)
+
+    async def get_async(self, key: str) -> Optional[List[float]]:
+        """get() for coroutines; the Redis lookup runs in the default executor"""
+        vector = self._memory_get(key)
+        if vector is not None:
+            return vector
+
+        vector = await asyncio.get_running_loop().run_in_executor(
+            None, self._redis_get, key)
+        if vector is not None:
+            self.stats['redis_hits'] += 1
+            self._remember(key, vector)
+        return vector
+
+    async def set_async(self, key: str, vector: List[float]):
+        """set() for coroutines; the Redis write runs in the default executor"""
+        self._remember(key, vector)
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._redis_set, key, vector)
+
+    async def get_or_compute(self, text: str, model: str,
+                             compute: Callable[[], Awaitable[Optional[List[float]]]]) -> Optional[List[float]]:
+        """
+        Return the cached embedding for text, computing it at most once
+
+        Requests from other threads that arrive while the embedding is being
+        looked up in Redis or computed wait for that result instead of
+        calling the API again.
+
+        Args:
+            text: Text that will be embedded
+            model: Embedding model name
+            compute: Coroutine function producing the embedding
+
+        Returns:
+            Embedding vector, or None if it could not be generated
+        """
+        key = self.make_key(text, model)
+
+        # Check memory and register as leader in one step: a leader stores
+        # its result in memory before leaving _in_flight, so a request that
+        # finds neither is the only one to go upstream
+        with self._lock:
+            vector = self._memory_get_locked(key)
+            if vector is not None:
+                return vector
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            return await asyncio.wrap_future(future)
+
+        loop = asyncio.get_running_loop()
+        try:
+            vector = await loop.run_in_executor(None, self._redis_get, key)
+            if vector is not None:
+                self.stats['redis_hits'] += 1
+                self._remember(key, vector)
+                future.set_result(vector)
+                return vector
+
+            self.stats['misses'] += 1
+            vector = await compute()
+            if vector:
+                self._remember(key, vector)
+            future.set_result(vector)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+        if vector:
+            await loop.run_in_executor(None, self._redis_set, key, vector)
+        return vector
+
+    def _memory_get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            return self._memory_get_locked(key)
+
+    def _memory_get_locked(self, key: str) -> Optional[List[float]]:
+        """In-process lookup; the caller holds _lock"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, vector = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.stats['memory_hits'] += 1
+        return vector
+
+    def _remember(self, key: str, vector: List[float]):
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_redis(self):
+        """Connect lazily; back off for a minute after a connection failure"""
+        if self._redis is not None or time.time() < self._redis_retry_at:
+            return self._redis
+
+        try:
+            import redis
+            from src.catalog.config import get_redis_uri
+
+            self._redis = redis.Redis.from_url(
+                get_redis_uri(), socket_timeout=0.5, socket_connect_timeout=0.5)
+        except Exception as e:
+            logger.warning(f"Query embedding cache running without Redis: {str(e)}")
+            self._redis_retry_at = time.time() + 60
+        return self._redis
+
+    def _redis_get(self, key: str) -> Optional[List[float]]:
+        client = self._get_redis()
+        if client is None:
+            return None
+        try:
+            payload = client.get(key)
+            if payload is None:
+                return None
+            return np.frombuffer(payload, dtype=np.float32).tolist()
+        except Exception as e:
+            logger.warning(f"Query embedding cache read failed: {str(e)}")
+            self._redis = None
+            self._redis_retry_at = time.time() + 60
+            return None
+
+    def _redis_set(self, key: str, vector: List[float]):
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            client.setex(key, self.ttl, np.asarray(
+                vector, dtype=np.float32).tobytes())
+        except Exception as e:
+            logger.warning(f"Query embedding cache write failed: {str(e)}")
+            self._redis = None
+            self._redis_retry_at = time.time() + 60
+
+
+# Shared per-process cache
+query_embedding_cache = QueryEmbeddingCache(
+    max_entries=EMBEDDING_CACHE_SETTINGS['MAX_ENTRIES'],
+    ttl=EMBEDDING_CACHE_SETTINGS['TTL'],
+    key_prefix=EMBEDDING_CACHE_SETTINGS['KEY_PREFIX']
+)
@@ -6,6 +6,7 @@ from sqlalchemy import func, case, select
 from src.catalog import db
 from src.catalog.models import Document, DocumentScorecard
 from src.catalog.models import LLMAnalysis, ExtractedText, DesignElement, Entity, Classification
+from src.catalog.utils.query_builders import get_document
 
 logger = logging.getLogger(__name__)
 
@@ -205,7 +206,7 @@ class EvaluationService:
     def evaluate_batch1(self, document_id):
         """Evaluate Batch 1 components - metadata and text extraction"""
         try:
-            document = Document.query.get(document_id)
+            document = get_document(document_id, 'status_only')
             if not document:
                 logger.error(f"Document {document_id} not found")
                 return False, "Document not found"
@@ -335,7 +336,7 @@ class EvaluationService:
     def evaluate_batch2(self, document_id):
         """Evaluate Batch 2 components - classification, entity, design"""
         try:
-            document = Document.query.get(document_id)
+            document = get_document(document_id, 'status_only')
             if not document:
                 logger.error(f"Document {document_id} not found")
                 return False, "Document not found"
@@ -449,7 +450,7 @@ class EvaluationService:
     def evaluate_batch3(self, document_id):
         """Evaluate Batch 3 components - keywords, communication focus"""
         try:
-            document = Document.query.get(document_id)
+            document = get_document(document_id, 'status_only')
             if not document:
                 logger.error(f"Document {document_id} not found")
                 return False, "Document not found"
@@ -0,0 +1,107 @@
+# src/catalog/services/facet_service.py
+"""
+Materialized taxonomy facet counts.
+
+taxonomy_facet_counts holds the number of documents tagged under every
+primary category, subcategory and term. Statement triggers on llm_keywords
+add the facets a document gained and subtract the ones it lost in the
+writing transaction, whichever code path (or cascade) changed the keywords,
+and renaming taxonomy terms recounts the table. The sidebar reads counts by
+key instead of grouping the keyword tables on every request.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from src.catalog import db
+from src.catalog.models import KeywordTaxonomy, TaxonomyFacetCount
+
+logger = logging.getLogger(__name__)
+
+class FacetService:
+    """Reads and repairs the taxonomy_facet_counts table"""
+
+    def rebuild(self) -> int:
+        """
+        Recompute every facet count from the keyword tables
+
+        Returns:
+            Number of facet rows written
+        """
+        written = db.session.execute(select(func.rebuild_taxonomy_facet_counts())).scalar()
+        db.session.commit()
+        return written
+
+    def get_facets(self, selected_primary: Optional[str] = None,
+                   selected_subcategory: Optional[str] = None,
+                   selected_term: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """
+        Taxonomy facets for sidebar filtering
+
+        Args:
+            selected_primary: Selected primary category
+            selected_subcategory: Selected subcategory
+            selected_term: Selected term
+
+        Returns:
+            Dictionary of primary_categories, subcategories and terms, each a
+            list of {'name', 'count', 'selected'}
+        """
+        primary_categories = self._counts('primary', TaxonomyFacetCount.primary_category)
+
+        # Before any documents are tagged, show the vocabulary itself
+        if not primary_categories:
+            primary_categories = db.session.query(
+                KeywordTaxonomy.primary_category,
+                func.count(KeywordTaxonomy.id).label('count')
+            ).filter(
+                KeywordTaxonomy.primary_category.isnot(None)
+            ).group_by(
+                KeywordTaxonomy.primary_category
+            ).order_by(
+                KeywordTaxonomy.primary_category
+            ).all()
+
+        subcategories = []
+        if selected_primary:
+            subcategories = self._counts(
+                'subcategory', TaxonomyFacetCount.subcategory,
+                TaxonomyFacetCount.primary_category == selected_primary)
+
+        terms = []
+        if selected_primary and selected_subcategory:
+            terms = self._counts(
+                'term', TaxonomyFacetCount.term,
+                TaxonomyFacetCount.primary_category == selected_primary,
+                TaxonomyFacetCount.subcategory == selected_subcategory)
+
+        return {
+            'primary_categories': [
+                {'name': name, 'count': count, 'selected': name == selected_primary}
+                for name, count in primary_categories if name
+            ],
+            'subcategories': [
+                {'name': name, 'count': count, 'selected': name == selected_subcategory}
+                for name, count in subcategories if name
+            ],
+            'terms': [
+                {'name': name, 'count': count, 'selected': name == selected_term}
+                for name, count in terms if name
+            ]
+        }
+
+    @staticmethod
+    def _counts(level, name_column, *conditions):
+        return db.session.query(
+            name_column, TaxonomyFacetCount.document_count
+        ).filter(
+            TaxonomyFacetCount.level == level,
+            TaxonomyFacetCount.document_count > 0,
+            *conditions
+        ).order_by(name_column).all()
+
+
+# Shared instance
+facet_service = FacetService()
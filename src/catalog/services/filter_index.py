@@ -0,0 +1,435 @@
+# src/catalog/services/filter_index.py
+"""
+In-process bitmap index of the search filters.
+
+Every document gets a dense ordinal when the index loads. Each filter value
+(election year, tone, location and taxonomy term) keeps the ordinals of its
+documents, as a sorted array while that is smaller and as a packed bitmap
+of 64-bit words once it is not. A filter selection evaluates to one bitmap
+with NumPy AND/OR, facet counts are popcounts against it, and filtered
+browsing without a text query never joins the analysis tables.
+
+Rows come from search_documents. Rows whose updated_at has moved are
+applied on a fixed interval, so documents that finish processing become
+filterable without a restart.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import text
+
+from src.catalog import db
+from src.catalog.constants import FILTER_INDEX_SETTINGS
+from src.catalog.services.taxonomy_index import taxonomy_index
+
+logger = logging.getLogger(__name__)
+
+WORD_BITS = 64
+
+# Single-valued filter columns of search_documents; taxonomy is multi-valued
+VALUE_FIELDS = ('election_year', 'document_tone', 'location')
+
+
+def words_for(capacity: int) -> int:
+    """Number of 64-bit words holding one bit per ordinal"""
+    return (capacity + WORD_BITS - 1) // WORD_BITS
+
+
+def _bits(ordinals: np.ndarray) -> np.ndarray:
+    return np.left_shift(np.uint64(1), (ordinals & (WORD_BITS - 1)).astype(np.uint64))
+
+
+def popcount(words: np.ndarray) -> int:
+    """Number of set bits in a word array"""
+    if hasattr(np, 'bitwise_count'):
+        return int(np.bitwise_count(words).sum())
+    return int(np.unpackbits(words.view(np.uint8)).sum())
+
+
+def ordinals_to_words(ordinals: np.ndarray, n_words: int) -> np.ndarray:
+    """Packed bitmap with the given ordinals set"""
+    words = np.zeros(n_words, dtype=np.uint64)
+    if len(ordinals):
+        np.bitwise_or.at(words, ordinals >> 6, _bits(ordinals))
+    return words
+
+
+def words_to_ordinals(words: np.ndarray) -> np.ndarray:
+    """Sorted ordinals of the set bits"""
+    # Bit i of word w is ordinal 64 * w + i; read the words little-endian
+    # so the unpacked bits come out in that order
+    return np.flatnonzero(np.unpackbits(
+        words.astype('<u8', copy=False).view(np.uint8), bitorder='little'))
+
+
+def _pad(words: np.ndarray, n_words: int) -> np.ndarray:
+    if len(words) >= n_words:
+        return words[:n_words]
+    return np.concatenate([words, np.zeros(n_words - len(words), dtype=np.uint64)])
+
+
+class Bitmap:
+    """
+    Set of ordinals, stored sparse (sorted int64 array) or dense (packed
+    uint64 words), whichever is smaller
+    """
+
+    __slots__ = ('ordinals', 'words', 'count')
+
+    def __init__(self, ordinals: Optional[Iterable[int]] = None):
+        self.ordinals = np.unique(np.asarray(
+            list(ordinals) if ordinals is not None else [], dtype=np.int64))
+        self.words = None
+        self.count = len(self.ordinals)
+        self._compact()
+
+    def _compact(self):
+        """Switch representation when the other one would be smaller"""
+        # Both cost 8 bytes per entry: one per member, or one per 64 ordinals
+        if self.words is None:
+            if self.count and self.count > words_for(int(self.ordinals[-1]) + 1):
+                self.words = ordinals_to_words(self.ordinals, words_for(int(self.ordinals[-1]) + 1))
+                self.ordinals = None
+        elif self.count < len(self.words) // 4:
+            # Only go back to sparse well below the break-even point
+            self.ordinals = words_to_ordinals(self.words).astype(np.int64)
+            self.words = None
+
+    def add(self, ordinal: int):
+        if self.words is not None:
+            word = ordinal >> 6
+            if word >= len(self.words):
+                self.words = _pad(self.words, max(word + 1, 2 * len(self.words)))
+            bit = np.uint64(1) << np.uint64(ordinal & (WORD_BITS - 1))
+            if not self.words[word] & bit:
+                self.words[word] |= bit
+                self.count += 1
+            return
+
+        position = np.searchsorted(self.ordinals, ordinal)
+        if position < len(self.ordinals) and self.ordinals[position] == ordinal:
+            return
+        self.ordinals = np.insert(self.ordinals, position, ordinal)
+        self.count += 1
+        self._compact()
+
+    def discard(self, ordinal: int):
+        if self.words is not None:
+            word = ordinal >> 6
+            bit = np.uint64(1) << np.uint64(ordinal & (WORD_BITS - 1))
+            if word < len(self.words) and self.words[word] & bit:
+                self.words[word] &= ~bit
+                self.count -= 1
+                self._compact()
+            return
+
+        position = np.searchsorted(self.ordinals, ordinal)
+        if position < len(self.ordinals) and self.ordinals[position] == ordinal:
+            self.ordinals = np.delete(self.ordinals, position)
+            self.count -= 1
+
+    def or_into(self, words: np.ndarray):
+        """Set this bitmap's bits in words, in place"""
+        if self.words is not None:
+            n_words = min(len(words), len(self.words))
+            words[:n_words] |= self.words[:n_words]
+        elif self.count:
+            ordinals = self.ordinals[self.ordinals < len(words) * WORD_BITS]
+            np.bitwise_or.at(words, ordinals >> 6, _bits(ordinals))
+
+    def count_in(self, words: np.ndarray) -> int:
+        """Number of members also set in words"""
+        if self.words is not None:
+            n_words = min(len(words), len(self.words))
+            return popcount(self.words[:n_words] & words[:n_words])
+        if not self.count:
+            return 0
+        ordinals = self.ordinals[self.ordinals < len(words) * WORD_BITS]
+        hits = np.right_shift(words[ordinals >> 6], (ordinals & (WORD_BITS - 1)).astype(np.uint64))
+        return int((hits & np.uint64(1)).sum())
+
+
+class _State:
+    """Ordinals and bitmaps of one load; refreshes update it in place"""
+
+    def __init__(self):
+        self.ordinals: Dict[int, int] = {}
+        self.document_ids = np.zeros(0, dtype=np.int64)
+        self.live = np.zeros(0, dtype=np.uint64)
+        self.size = 0
+        self.bitmaps: Dict[str, Dict] = {field: defaultdict(Bitmap)
+                                         for field in VALUE_FIELDS + ('taxonomy',)}
+        # Values currently indexed per ordinal, to undo them on update
+        self.values: Dict[int, Tuple] = {}
+
+    @property
+    def n_words(self):
+        return len(self.live)
+
+    def _ordinal(self, document_id: int) -> int:
+        ordinal = self.ordinals.get(document_id)
+        if ordinal is not None:
+            return ordinal
+
+        ordinal = self.size
+        self.size += 1
+        if ordinal >= len(self.document_ids):
+            capacity = max(1024, 2 * len(self.document_ids))
+            grown = np.zeros(capacity, dtype=np.int64)
+            grown[:len(self.document_ids)] = self.document_ids
+            self.document_ids = grown
+            self.live = _pad(self.live, words_for(capacity))
+        self.document_ids[ordinal] = document_id
+        self.ordinals[document_id] = ordinal
+        return ordinal
+
+    def _entries(self, values: Tuple):
+        """(field, value) pairs of a document's indexed values"""
+        for field, value in zip(VALUE_FIELDS, values[:-1]):
+            if value:
+                yield field, value
+        for taxonomy_id in values[-1]:
+            yield 'taxonomy', taxonomy_id
+
+    def build(self, rows: Iterable[Tuple[int, Tuple]]):
+        """Index (document_id, values) pairs in bulk, building each bitmap once"""
+        members = {field: defaultdict(list) for field in self.bitmaps}
+        for document_id, values in rows:
+            ordinal = self._ordinal(document_id)
+            self.values[ordinal] = values
+            for field, value in self._entries(values):
+                members[field][value].append(ordinal)
+
+        for field, by_value in members.items():
+            for value, ordinals in by_value.items():
+                self.bitmaps[field][value] = Bitmap(ordinals)
+        self.live = ordinals_to_words(np.arange(self.size, dtype=np.int64), self.n_words)
+
+    def upsert(self, document_id: int, values: Tuple):
+        ordinal = self._ordinal(document_id)
+        previous = self.values.get(ordinal)
+        if previous == values:
+            return
+        if previous is not None:
+            for field, value in self._entries(previous):
+                self.bitmaps[field][value].discard(ordinal)
+        for field, value in self._entries(values):
+            self.bitmaps[field][value].add(ordinal)
+        self.values[ordinal] = values
+        self.live[ordinal >> 6] |= np.uint64(1) << np.uint64(ordinal & (WORD_BITS - 1))
+
+
+class FilterIndex:
+    """Per-process bitmap index over the search_documents filter columns"""
+
+    _ROWS_SQL = """
+        SELECT document_id, election_year, document_tone, location, taxonomy_ids, updated_at
+        FROM search_documents
+    """
+    _COUNT_SQL = text("SELECT count(*) FROM search_documents")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Optional[_State] = None
+        self.available = True
+        self._watermark = None
+        self._last_refresh = 0.0
+        self._last_full_load = 0.0
+
+    @property
+    def ready(self):
+        """True when the index is loaded and can answer queries"""
+        return self._state is not None and self.available
+
+    @staticmethod
+    def _row_values(row) -> Tuple:
+        return (row.election_year, row.document_tone, row.location,
+                tuple(sorted(set(row.taxonomy_ids or ()))))
+
+    def _indexed_rows(self, rows):
+        """(document_id, values) pairs, advancing the watermark on the way"""
+        for row in rows:
+            if row.updated_at is not None and (self._watermark is None or row.updated_at > self._watermark):
+                self._watermark = row.updated_at
+            yield row.document_id, self._row_values(row)
+
+    def load(self):
+        """Read every search row and swap in freshly built bitmaps"""
+        with self._lock:
+            try:
+                started = time.time()
+                state = _State()
+                self._watermark = None
+                state.build(self._indexed_rows(db.session.execute(
+                    text(self._ROWS_SQL + " ORDER BY document_id"))))
+
+                self._state = state
+                self.available = True
+                self._last_refresh = self._last_full_load = time.time()
+                logger.info(
+                    f"Loaded filter index with {state.size} documents in "
+                    f"{time.time() - started:.2f}s")
+            except Exception as e:
+                # Leave the SQL filters in charge if search_documents is missing
+                logger.error(f"Failed to load filter index: {str(e)}")
+                db.session.rollback()
+                self.available = False
+
+    def refresh(self):
+        """Apply search rows written since the last load or refresh"""
+        with self._lock:
+            try:
+                state = self._state
+                if self._watermark is None:
+                    rows = db.session.execute(text(self._ROWS_SQL))
+                else:
+                    rows = db.session.execute(
+                        text(self._ROWS_SQL + " WHERE updated_at > :since"),
+                        {'since': self._watermark})
+                for document_id, values in self._indexed_rows(rows):
+                    state.upsert(document_id, values)
+                self._last_refresh = time.time()
+
+                # Deleted documents leave no row to notice; reload when the
+                # table holds fewer rows than the index
+                if db.session.execute(self._COUNT_SQL).scalar() < popcount(state.live):
+                    self._last_full_load = 0.0
+            except Exception as e:
+                logger.error(f"Failed to refresh filter index: {str(e)}")
+                db.session.rollback()
+
+    def ensure_fresh(self):
+        """Load on first use, then refresh on the configured intervals"""
+        if not self.available or self._lock.locked():
+            # Another thread is already loading; callers use SQL meanwhile
+            return
+        now = time.time()
+        if self._state is None or now - self._last_full_load > FILTER_INDEX_SETTINGS['FULL_RELOAD_INTERVAL']:
+            self.load()
+        elif now - self._last_refresh > FILTER_INDEX_SETTINGS['REFRESH_INTERVAL']:
+            self.refresh()
+
+    def _ready_state(self) -> Optional[_State]:
+        self.ensure_fresh()
+        return self._state if self.available else None
+
+    @staticmethod
+    def _union(state: _State, bitmaps: Iterable[Bitmap]) -> np.ndarray:
+        words = np.zeros(state.n_words, dtype=np.uint64)
+        for bitmap in bitmaps:
+            bitmap.or_into(words)
+        return words
+
+    def _evaluate(self, state: _State, filters: Dict) -> Optional[np.ndarray]:
+        """
+        Bitmap of live documents matching every filter set (AND across
+        filters, OR within one), or None if a filter can't be resolved here
+        """
+        words = state.live.copy()
+
+        filter_type = filters.get('filter_type', '')
+        if filter_type:
+            tones = state.bitmaps['document_tone']
+            words &= self._union(state, (tones[tone] for tone in filter_type.split(',') if tone in tones))
+
+        filter_year = filters.get('filter_year', '')
+        if filter_year:
+            years = state.bitmaps['election_year']
+            words &= self._union(state, [years[filter_year]] if filter_year in years else [])
+
+        filter_location = filters.get('filter_location', '')
+        if filter_location:
+            # Substring match, as the SQL LIKE filter does
+            needle = filter_location.strip().lower()
+            locations = state.bitmaps['location']
+            words &= self._union(state, (bitmap for location, bitmap in list(locations.items())
+                                         if needle in location))
+
+        primary_category = filters.get('primary_category', '')
+        if primary_category:
+            term_ids = taxonomy_index.term_ids(
+                primary_category, filters.get('subcategory', ''), filters.get('specific_term', ''))
+            if term_ids is None:
+                return None
+            taxonomy = state.bitmaps['taxonomy']
+            words &= self._union(state, (taxonomy[term_id] for term_id in term_ids if term_id in taxonomy))
+
+        return words
+
+    def matching_ids(self, filters: Dict) -> Optional[List[int]]:
+        """
+        IDs of the documents matching the filters
+
+        Args:
+            filters: Search filter parameters
+
+        Returns:
+            List of document IDs, or None when the index can't answer
+        """
+        state = self._ready_state()
+        if state is None:
+            return None
+        words = self._evaluate(state, filters)
+        if words is None:
+            return None
+        ordinals = words_to_ordinals(words)
+        return state.document_ids[ordinals].tolist()
+
+    def filter_ids(self, document_ids: List[int], filters: Dict) -> Optional[Set[int]]:
+        """
+        The subset of document_ids matching the filters
+
+        Returns:
+            Set of matching IDs, or None when the index can't answer
+        """
+        state = self._ready_state()
+        if state is None:
+            return None
+        words = self._evaluate(state, filters)
+        if words is None:
+            return None
+
+        allowed = set()
+        for document_id in document_ids:
+            ordinal = state.ordinals.get(document_id)
+            if ordinal is not None and (int(words[ordinal >> 6]) >> (ordinal & (WORD_BITS - 1))) & 1:
+                allowed.add(document_id)
+        return allowed
+
+    def facet_counts(self, filters: Dict, limit: Optional[int] = None) -> Optional[Dict[str, List[Dict]]]:
+        """
+        Document count per year, tone and location within the filtered set
+
+        Args:
+            filters: Search filter parameters selecting the candidate set
+            limit: Most values returned per field (default from settings)
+
+        Returns:
+            Dictionary of field to [{'value', 'count'}], largest first, or
+            None when the index can't answer
+        """
+        state = self._ready_state()
+        if state is None:
+            return None
+        candidates = self._evaluate(state, filters)
+        if candidates is None:
+            return None
+
+        limit = limit or FILTER_INDEX_SETTINGS['FACET_LIMIT']
+        facets = {}
+        for field in VALUE_FIELDS:
+            counts = [(value, bitmap.count_in(candidates))
+                      for value, bitmap in list(state.bitmaps[field].items())]
+            counts = sorted((item for item in counts if item[1]),
+                            key=lambda item: (-item[1], item[0]))
+            facets[field] = [{'value': value, 'count': count} for value, count in counts[:limit]]
+        return facets
+
+
+# Shared per-process index used by the search service
+filter_index = FilterIndex()
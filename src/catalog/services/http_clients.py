@@ -0,0 +1,206 @@
+# src/catalog/services/http_clients.py
+"""
+Process-wide HTTP clients and event loop for upstream API calls.
+
+Each upstream (OpenAI, Anthropic) gets one pooled client that keeps its
+connections alive between calls, so requests no longer pay TCP and TLS setup
+every time. Synchronous code runs coroutines on a single long-lived loop
+thread instead of creating an event loop per call. shutdown_http_clients()
+is wired to gunicorn's worker_exit and Celery's worker shutdown signals.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import weakref
+from typing import Any, Coroutine, Dict, Optional
+
+import httpx
+
+from src.catalog.constants import HTTP_CLIENT_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def _setting(name: str):
+    """HTTP_CLIENT_SETTINGS value, overridable with an HTTP_<NAME> environment variable"""
+    default = HTTP_CLIENT_SETTINGS[name]
+    value = os.getenv(f"HTTP_{name}")
+    if value is None:
+        return default
+    if isinstance(default, bool):
+        return value.lower() in ('1', 'true', 'yes')
+    return type(default)(value)
+
+
+def _client_options() -> Dict[str, Any]:
+    return {
+        'limits': httpx.Limits(
+            max_connections=_setting('MAX_CONNECTIONS'),
+            max_keepalive_connections=_setting('MAX_KEEPALIVE_CONNECTIONS'),
+            keepalive_expiry=_setting('KEEPALIVE_EXPIRY')
+        ),
+        'timeout': httpx.Timeout(_setting('TIMEOUT'), connect=_setting('CONNECT_TIMEOUT')),
+        'http2': _setting('HTTP2') and HTTP2_AVAILABLE,
+    }
+
+
+class BackgroundLoop:
+    """A single event loop running in a daemon thread, for synchronous callers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            # Threads don't survive fork; pre-forked workers start their own loop
+            if self._loop is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name='http-client-loop', daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None):
+        """
+        Run a coroutine on the shared loop and wait for its result
+
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait, defaulting to the LOOP_TIMEOUT setting
+
+        Returns:
+            The coroutine's result
+        """
+        loop = self._ensure_started()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("run() called from the shared loop thread; await the coroutine instead")
+
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        return future.result(timeout if timeout is not None else _setting('LOOP_TIMEOUT'))
+
+    def stop(self):
+        """Stop the loop thread"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+
+        if loop is None or self._pid != os.getpid():
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        return self._loop
+
+
+class HTTPClientPool:
+    """Named, pooled httpx clients shared by the whole process"""
+
+    def __init__(self, background_loop: BackgroundLoop):
+        self._background_loop = background_loop
+        self._lock = threading.Lock()
+        self._sync_clients: Dict[str, httpx.Client] = {}
+        # An AsyncClient is bound to the loop it first runs on, so keep one per loop
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+        self._pid = os.getpid()
+
+    def _check_fork(self):
+        # Connections inherited across fork are shared sockets; start over
+        if self._pid != os.getpid():
+            self._sync_clients = {}
+            self._async_clients = weakref.WeakKeyDictionary()
+            self._pid = os.getpid()
+
+    def sync_client(self, name: str) -> httpx.Client:
+        """Keep-alive client for blocking calls to one upstream"""
+        with self._lock:
+            self._check_fork()
+            client = self._sync_clients.get(name)
+            if client is None or client.is_closed:
+                client = httpx.Client(**_client_options())
+                self._sync_clients[name] = client
+            return client
+
+    def async_client(self, name: str) -> httpx.AsyncClient:
+        """Keep-alive client for async calls to one upstream, on the running loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._check_fork()
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(name)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(**_client_options())
+                clients[name] = client
+            return client
+
+    def close(self):
+        """Close every client this process opened"""
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            sync_clients = list(self._sync_clients.values())
+            async_clients = [(loop, client) for loop, clients in self._async_clients.items()
+                             for client in clients.values()]
+            self._sync_clients = {}
+            self._async_clients = weakref.WeakKeyDictionary()
+
+        for client in sync_clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"Error closing HTTP client: {str(e)}")
+
+        shared_loop = self._background_loop.loop
+        for loop, client in async_clients:
+            try:
+                if loop is shared_loop and loop.is_running():
+                    asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(5)
+                elif not loop.is_closed() and not loop.is_running():
+                    loop.run_until_complete(client.aclose())
+            except Exception as e:
+                logger.warning(f"Error closing async HTTP client: {str(e)}")
+
+
+background_loop = BackgroundLoop()
+http_clients = HTTPClientPool(background_loop)
+
+
+def run_sync(coro: Coroutine, timeout: Optional[float] = None):
+    """Run a coroutine to completion from synchronous code on the shared loop"""
+    return background_loop.run(coro, timeout)
+
+
+def get_sync_client(name: str) -> httpx.Client:
+    """Shared blocking client for the named upstream"""
+    return http_clients.sync_client(name)
+
+
+def get_async_client(name: str) -> httpx.AsyncClient:
+    """Shared async client for the named upstream on the current loop"""
+    return http_clients.async_client(name)
+
+
+def shutdown_http_clients():
+    """Close pooled connections and stop the loop thread"""
+    http_clients.close()
+    background_loop.stop()
+    logger.info("HTTP clients shut down")
+
+
+atexit.register(shutdown_http_clients)
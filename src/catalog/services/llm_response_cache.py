@@ -0,0 +1,202 @@
+# src/catalog/services/llm_response_cache.py
+"""
+Content-addressed cache of Claude analysis responses.
+
+Each entry is one component's response for one file, keyed by the SHA-256 of
+the file bytes, the component, a hash of its prompt template and the model.
+Reprocessing a document, or uploading the same file again, reuses the stored
+responses instead of calling the API, and changing a prompt or the model
+misses naturally. Entries live in Postgres (llm_response_cache); once their
+total size passes MAX_BYTES the least recently used are evicted.
+
+Lookups and writes go through db.session, so callers use them from the
+thread that holds the app context, not from API worker threads. The file
+hash comes from the document's working set.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import func, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from src.catalog import db
+from src.catalog.constants import LLM_RESPONSE_CACHE_SETTINGS
+from src.catalog.models import LLMResponseCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Keep the most recently used entries whose running size fits the target
+_EVICT_SQL = text("""
+    DELETE FROM llm_response_cache
+    WHERE id IN (
+        SELECT id FROM (
+            SELECT id, sum(size_bytes) OVER (ORDER BY last_used_at DESC, id DESC) AS running
+            FROM llm_response_cache
+        ) ranked
+        WHERE running > :target
+    )
+""")
+
+
+def prompt_hash(prompt) -> str:
+    """SHA-256 of a prompt template (dict or string)"""
+    return hashlib.sha256(
+        json.dumps(prompt, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """Postgres-backed response cache with size-based LRU eviction"""
+
+    def __init__(self, max_bytes: int, evict_to_fraction: float, evict_check_interval: int):
+        self.max_bytes = max_bytes
+        self.evict_to_fraction = evict_to_fraction
+        self.evict_check_interval = evict_check_interval
+
+        self._lock = threading.Lock()
+        self._next_evict_check = 0.0
+
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evicted': 0}
+
+    def get_many(self, file_sha256: str, model: str,
+                 prompt_hashes: Dict[str, str]) -> Dict[str, Dict]:
+        """
+        Cached responses for a file's components
+
+        Args:
+            file_sha256: SHA-256 of the file bytes
+            model: Claude model name
+            prompt_hashes: Prompt template hash per component
+
+        Returns:
+            Response per component found; missing components are absent
+        """
+        if not prompt_hashes:
+            return {}
+
+        try:
+            entries = LLMResponseCacheEntry.query.filter(
+                LLMResponseCacheEntry.file_sha256 == file_sha256,
+                LLMResponseCacheEntry.model == model,
+                tuple_(LLMResponseCacheEntry.component, LLMResponseCacheEntry.prompt_hash).in_(
+                    list(prompt_hashes.items()))
+            ).all()
+
+            if entries:
+                LLMResponseCacheEntry.query.filter(
+                    LLMResponseCacheEntry.id.in_([entry.id for entry in entries])
+                ).update({
+                    LLMResponseCacheEntry.hits: LLMResponseCacheEntry.hits + 1,
+                    LLMResponseCacheEntry.last_used_at: datetime.now(timezone.utc)
+                }, synchronize_session=False)
+                db.session.commit()
+
+            found = {entry.component: entry.response for entry in entries}
+        except Exception as e:
+            logger.error(f"LLM response cache lookup failed: {str(e)}")
+            db.session.rollback()
+            found = {}
+
+        with self._lock:
+            self.stats['hits'] += len(found)
+            self.stats['misses'] += len(prompt_hashes) - len(found)
+        return found
+
+    def put_many(self, file_sha256: str, model: str, responses: Dict[str, tuple]):
+        """
+        Store component responses for a file
+
+        Args:
+            file_sha256: SHA-256 of the file bytes
+            model: Claude model name
+            responses: (prompt template hash, response) per component
+        """
+        if not responses:
+            return
+
+        now = datetime.now(timezone.utc)
+        rows = [{
+            'file_sha256': file_sha256,
+            'component': component,
+            'prompt_hash': template_hash,
+            'model': model,
+            'response': response,
+            'size_bytes': len(json.dumps(response).encode('utf-8')),
+            'hits': 0,
+            'created_at': now,
+            'last_used_at': now
+        } for component, (template_hash, response) in responses.items()]
+
+        try:
+            statement = insert(LLMResponseCacheEntry).values(rows)
+            db.session.execute(statement.on_conflict_do_update(
+                constraint='uq_llm_response_cache_key',
+                set_={
+                    'response': statement.excluded.response,
+                    'size_bytes': statement.excluded.size_bytes,
+                    'last_used_at': statement.excluded.last_used_at
+                }
+            ))
+            db.session.commit()
+            with self._lock:
+                self.stats['stores'] += len(rows)
+        except Exception as e:
+            logger.error(f"LLM response cache write failed: {str(e)}")
+            db.session.rollback()
+            return
+
+        self.evict_if_needed()
+
+    def evict_if_needed(self, force: bool = False) -> int:
+        """
+        Drop least recently used entries once the cache outgrows MAX_BYTES
+
+        The total size is checked at most every EVICT_CHECK_INTERVAL seconds
+        unless forced.
+
+        Returns:
+            Number of entries evicted
+        """
+        with self._lock:
+            if not force and time.time() < self._next_evict_check:
+                return 0
+            self._next_evict_check = time.time() + self.evict_check_interval
+
+        try:
+            total = db.session.query(
+                func.coalesce(func.sum(LLMResponseCacheEntry.size_bytes), 0)).scalar()
+            if total <= self.max_bytes:
+                return 0
+
+            target = int(self.max_bytes * self.evict_to_fraction)
+            evicted = db.session.execute(_EVICT_SQL, {'target': target}).rowcount
+            db.session.commit()
+            logger.info(
+                f"LLM response cache evicted {evicted} entries ({total} bytes over {self.max_bytes})")
+        except Exception as e:
+            logger.error(f"LLM response cache eviction failed: {str(e)}")
+            db.session.rollback()
+            return 0
+
+        with self._lock:
+            self.stats['evicted'] += evicted
+        return evicted
+
+    def hit_rate(self) -> Optional[float]:
+        """Share of component lookups answered from the cache in this process"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return self.stats['hits'] / lookups if lookups else None
+
+
+# Shared instance
+llm_response_cache = LLMResponseCache(
+    max_bytes=LLM_RESPONSE_CACHE_SETTINGS['MAX_BYTES'],
+    evict_to_fraction=LLM_RESPONSE_CACHE_SETTINGS['EVICT_TO_FRACTION'],
+    evict_check_interval=LLM_RESPONSE_CACHE_SETTINGS['EVICT_CHECK_INTERVAL']
+)
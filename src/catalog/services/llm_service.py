@@ -3,15 +3,28 @@ import os
 import json
 import httpx
 import time
-import base64
-from typing import Dict, Any, List, Optional
-from src.catalog.services.prompt_manager import PromptManager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, List, Optional, Tuple
+from src.catalog.services.prompt_manager import PromptManager, COMPONENT_RESULT_KEYS
+from src.catalog.services.http_clients import get_sync_client
+from src.catalog.services.llm_response_cache import llm_response_cache, prompt_hash
+from src.catalog.services.working_set import DocumentWorkingSet
+from src.catalog.services.rate_limiter import api_rate_limiter, estimate_tokens, RateLimitTimeout
 import logging
 import traceback
-from src.catalog.constants import MODEL_SETTINGS, ERROR_MESSAGES
+from src.catalog.constants import MODEL_SETTINGS, ERROR_MESSAGES, LLM_ANALYSIS_SETTINGS, LLM_RESPONSE_CACHE_SETTINGS, \
+    RATE_LIMITER_SETTINGS
 
 logger = logging.getLogger(__name__)
 
+# Result of a component that was not called because the shared rate limit
+# had no capacity within MAX_WAIT
+RATE_LIMITED = object()
+
+
+class ResponseTruncated(Exception):
+    """Claude stopped at max_tokens; the same request would be cut off again"""
+
 
 class LLMService:
     def __init__(self):
@@ -34,55 +47,50 @@ class LLMService:
         # Initialize prompt manager
         self.prompt_manager = PromptManager()
 
-    def _get_file_data(self, filename: str) -> dict:
-        """Get file data and path from storage if available"""
-        try:
-            from src.catalog.services.storage_service import MinIOStorage
-            storage = MinIOStorage()
-
-            # Check if file exists in storage
-            logger.info(f"Retrieving file from MinIO: {filename}")
-            temp_path = f"/tmp/{filename}"
-
-            # Get file from MinIO and save to temp path
-            try:
-                file_data = storage.get_file(filename)
-                if file_data:
-                    with open(temp_path, "wb") as f:
-                        f.write(file_data)
-                    logger.info(f"File retrieved and saved to {temp_path}")
-                    return {"path": temp_path, "exists": True}
-            except Exception as e:
-                logger.error(f"Failed to retrieve file from MinIO: {str(e)}")
-
-            return {"path": None, "exists": False}
-        except Exception as e:
-            logger.error(f"Error getting file data: {str(e)}")
-            return {"path": None, "exists": False}
-
-    def analyze_document_modular(self, filename: str, document_path: Optional[str] = None, components: List[str] = None) -> Dict[Any, Any]:
+    def analyze_document_modular(self, filename: str, document_path: Optional[str] = None, components: List[str] = None,
+                                 max_parallel: Optional[int] = None, mode: Optional[str] = None,
+                                 use_cache: Optional[bool] = None,
+                                 working_set: Optional[DocumentWorkingSet] = None) -> Dict[Any, Any]:
         """
         Synchronous modular analysis with separate API calls for each component
 
+        Components run concurrently, up to max_parallel at a time. Those that
+        take metadata as prompt context wait for the metadata call when it is
+        part of the same run; the rest start immediately. In fused mode each
+        FUSED_GROUPS group is asked for in one call instead, and only
+        components whose section is missing or malformed get their own call.
+
+        Responses are looked up in the LLM response cache by file hash first,
+        so reprocessing an unchanged file makes no API calls. The file, page
+        image and encoded payload come from the working set, so a pipeline
+        run that passes one in downloads and rasterizes the document once.
+
         Args:
             filename: Document filename
-            document_path: Path to document file (optional)
+            document_path: Path to document file (optional; ignored with a working set)
             components: List of analysis components to run (default: all)
+            max_parallel: Concurrent API calls (default from LLM_ANALYSIS_SETTINGS; 1 runs in order)
+            mode: 'modular' or 'fused' (default from LLM_ANALYSIS_MODE or LLM_ANALYSIS_SETTINGS)
+            use_cache: Read and write the response cache (default from LLM_RESPONSE_CACHE_SETTINGS)
+            working_set: Shared DocumentWorkingSet for this document (optional)
 
         Returns:
             Combined analysis results
+
+        Raises:
+            RateLimitTimeout: Some components got no Claude capacity within
+                MAX_WAIT; responses from the rest are cached before raising
         """
+        # Without a shared working set, use one for this call only
+        if working_set is None:
+            with DocumentWorkingSet(filename, source_path=document_path) as own_working_set:
+                return self.analyze_document_modular(
+                    filename, components=components, max_parallel=max_parallel,
+                    mode=mode, use_cache=use_cache, working_set=own_working_set)
+
         logger.info(
             f"Starting modular analysis for {filename} with components: {components}")
 
-        # If document path not provided, try to fetch from storage
-        if not document_path:
-            file_info = self._get_file_data(filename)
-            if file_info and file_info.get("exists"):
-                document_path = file_info.get("path")
-                logger.info(
-                    f"Using document path from storage: {document_path}")
-
         # Default to all components if not specified
         if not components:
             components = [
@@ -90,133 +98,369 @@ class LLMService:
                 "design", "keywords", "communication"
             ]
 
-        # Prepare image data once for all components
-        image_data = self._prepare_image_data(document_path)
-        if not image_data:
-            logger.warning(f"Could not prepare image data for {filename}")
-
-        # Initialize combined results
-        results = {}
-        metadata = None
-
-        # Process components sequentially, collecting results
-        for component in components:
+        if max_parallel is None:
+            max_parallel = int(os.getenv(
+                "LLM_MAX_PARALLEL_COMPONENTS", LLM_ANALYSIS_SETTINGS['MAX_PARALLEL_COMPONENTS']))
+        if mode is None:
+            mode = os.getenv("LLM_ANALYSIS_MODE", LLM_ANALYSIS_SETTINGS['MODE'])
+        if use_cache is None:
+            use_cache = os.getenv(
+                "LLM_RESPONSE_CACHE", str(LLM_RESPONSE_CACHE_SETTINGS['ENABLED'])).lower() in ('1', 'true', 'yes')
+
+        fused = mode.lower() == "fused"
+
+        # Answer what we can from the response cache. Sections from a fused
+        # call are stored under the fused prompt's hash, so either prompt
+        # changing invalidates only the entries it produced
+        file_sha256 = None
+        prompt_hashes = {}
+        component_results = {}
+        if use_cache and working_set.sha256:
             try:
-                # Get the appropriate prompt for this component
-                prompt = self._get_component_prompt(
-                    component, filename, metadata)
-                if not prompt:
-                    logger.warning(
-                        f"No prompt available for component: {component}")
-                    continue
-
-                # Call Claude API for this component
-                logger.info(f"Processing component: {component}")
-                component_result = self._call_claude_api_sync(
-                    prompt, image_data, max_retries=3)
-
-                # Store result for this component
-                if component_result:
-                    # For metadata component, extract and save for context in other components
-                    if component == "metadata" and "document_analysis" in component_result:
-                        metadata = component_result["document_analysis"]
-
-                    # For communication component, ensure it's properly formatted
-                    if component == "communication" and "communication_focus" in component_result:
-                        results["communication_focus"] = component_result["communication_focus"]
-                    # For entities component, ensure it's properly formatted
-                    elif component == "entities" and "entities" in component_result:
-                        results["entities"] = component_result["entities"]
-                    else:
-                        # Add to combined results
-                        results.update(component_result)
-
-                    logger.info(
-                        f"Successfully processed component: {component}, result keys: {list(component_result.keys())}")
-                else:
-                    logger.warning(f"No result for component: {component}")
+                file_sha256 = working_set.sha256
+                prompt_hashes = {c: self._prompt_template_hash(c) for c in components}
+                component_results = llm_response_cache.get_many(
+                    file_sha256, self.model, {c: h for c, h in prompt_hashes.items() if h})
+                if fused:
+                    fused_hashes = {}
+                    for group in self._fused_groups(components):
+                        group_hash = self._fused_template_hash(group)
+                        fused_hashes.update(
+                            {c: group_hash for c in group if c not in component_results})
+                    component_results.update(llm_response_cache.get_many(
+                        file_sha256, self.model, fused_hashes))
             except Exception as e:
-                logger.error(
-                    f"Error processing component {component}: {str(e)}", exc_info=True)
-                # Continue with other components rather than failing completely
+                logger.error(f"Error reading LLM response cache: {str(e)}")
+                file_sha256 = None
+        pending = [c for c in components if c not in component_results]
+        logger.info(
+            f"LLM response cache: {len(component_results)} hits, {len(pending)} to call for {filename}")
+
+        if pending:
+            # Image data is prepared once per working set
+            image_data = working_set.image_payload()
+            if not image_data:
+                logger.warning(f"Could not prepare image data for {filename}")
+
+            metadata = self._metadata_context(component_results.get("metadata"))
+            called_hashes = dict(prompt_hashes)
+            if fused and len(pending) > 1:
+                called, fused_hashes = self._run_components_fused(
+                    pending, filename, image_data, max_parallel, metadata)
+                called_hashes.update(fused_hashes)
+            else:
+                called = self._run_components(
+                    pending, filename, image_data, max_parallel, metadata)
+            rate_limited = [c for c in pending if called.get(c) is RATE_LIMITED]
+            called = {c: r for c, r in called.items() if r is not RATE_LIMITED}
+            component_results.update(called)
+
+            # Keep only well-formed responses for reuse, keyed by the prompt
+            # that produced them
+            if file_sha256:
+                llm_response_cache.put_many(file_sha256, self.model, {
+                    c: (called_hashes[c], called[c]) for c in pending
+                    if called_hashes.get(c) and self._valid_section(c, called.get(c))
+                })
+
+            # Fail rather than return a partial analysis; a retry finds the
+            # components that did run in the cache
+            if rate_limited:
+                raise RateLimitTimeout(
+                    f"No Claude capacity within MAX_WAIT for components {rate_limited} of {filename}")
+
+        # Merge in component order so the combined shape matches a sequential run
+        results = {}
+        for component in components:
+            component_result = component_results.get(component)
+            if component_result:
+                self._merge_component_result(
+                    results, component, component_result)
 
         return results
 
-    def _prepare_image_data(self, document_path: Optional[str]) -> Optional[Dict[str, str]]:
-        """Prepare image data for API calls"""
-        if not document_path or not os.path.exists(document_path):
+    def _run_component(self, component: str, filename: str, image_data: Optional[Dict[str, str]],
+                       metadata: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Run one analysis component, returning None when it produced nothing
+        and RATE_LIMITED when it got no API capacity
+        """
+        try:
+            # Get the appropriate prompt for this component
+            prompt = self._get_component_prompt(component, filename, metadata)
+            if not prompt:
+                logger.warning(
+                    f"No prompt available for component: {component}")
+                return None
+
+            # Call Claude API for this component
+            logger.info(f"Processing component: {component}")
+            component_result = self._call_claude_api_sync(
+                prompt, image_data, max_retries=3)
+
+            if component_result:
+                logger.info(
+                    f"Successfully processed component: {component}, result keys: {list(component_result.keys())}")
+            else:
+                logger.warning(f"No result for component: {component}")
+            return component_result
+        except RateLimitTimeout as e:
+            logger.warning(f"Component {component} not run: {str(e)}")
+            return RATE_LIMITED
+        except Exception as e:
+            logger.error(
+                f"Error processing component {component}: {str(e)}", exc_info=True)
+            # Continue with other components rather than failing completely
             return None
 
-        try:
-            file_ext = os.path.splitext(document_path)[1].lower()
-
-            # Handle image files
-            if file_ext in ['.jpg', '.jpeg', '.png', '.gif']:
-                logger.info(f"Preparing image data from file: {document_path}")
-                return {
-                    "base64": self._encode_image(document_path),
-                    "media_type": self._get_media_type(document_path)
-                }
+    def _run_components(self, components: List[str], filename: str, image_data: Optional[Dict[str, str]],
+                        max_parallel: int, metadata: Optional[Dict] = None) -> Dict[str, Dict]:
+        """Run each component with its own call, concurrently when allowed"""
+        if max_parallel > 1 and len(components) > 1:
+            return self._run_components_concurrently(
+                components, filename, image_data, max_parallel, metadata)
+        return self._run_components_sequentially(
+            components, filename, image_data, metadata)
+
+    def _run_components_sequentially(self, components: List[str], filename: str,
+                                     image_data: Optional[Dict[str, str]],
+                                     metadata: Optional[Dict] = None) -> Dict[str, Dict]:
+        """Run components one after another, passing metadata on as context"""
+        component_results = {}
+
+        for index, component in enumerate(components):
+            component_result = self._run_component(
+                component, filename, image_data, metadata)
+            component_results[component] = component_result
+
+            # Out of capacity; the rest would only wait as long again
+            if component_result is RATE_LIMITED:
+                component_results.update(
+                    {c: RATE_LIMITED for c in components[index + 1:]})
+                break
+
+            # Keep metadata for context in later components
+            if component == "metadata":
+                metadata = self._metadata_context(component_result)
 
-            # Handle PDF files - convert first page to image
-            elif file_ext == '.pdf':
-                try:
-                    from pdf2image import convert_from_path
-                    logger.info(
-                        f"Converting first page of PDF to image: {document_path}")
-                    images = convert_from_path(
-                        document_path, first_page=1, last_page=1)
-
-                    if images:
-                        # Save first page as temporary image
-                        temp_image_path = f"{document_path}_page1.jpg"
-                        images[0].save(temp_image_path, "JPEG")
-                        logger.info(
-                            f"PDF first page converted to: {temp_image_path}")
+        return component_results
 
-                        # Encode the converted image
-                        image_data = {
-                            "base64": self._encode_image(temp_image_path),
-                            "media_type": "image/jpeg"
-                        }
+    def _run_components_concurrently(self, components: List[str], filename: str,
+                                     image_data: Optional[Dict[str, str]], max_parallel: int,
+                                     metadata: Optional[Dict] = None) -> Dict[str, Dict]:
+        """
+        Run components on a bounded thread pool
 
-                        # Clean up temp image
-                        try:
-                            os.remove(temp_image_path)
-                        except Exception as e:
-                            logger.warning(
-                                f"Failed to remove temp image: {str(e)}")
+        Components that need metadata context are submitted once the metadata
+        call finishes, so wall-clock time is roughly the longest dependency
+        chain rather than the sum of all calls.
 
-                        return image_data
-                except Exception as e:
-                    logger.error(f"Failed to convert PDF to image: {str(e)}")
+        Args:
+            components: Components to run
+            filename: Document filename
+            image_data: Prepared image shared by every call
+            max_parallel: Most API calls in flight at once
+            metadata: Known metadata context, for runs without a metadata component
 
-            return None
-        except Exception as e:
-            logger.error(f"Error preparing image data: {str(e)}")
-            return None
+        Returns:
+            Result per component (None where a component failed, RATE_LIMITED
+            where it got no API capacity)
+        """
+        dependent = set(LLM_ANALYSIS_SETTINGS['METADATA_DEPENDENT_COMPONENTS'])
+        if "metadata" in components:
+            waiting = [c for c in components if c in dependent]
+        else:
+            waiting = []
+
+        component_results = {}
+        with ThreadPoolExecutor(max_workers=min(max_parallel, len(components)),
+                                thread_name_prefix='llm-component') as executor:
+            # Metadata goes first so dependent components are not held up
+            # behind independent ones when the pool is smaller than the fan-out
+            ready = sorted((c for c in components if c not in waiting),
+                           key=lambda c: c != "metadata")
+            pending = {
+                executor.submit(self._run_component, component, filename, image_data, metadata): component
+                for component in ready
+            }
+
+            rate_limited = False
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    component = pending.pop(future)
+                    component_results[component] = future.result()
+                    if component_results[component] is RATE_LIMITED:
+                        rate_limited = True
+
+                    if component == "metadata":
+                        metadata = self._metadata_context(
+                            component_results[component])
+                        for dependent_component in waiting:
+                            if rate_limited:
+                                component_results[dependent_component] = RATE_LIMITED
+                                continue
+                            future = executor.submit(
+                                self._run_component, dependent_component, filename, image_data, metadata)
+                            pending[future] = dependent_component
+
+                # Out of capacity; drop the calls that have not started
+                if rate_limited:
+                    for future in list(pending):
+                        if future.cancel():
+                            component_results[pending.pop(future)] = RATE_LIMITED
+
+        return component_results
+
+    def _run_components_fused(self, components: List[str], filename: str,
+                              image_data: Optional[Dict[str, str]], max_parallel: int,
+                              metadata: Optional[Dict] = None) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+        """
+        Ask for each fused group of components in a single call
+
+        The document image and system prompt are sent once per group rather
+        than once per component. Components outside every group, and any
+        whose section fails validation, fall back to their own calls. So do
+        groups too large for the model's output limit, and groups whose
+        response is cut off at max_tokens.
 
-    def _encode_image(self, image_path: str) -> str:
-        """Encode an image file to base64 string"""
+        Args:
+            components: Components to run
+            filename: Document filename
+            image_data: Prepared image shared by every call
+            max_parallel: Most API calls in flight at once
+            metadata: Known metadata context, for runs without a metadata component
+
+        Returns:
+            Result per component (None where a component failed, RATE_LIMITED
+            where it got no API capacity), and the fused prompt template hash
+            per component answered by a fused call
+        """
+        groups = self._fused_groups(components)
+
+        component_results = {}
+        fused_hashes = {}
+        if groups:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(groups))),
+                                    thread_name_prefix='llm-fused') as executor:
+                futures = {executor.submit(self._run_fused_group, group, filename, image_data, metadata): group
+                           for group in groups}
+                for future, group in futures.items():
+                    group_results = future.result()
+                    component_results.update(group_results)
+                    group_hash = self._fused_template_hash(group)
+                    fused_hashes.update({c: group_hash for c, r in group_results.items()
+                                         if r is not RATE_LIMITED})
+
+        fallback = [c for c in components if not component_results.get(c)]
+        if fallback:
+            logger.info(f"Running components individually: {fallback}")
+            metadata = self._metadata_context(
+                component_results.get("metadata")) or metadata
+            component_results.update(self._run_components(
+                fallback, filename, image_data, max_parallel, metadata))
+
+        return component_results, fused_hashes
+
+    def _fused_groups(self, components: List[str]) -> List[List[str]]:
+        """Components to ask for together, one list per fused call"""
+        groups = []
+        grouped = set()
+        for group in LLM_ANALYSIS_SETTINGS['FUSED_GROUPS']:
+            members = [c for c in components if c in group and c not in grouped]
+            if len(members) > 1:
+                groups.append(members)
+                grouped.update(members)
+
+        # A group whose sections cannot fit in one response runs modular
+        output_limit = self._output_token_limit()
+        for group in list(groups):
+            if self._fused_max_tokens(group) > output_limit:
+                logger.info(
+                    f"Fused group {group} needs more than {output_limit} output tokens for {self.model}; "
+                    f"running its components individually")
+                groups.remove(group)
+        return groups
+
+    def _run_fused_group(self, group: List[str], filename: str, image_data: Optional[Dict[str, str]],
+                         metadata: Optional[Dict] = None) -> Dict[str, Dict]:
+        """One fused call, split into a result per valid component section"""
         try:
-            with open(image_path, "rb") as image_file:
-                return base64.b64encode(image_file.read()).decode("utf-8")
+            prompt = self.prompt_manager.get_fused_prompt(filename, group, metadata)
+            logger.info(f"Processing fused components: {group}")
+            response = self._call_claude_api_sync(
+                prompt, image_data, max_retries=3, max_tokens=self._fused_max_tokens(group))
+        except ResponseTruncated as e:
+            # Every section is suspect; the components get their own calls
+            logger.warning(f"Fused response for {group} was cut off: {str(e)}")
+            return {}
+        except RateLimitTimeout as e:
+            # Individual calls would only wait as long again
+            logger.warning(f"Fused components {group} not run: {str(e)}")
+            return {component: RATE_LIMITED for component in group}
         except Exception as e:
-            logger.error(f"Failed to encode image {image_path}: {str(e)}")
-            raise
-
-    def _get_media_type(self, file_path: str) -> str:
-        """Determine media type from file path"""
-        ext = os.path.splitext(file_path.lower())[1]
-        if ext == '.jpg' or ext == '.jpeg':
-            return 'image/jpeg'
-        elif ext == '.png':
-            return 'image/png'
-        elif ext == '.gif':
-            return 'image/gif'
-        elif ext == '.pdf':
-            return 'application/pdf'
-        return 'application/octet-stream'
+            logger.error(
+                f"Error processing fused components {group}: {str(e)}", exc_info=True)
+            return {}
+
+        component_results = {}
+        for component in group:
+            key = COMPONENT_RESULT_KEYS[component]
+            if self._valid_section(component, response):
+                component_results[component] = {key: response[key]}
+            else:
+                logger.warning(
+                    f"Fused response has no valid {key} section for component: {component}")
+        return component_results
+
+    def _fused_max_tokens(self, group: List[str]) -> int:
+        """Output budget for a fused call covering the group"""
+        return len(group) * LLM_ANALYSIS_SETTINGS['FUSED_TOKENS_PER_COMPONENT']
+
+    def _output_token_limit(self) -> int:
+        """Most output tokens the configured model can return in one response"""
+        limits = MODEL_SETTINGS['CLAUDE']['OUTPUT_TOKEN_LIMITS']
+        prefixes = [prefix for prefix in limits if self.model.startswith(prefix)]
+        if prefixes:
+            return limits[max(prefixes, key=len)]
+        return MODEL_SETTINGS['CLAUDE']['MAX_TOKENS']
+
+    def _valid_section(self, component: str, response: Optional[Dict]) -> bool:
+        """Whether a response holds a usable section for the component"""
+        if not isinstance(response, dict):
+            return False
+        section = response.get(COMPONENT_RESULT_KEYS[component])
+        if component == "keywords":
+            return isinstance(section, list) and any(isinstance(kw, dict) for kw in section)
+        return isinstance(section, dict) and any(
+            value not in (None, "", []) for value in section.values())
+
+    def _prompt_template_hash(self, component: str) -> Optional[str]:
+        """Hash of a component's prompt with a placeholder filename and no context"""
+        prompt = self._get_component_prompt(component, "{filename}")
+        return prompt_hash(prompt) if prompt else None
+
+    def _fused_template_hash(self, group: List[str]) -> str:
+        """Hash of a group's fused prompt with a placeholder filename and no context"""
+        return prompt_hash(self.prompt_manager.get_fused_prompt("{filename}", group))
+
+    def _metadata_context(self, component_result: Optional[Dict]) -> Optional[Dict]:
+        """Prompt context taken from a metadata component result"""
+        if isinstance(component_result, dict) and "document_analysis" in component_result:
+            return component_result["document_analysis"]
+        return None
+
+    def _merge_component_result(self, results: Dict, component: str, component_result: Dict):
+        """Add one component's result to the combined analysis"""
+        # For communication component, ensure it's properly formatted
+        if component == "communication" and "communication_focus" in component_result:
+            results["communication_focus"] = component_result["communication_focus"]
+        # For entities component, ensure it's properly formatted
+        elif component == "entities" and "entities" in component_result:
+            results["entities"] = component_result["entities"]
+        else:
+            # Add to combined results
+            results.update(component_result)
 
     def _get_component_prompt(self, component: str, filename: str, metadata: Optional[Dict] = None) -> Optional[Dict]:
         """Get prompt for specific component"""
@@ -244,170 +488,220 @@ class LLMService:
 
         return None
 
-    def _call_claude_api_sync(self, prompt, image_data=None, max_retries=3):
-        """Synchronous wrapper for Claude API calls with correct message formatting"""
+    def _call_claude_api_sync(self, prompt, image_data=None, max_retries=3, max_tokens=None):
+        """
+        Synchronous wrapper for Claude API calls with correct message formatting
+
+        Raises ResponseTruncated without retrying when the response stops at
+        max_tokens (default MODEL_SETTINGS['CLAUDE']['MAX_TOKENS']), and
+        RateLimitTimeout without calling when the shared rate limit has no
+        capacity within MAX_WAIT.
+        """
+        if max_tokens is None:
+            max_tokens = MODEL_SETTINGS['CLAUDE']['MAX_TOKENS']
         retry_count = 0
         last_error = None
 
         while retry_count < max_retries:
             try:
-                # Create client with timeout
-                with httpx.Client(timeout=60.0) as client:
-                    # Prepare request payload
-                    request_payload = {
-                        "model": self.model,
-                        "max_tokens": 4096,
-                        "temperature": 0,
-                        "messages": []
-                    }
-
-                    # Handle system message properly as a top-level parameter
-                    if isinstance(prompt, dict) and "system" in prompt:
-                        request_payload["system"] = prompt["system"]
-                        logger.info(
-                            f"Using system prompt: {prompt['system'][:100]}...")
+                # Shared keep-alive client; connections persist across calls and retries
+                client = get_sync_client('anthropic')
+
+                # Prepare request payload
+                request_payload = {
+                    "model": self.model,
+                    "max_tokens": max_tokens,
+                    "temperature": 0,
+                    "messages": []
+                }
+
+                # Handle system message properly as a top-level parameter
+                if isinstance(prompt, dict) and "system" in prompt:
+                    request_payload["system"] = prompt["system"]
+                    logger.info(
+                        f"Using system prompt: {prompt['system'][:100]}...")
 
-                    # Add user message with optional image
-                    user_content = []
+                # Add user message with optional image
+                user_content = []
 
-                    # Handle different prompt formats
-                    if isinstance(prompt, dict) and "user" in prompt:
-                        user_text = prompt["user"]
-                        logger.info(f"Using user prompt: {user_text[:100]}...")
-                    elif isinstance(prompt, str):
-                        user_text = prompt
-                        logger.info(
-                            f"Using string prompt: {user_text[:100]}...")
-                    else:
-                        user_text = str(prompt)
-                        logger.info(
-                            f"Using converted prompt: {user_text[:100]}...")
+                # Handle different prompt formats
+                if isinstance(prompt, dict) and "user" in prompt:
+                    user_text = prompt["user"]
+                    logger.info(f"Using user prompt: {user_text[:100]}...")
+                elif isinstance(prompt, str):
+                    user_text = prompt
+                    logger.info(
+                        f"Using string prompt: {user_text[:100]}...")
+                else:
+                    user_text = str(prompt)
+                    logger.info(
+                        f"Using converted prompt: {user_text[:100]}...")
 
+                user_content.append({
+                    "type": "text",
+                    "text": user_text
+                })
+
+                # Add image if available
+                if image_data and isinstance(image_data, dict) and "base64" in image_data:
+                    logger.info("Adding image data to request")
                     user_content.append({
-                        "type": "text",
-                        "text": user_text
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": image_data.get("media_type", "image/jpeg"),
+                            "data": image_data["base64"]
+                        }
                     })
 
-                    # Add image if available
-                    if image_data and isinstance(image_data, dict) and "base64" in image_data:
-                        logger.info("Adding image data to request")
-                        user_content.append({
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": image_data.get("media_type", "image/jpeg"),
-                                "data": image_data["base64"]
-                            }
-                        })
-
-                    # Add user message to the messages array
-                    request_payload["messages"].append({
-                        "role": "user",
-                        "content": user_content
-                    })
+                # Add user message to the messages array
+                request_payload["messages"].append({
+                    "role": "user",
+                    "content": user_content
+                })
+
+                # Reserve quota shared by every worker; waits only when the
+                # request or token bucket is empty
+                estimated_tokens = estimate_tokens(
+                    user_text + request_payload.get("system", ""))
+                if len(user_content) > 1:
+                    estimated_tokens += RATE_LIMITER_SETTINGS['IMAGE_TOKEN_ESTIMATE']
+                if not api_rate_limiter.acquire('CLAUDE', tokens=estimated_tokens):
+                    raise RateLimitTimeout(
+                        f"no CLAUDE capacity within {RATE_LIMITER_SETTINGS['MAX_WAIT']}s")
+
+                # Make request
+                logger.info(
+                    f"Sending request to Claude API for {self.model}")
+                response = client.post(
+                    "https://api.anthropic.com/v1/messages",
+                    headers=self.headers,
+                    json=request_payload,
+                    timeout=60.0
+                )
+
+                # Rate limited upstream: pause every worker for Retry-After
+                # and try again once the limiter lets this call through
+                if response.status_code == 429:
+                    try:
+                        retry_after = float(response.headers.get("retry-after", 0))
+                    except ValueError:
+                        retry_after = 0
+                    api_rate_limiter.adjust('CLAUDE', -estimated_tokens)
+                    api_rate_limiter.hold(
+                        'CLAUDE', retry_after or RATE_LIMITER_SETTINGS['DEFAULT_HOLD'])
+                    retry_count += 1
+                    last_error = "API error: 429 - rate limited"
+                    continue
 
-                    # Make request
-                    logger.info(
-                        f"Sending request to Claude API for {self.model}")
-                    response = client.post(
-                        "https://api.anthropic.com/v1/messages",
-                        headers=self.headers,
-                        json=request_payload
-                    )
-
-                    # If error response, try to get more details
-                    if response.status_code != 200:
-                        error_detail = "No details available"
-                        try:
-                            error_json = response.json()
-                            error_detail = error_json.get('error', {}).get(
-                                'message', 'No details available')
-                        except:
-                            pass
-                        logger.error(
-                            f"API returned {response.status_code}: {error_detail}")
-                        raise Exception(
-                            f"API error: {response.status_code} - {error_detail}")
-
-                    # Process response
-                    data = response.json()
+                # If error response, try to get more details
+                if response.status_code != 200:
+                    error_detail = "No details available"
+                    try:
+                        error_json = response.json()
+                        error_detail = error_json.get('error', {}).get(
+                            'message', 'No details available')
+                    except:
+                        pass
+                    logger.error(
+                        f"API returned {response.status_code}: {error_detail}")
+                    raise Exception(
+                        f"API error: {response.status_code} - {error_detail}")
+
+                # Process response
+                data = response.json()
+                logger.info(
+                    f"Received response with keys: {list(data.keys())}")
+
+                # True up the token reservation with reported usage
+                usage = data.get('usage') or {}
+                if usage:
+                    api_rate_limiter.adjust('CLAUDE', usage.get('input_tokens', 0) +
+                                            usage.get('output_tokens', 0) - estimated_tokens)
+
+                # A cut-off response is not valid JSON, and asking again
+                # with the same limit would be cut off the same way
+                if data.get('stop_reason') == 'max_tokens':
+                    raise ResponseTruncated(
+                        f"response reached max_tokens ({max_tokens})")
+
+                # Process response content
+                content = data.get('content', [])
+                message_text = ""
+                for block in content:
+                    if block.get('type') == 'text':
+                        message_text += block.get('text', '')
+
+                # Log response summary for debugging
+                if message_text:
+                    preview = message_text[:200] + \
+                        "..." if len(message_text) > 200 else message_text
                     logger.info(
-                        f"Received response with keys: {list(data.keys())}")
-
-                    # Process response content
-                    content = data.get('content', [])
-                    message_text = ""
-                    for block in content:
-                        if block.get('type') == 'text':
-                            message_text += block.get('text', '')
-
-                    # Log response summary for debugging
-                    if message_text:
-                        preview = message_text[:200] + \
-                            "..." if len(message_text) > 200 else message_text
-                        logger.info(
-                            f"Received response from Claude (preview): {preview}")
-                    else:
-                        logger.warning("Received empty response from Claude")
+                        f"Received response from Claude (preview): {preview}")
+                else:
+                    logger.warning("Received empty response from Claude")
+
+                # Extract JSON
+                try:
+                    # Try to find valid JSON in the response
+                    json_matches = []
 
-                    # Extract JSON
+                    # Look for JSON within the entire text first
                     try:
-                        # Try to find valid JSON in the response
-                        json_matches = []
-
-                        # Look for JSON within the entire text first
-                        try:
-                            result = json.loads(message_text)
-                            logger.info(
-                                f"Successfully parsed full response as JSON with keys: {list(result.keys())}")
-                            return result
-                        except json.JSONDecodeError as e:
-                            logger.warning(
-                                f"Could not parse full response as JSON: {str(e)}")
-                            # Not valid JSON, continue with partial extraction
-                            pass
-
-                        # Find all potential JSON objects
-                        depth = 0
-                        start_idx = None
-
-                        for i, char in enumerate(message_text):
-                            if char == '{' and start_idx is None:
-                                start_idx = i
-                                depth = 1
-                            elif char == '{' and start_idx is not None:
-                                depth += 1
-                            elif char == '}' and start_idx is not None:
-                                depth -= 1
-                                if depth == 0:
-                                    json_candidate = message_text[start_idx:i+1]
-                                    try:
-                                        json_obj = json.loads(json_candidate)
-                                        json_matches.append(json_obj)
-                                        logger.info(
-                                            f"Found valid JSON object with keys: {list(json_obj.keys())}")
-                                    except:
-                                        pass
-                                    start_idx = None
-
-                        # If we found any valid JSON objects
-                        if json_matches:
-                            # Return the first valid match
-                            logger.info(
-                                f"Returning first valid JSON match with keys: {list(json_matches[0].keys())}")
-                            return json_matches[0]
-
-                        # If we get here, no valid JSON was found
-                        logger.error("No valid JSON found in response")
-                        retry_count += 1
-                        time.sleep(2)
-                        continue
-
-                    except Exception as e:
-                        logger.error(f"Error extracting JSON: {str(e)}")
-                        retry_count += 1
-                        time.sleep(2)
-                        continue
+                        result = json.loads(message_text)
+                        logger.info(
+                            f"Successfully parsed full response as JSON with keys: {list(result.keys())}")
+                        return result
+                    except json.JSONDecodeError as e:
+                        logger.warning(
+                            f"Could not parse full response as JSON: {str(e)}")
+                        # Not valid JSON, continue with partial extraction
+                        pass
+
+                    # Find all potential JSON objects
+                    depth = 0
+                    start_idx = None
+
+                    for i, char in enumerate(message_text):
+                        if char == '{' and start_idx is None:
+                            start_idx = i
+                            depth = 1
+                        elif char == '{' and start_idx is not None:
+                            depth += 1
+                        elif char == '}' and start_idx is not None:
+                            depth -= 1
+                            if depth == 0:
+                                json_candidate = message_text[start_idx:i+1]
+                                try:
+                                    json_obj = json.loads(json_candidate)
+                                    json_matches.append(json_obj)
+                                    logger.info(
+                                        f"Found valid JSON object with keys: {list(json_obj.keys())}")
+                                except:
+                                    pass
+                                start_idx = None
+
+                    # If we found any valid JSON objects
+                    if json_matches:
+                        # Return the first valid match
+                        logger.info(
+                            f"Returning first valid JSON match with keys: {list(json_matches[0].keys())}")
+                        return json_matches[0]
+
+                    # If we get here, no valid JSON was found
+                    logger.error("No valid JSON found in response")
+                    retry_count += 1
+                    time.sleep(2)
+                    continue
+
+                except Exception as e:
+                    logger.error(f"Error extracting JSON: {str(e)}")
+                    retry_count += 1
+                    time.sleep(2)
+                    continue
+
+            except (ResponseTruncated, RateLimitTimeout):
+                raise
 
             except httpx.HTTPStatusError as e:
                 logger.error(f"API call error: {str(e)}")
@@ -11,6 +11,7 @@ from werkzeug.utils import secure_filename
 import traceback
 from src.catalog import cache, db
 from src.catalog.constants import CACHE_TIMEOUTS, SUPPORTED_FILE_TYPES
+from src.catalog.utils.cache_keys import preview_cache_key
 
 
 class PreviewService:
@@ -20,12 +21,11 @@ class PreviewService:
         self.supported_pdfs = SUPPORTED_FILE_TYPES['DOCUMENTS']
         self.logger = logging.getLogger(__name__)
 
-    @cache.memoize(timeout=CACHE_TIMEOUTS['PREVIEW'])
     def get_preview(self, filename):
         """Get preview for a file, first checking cache"""
         try:
             # Check cache first
-            cache_key = f"preview:{filename}"
+            cache_key = preview_cache_key(filename)
             cached_preview = cache.get(cache_key)
 
             if cached_preview:
@@ -47,7 +47,10 @@ class PreviewService:
             generate_preview.delay(filename)
 
             # Generate preview synchronously for immediate display just this once
-            return self._generate_preview_internal(filename)
+            preview = self._generate_preview_internal(filename)
+            if preview:
+                cache.set(cache_key, preview, timeout=CACHE_TIMEOUTS['PREVIEW'])
+            return preview
 
         except Exception as e:
             self.logger.error(
@@ -197,6 +200,48 @@ class PreviewService:
 
             return f"data:image/svg+xml;base64,{base64.b64encode(svg.encode()).decode()}"
 
+    def generate_from_working_set(self, working_set):
+        """
+        Generate a preview from a document's working set
+
+        Reuses the working set's bytes and rasterized first page, so the
+        processing pipeline neither downloads nor renders the file again.
+
+        Args:
+            working_set: DocumentWorkingSet for the document
+
+        Returns:
+            Preview data URI, or None if the working set has no usable file
+        """
+        filename = working_set.filename
+        ext = working_set.ext
+
+        if ext in self.supported_images:
+            file_data = working_set.file_bytes()
+            if not file_data:
+                return None
+            return self._generate_image_preview(file_data, filename)
+
+        if ext in self.supported_pdfs:
+            image = working_set.page_image()
+            if image is None:
+                return None
+            try:
+                # Same size as _generate_pdf_preview: 300 pixels wide
+                width = 300
+                height = max(1, round(image.height * width / image.width))
+                image = image.convert('RGB').resize((width, height), Image.LANCZOS)
+
+                buffered = io.BytesIO()
+                image.save(buffered, format="JPEG", quality=85, optimize=True)
+                img_str = base64.b64encode(buffered.getvalue()).decode()
+                return f"data:image/jpeg;base64,{img_str}"
+            except Exception as e:
+                self.logger.error(f"Working set preview error for {filename}: {str(e)}")
+                return None
+
+        return self._generate_placeholder_preview(f"Unsupported file type: {ext}")
+
     def _generate_preview_internal(self, filename):
         """Generate preview for a file"""
         try:
@@ -2,6 +2,124 @@
 import os
 from datetime import datetime
 
+# Key each component's result is returned under
+COMPONENT_RESULT_KEYS = {
+    "metadata": "document_analysis",
+    "classification": "classification",
+    "entities": "entities",
+    "text": "extracted_text",
+    "design": "design_elements",
+    "keywords": "hierarchical_keywords",
+    "communication": "communication_focus"
+}
+
+# JSON each component asks for, as a member of the response object
+COMPONENT_SCHEMAS = {
+    "metadata": """  "document_analysis": {
+    "summary": "Clear 1-2 sentence overview of the document",
+    "confidence_score": <float between 0.0 and 1.0>,
+    "document_type": "mailer/digital/handout/poster/etc.",
+    "campaign_type": "primary/general/special/runoff",
+    "election_year": "Specify the exact year if identifiable",
+    "document_tone": "positive/negative/neutral/informational"
+  }""",
+    "classification": """  "classification": {
+    "category": "GOTV/attack/comparison/endorsement/issue/biographical",
+    "subcategory": "specific issue or narrower category",
+    "confidence": <float between 0.0 and 1.0>,
+    "rationale": "Brief explanation of classification"
+  }""",
+    "entities": """  "entities": {
+    "client_name": "full name of the client/candidate",
+    "opponent_name": "full name of any opponent mentioned, if applicable",
+    "creation_date": "date created or date shown on document if available",
+    "survey_question": "any survey questions shown, if applicable",
+    "file_identifier": "any naming convention or identifier visible in the document",
+    "confidence": <float between 0.0 and 1.0>
+  }""",
+    "text": """  "extracted_text": {
+    "main_message": "primary headline/slogan as a single string",
+    "supporting_text": "secondary messages as a single string",
+    "call_to_action": "specific voter instruction if present (e.g., 'Vote on Nov 8')",
+    "candidate_name": "full name of the primary candidate",
+    "opponent_name": "full name of any opponent mentioned, if applicable",
+    "confidence": <float between 0.0 and 1.0>
+  }""",
+    "design": """  "design_elements": {
+    "color_scheme": ["primary color", "secondary color", "accent color"],
+    "theme": "patriotic/conservative/progressive/etc.",
+    "mail_piece_type": "postcard/letter/brochure/door hanger/etc.",
+    "geographic_location": "City, State or State only",
+    "target_audience": "specific demographic focus (republicans, democrats, veterans, etc.)",
+    "campaign_name": "candidate and position sought (e.g., 'Smith for Senate')",
+    "visual_elements": ["flag", "candidate photo", "family", "etc."],
+    "confidence": <float between 0.0 and 1.0>
+  }""",
+    "keywords": """  "hierarchical_keywords": [
+    {
+      "specific_term": "specific term used in document (e.g., 'abortion', 'taxes', 'corruption')",
+      "primary_category": "Choose from: Policy Issues & Topics | Candidate & Entity | Communication Style | Geographic & Demographic | Campaign Context",
+      "subcategory": "appropriate subcategory from the taxonomy matching the primary_category",
+      "synonyms": ["any", "synonyms", "or", "related", "terms"],
+      "relevance_score": <float between 0.0 and 1.0>
+    },
+    ... provide 10-15 hierarchical keywords total, ordered by relevance_score (highest first)
+  ]""",
+    "communication": """  "communication_focus": {
+    "primary_issue": "the main policy issue or focus of the communication",
+    "secondary_issues": ["list", "of", "other", "issues", "mentioned"],
+    "messaging_strategy": "attack/positive/comparison/etc.",
+    "audience_persuasion": "describe how the document attempts to persuade its audience",
+    "confidence": <float between 0.0 and 1.0>
+  }"""
+}
+
+# What each component asks for, listed in fused prompts
+COMPONENT_TASKS = {
+    "metadata": "its core metadata",
+    "classification": "its primary category and purpose",
+    "entities": "entity information",
+    "text": "the text content",
+    "design": "the visual design elements",
+    "keywords": "relevant keywords using the hierarchical taxonomy system",
+    "communication": "its primary communication focus and strategy"
+}
+
+# Taxonomy outline included with keyword prompts
+TAXONOMY_GUIDELINES = """
+Primary taxonomy categories and examples:
+1. Policy Issues & Topics:
+   - Economy & Taxes: taxes, inflation, jobs, wages, budget, deficit, trade
+   - Social Issues: abortion, LGBTQ+ rights, marriage equality, religious freedom
+   - Healthcare: Medicare, Medicaid, Obamacare, prescription drugs
+   - Public Safety: crime, guns, police, immigration, border security
+   - Environment: climate change, renewable energy, fossil fuels, conservation
+   - Education: schools, college affordability, student loans, teachers
+   - Government Reform: corruption, election integrity, voting rights, term limits
+
+2. Candidate & Entity:
+   - Candidate Elements: name, party, previous/current office, biography
+   - Political Parties: Democratic, Republican, Independent, Progressive
+   - Opposition Elements: opponent name, criticism, contrast points
+   - External Endorsements: organizations, leaders, unions, celebrities
+
+3. Communication Style:
+   - Message Tone: positive, negative, contrast, attack, informational
+   - Mail Piece Types: postcard, mailer, brochure, letter, push card
+   - Message Focus: introduction, issue-based, biography, endorsement, GOTV
+   - Visual Design: color scheme, photography, graphics, typography, layout
+
+4. Geographic & Demographic:
+   - Geographic Level: national, statewide, congressional, county, city
+   - Target Audience: age group, gender, race/ethnicity, education, income
+
+5. Campaign Context:
+   - Election Type: general, primary, special, runoff, recall
+   - Election Year: 2024, 2022, 2020, etc.
+   - Office Sought: presidential, senate, house, governor, state, local
+   - Campaign Phase: early campaign, late campaign, GOTV period
+"""
+
 
 class PromptManager:
     """Manager for document analysis prompts with modular components"""
@@ -35,22 +153,51 @@ Provide accurate, objective analysis in the exact JSON format requested."""
                 "detail": "basic"
             }
 
+    def _json_schema(self, components):
+        """JSON object with a member for each component"""
+        return "{\n" + ",\n".join(COMPONENT_SCHEMAS[c] for c in components) + "\n}"
+
+    def get_fused_prompt(self, filename, components, metadata=None):
+        """
+        Generate one prompt asking for several components in a single JSON object
+
+        Args:
+            filename: Document filename
+            components: Components to cover, in COMPONENT_SCHEMAS
+            metadata: Prior metadata result to use as context (optional)
+
+        Returns:
+            Prompt dict with system and user text
+        """
+        context = ""
+        if metadata:
+            context = f"""Based on prior analysis, this is a {metadata.get('document_type', '')} 
+from {metadata.get('election_year', '')} that appears to be {metadata.get('document_tone', '')}.
+"""
+
+        tasks = "\n".join(f"- {COMPONENT_TASKS[c]}" for c in components)
+        guidelines = TAXONOMY_GUIDELINES if "keywords" in components else ""
+
+        return {
+            "system": self.base_system_prompt,
+            "user": f"""{context}Analyze the document '{filename}' and provide, in a single response:
+{tasks}
+{guidelines}
+Return ONLY the following JSON, with every section filled in:
+
+{self._json_schema(components)}
+
+Your response MUST be valid JSON formatted exactly as requested above.
+"""
+        }
+
     def get_core_metadata_prompt(self, filename):
         """Generate a prompt for basic document metadata analysis"""
         return {
             "system": self.base_system_prompt,
             "user": f"""Analyze the document '{filename}' and provide ONLY the following core metadata in JSON format:
 
-{{
-  "document_analysis": {{
-    "summary": "Clear 1-2 sentence overview of the document",
-    "confidence_score": <float between 0.0 and 1.0>,
-    "document_type": "mailer/digital/handout/poster/etc.",
-    "campaign_type": "primary/general/special/runoff",
-    "election_year": "Specify the exact year if identifiable",
-    "document_tone": "positive/negative/neutral/informational"
-  }}
-}}
+{self._json_schema(['metadata'])}
 
 Focus ONLY on these core metadata elements. Your response MUST be valid JSON.
 """
@@ -70,14 +217,7 @@ from {metadata.get('election_year', '')} that appears to be {metadata.get('docum
 
 Return ONLY the following JSON:
 
-{{
-  "classification": {{
-    "category": "GOTV/attack/comparison/endorsement/issue/biographical",
-    "subcategory": "specific issue or narrower category",
-    "confidence": <float between 0.0 and 1.0>,
-    "rationale": "Brief explanation of classification"
-  }}
-}}
+{self._json_schema(['classification'])}
 
 Your response MUST be valid JSON formatted exactly as requested above.
 """
@@ -97,16 +237,7 @@ from {metadata.get('election_year', '')} that appears to be {metadata.get('docum
 
 Return ONLY the following JSON:
 
-{{
-  "entities": {{
-    "client_name": "full name of the client/candidate",
-    "opponent_name": "full name of any opponent mentioned, if applicable",
-    "creation_date": "date created or date shown on document if available",
-    "survey_question": "any survey questions shown, if applicable",
-    "file_identifier": "any naming convention or identifier visible in the document",
-    "confidence": <float between 0.0 and 1.0>
-  }}
-}}
+{self._json_schema(['entities'])}
 
 Your response MUST be valid JSON formatted exactly as requested above.
 """
@@ -126,16 +257,7 @@ from {metadata.get('election_year', '')}.
 
 Return ONLY the following JSON:
 
-{{
-  "extracted_text": {{
-    "main_message": "primary headline/slogan as a single string",
-    "supporting_text": "secondary messages as a single string",
-    "call_to_action": "specific voter instruction if present (e.g., 'Vote on Nov 8')",
-    "candidate_name": "full name of the primary candidate",
-    "opponent_name": "full name of any opponent mentioned, if applicable",
-    "confidence": <float between 0.0 and 1.0>
-  }}
-}}
+{self._json_schema(['text'])}
 
 Your response MUST be valid JSON formatted exactly as requested above.
 """
@@ -155,18 +277,7 @@ from {metadata.get('election_year', '')}.
 
 Return ONLY the following JSON:
 
-{{
-  "design_elements": {{
-    "color_scheme": ["primary color", "secondary color", "accent color"],
-    "theme": "patriotic/conservative/progressive/etc.",
-    "mail_piece_type": "postcard/letter/brochure/door hanger/etc.",
-    "geographic_location": "City, State or State only",
-    "target_audience": "specific demographic focus (republicans, democrats, veterans, etc.)",
-    "campaign_name": "candidate and position sought (e.g., 'Smith for Senate')",
-    "visual_elements": ["flag", "candidate photo", "family", "etc."],
-    "confidence": <float between 0.0 and 1.0>
-  }}
-}}
+{self._json_schema(['design'])}
 
 Your response MUST be valid JSON formatted exactly as requested above.
 """
@@ -180,60 +291,15 @@ Your response MUST be valid JSON formatted exactly as requested above.
 from {metadata.get('election_year', '')} that appears to be {metadata.get('document_tone', '')}.
 """
 
-        taxonomy_guidelines = """
-Primary taxonomy categories and examples:
-1. Policy Issues & Topics:
-   - Economy & Taxes: taxes, inflation, jobs, wages, budget, deficit, trade
-   - Social Issues: abortion, LGBTQ+ rights, marriage equality, religious freedom
-   - Healthcare: Medicare, Medicaid, Obamacare, prescription drugs
-   - Public Safety: crime, guns, police, immigration, border security
-   - Environment: climate change, renewable energy, fossil fuels, conservation
-   - Education: schools, college affordability, student loans, teachers
-   - Government Reform: corruption, election integrity, voting rights, term limits
-
-2. Candidate & Entity:
-   - Candidate Elements: name, party, previous/current office, biography
-   - Political Parties: Democratic, Republican, Independent, Progressive
-   - Opposition Elements: opponent name, criticism, contrast points
-   - External Endorsements: organizations, leaders, unions, celebrities
-
-3. Communication Style:
-   - Message Tone: positive, negative, contrast, attack, informational
-   - Mail Piece Types: postcard, mailer, brochure, letter, push card
-   - Message Focus: introduction, issue-based, biography, endorsement, GOTV
-   - Visual Design: color scheme, photography, graphics, typography, layout
-
-4. Geographic & Demographic:
-   - Geographic Level: national, statewide, congressional, county, city
-   - Target Audience: age group, gender, race/ethnicity, education, income
-
-5. Campaign Context:
-   - Election Type: general, primary, special, runoff, recall
-   - Election Year: 2024, 2022, 2020, etc.
-   - Office Sought: presidential, senate, house, governor, state, local
-   - Campaign Phase: early campaign, late campaign, GOTV period
-"""
-
         return {
             "system": self.base_system_prompt,
             "user": f"""{context}Analyze the document '{filename}' and identify relevant keywords using the hierarchical taxonomy system.
 
-{taxonomy_guidelines}
+{TAXONOMY_GUIDELINES}
 
 Return ONLY the following JSON:
 
-{{
-  "hierarchical_keywords": [
-    {{
-      "specific_term": "specific term used in document (e.g., 'abortion', 'taxes', 'corruption')",
-      "primary_category": "Choose from: Policy Issues & Topics | Candidate & Entity | Communication Style | Geographic & Demographic | Campaign Context",
-      "subcategory": "appropriate subcategory from the taxonomy matching the primary_category",
-      "synonyms": ["any", "synonyms", "or", "related", "terms"],
-      "relevance_score": <float between 0.0 and 1.0>
-    }},
-    ... provide 10-15 hierarchical keywords total, ordered by relevance_score (highest first)
-  ]
-}}
+{self._json_schema(['keywords'])}
 
 Your response MUST be valid JSON formatted exactly as requested above.
 """
@@ -253,15 +319,7 @@ from {metadata.get('election_year', '')} that appears to be {metadata.get('docum
 
 Return ONLY the following JSON:
 
-{{
-  "communication_focus": {{
-    "primary_issue": "the main policy issue or focus of the communication",
-    "secondary_issues": ["list", "of", "other", "issues", "mentioned"],
-    "messaging_strategy": "attack/positive/comparison/etc.",
-    "audience_persuasion": "describe how the document attempts to persuade its audience",
-    "confidence": <float between 0.0 and 1.0>
-  }}
-}}
+{self._json_schema(['communication'])}
 
 Your response MUST be valid JSON formatted exactly as requested above.
 """
@@ -0,0 +1,351 @@
+# src/catalog/services/query_enrichment.py
+"""
+Context enrichment for semantic search queries.
+
+The vocabulary below is compiled once into an Aho-Corasick automaton, so a
+query is scanned a single time for every term it contains. Terms and synonyms
+from the keyword taxonomy are merged in and recompiled whenever the
+taxonomy index reloads.
+"""
+
+import logging
+from collections import deque, namedtuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Master taxonomy-based term relationships
+TAXONOMY_TERMS = {
+    # II. Policy Issues & Topics
+    # A. Economy & Taxes
+    "taxes": "taxes tax_cuts tax_increases tax_reform taxation revenue tariffs levies property_tax income_tax sales_tax corporate_tax tax_policy fiscal_policy",
+    "inflation": "inflation rising_prices cost_of_living consumer_price_index CPI economic_pressure purchasing_power currency_devaluation monetary_policy",
+    "jobs": "jobs employment unemployment workforce labor_market job_creation career opportunity hiring workers labor layoffs job_loss",
+    "wages": "wages salary income compensation pay earnings minimum_wage living_wage fair_pay worker_compensation paychecks benefits",
+    "budget": "budget spending fiscal_policy appropriations expenditures federal_budget state_budget municipal_budget allocation financial_plan",
+    "deficit": "deficit debt national_debt federal_debt borrowing budget_deficit fiscal_hole revenue_shortfall government_borrowing",
+    "small business": "small_business entrepreneur startup local_business small_enterprise family_business main_street job_creator business_owner",
+    "trade": "trade imports exports tariffs global_trade international_commerce NAFTA trade_deficit trade_surplus protectionism free_trade",
+
+    # B. Social Issues
+    "abortion": "abortion reproductive_rights pro_choice pro_life roe_v_wade planned_parenthood right_to_life women's_healthcare",
+    "lgbtq": "lgbtq gay_rights transgender same_sex_marriage gender_identity sexual_orientation equality non_discrimination",
+    "marriage": "marriage same_sex_marriage traditional_marriage civil_union domestic_partnership marriage_equality",
+    "religious freedom": "religious_freedom faith_based religion first_amendment religious_liberty religious_expression church_and_state",
+    "family values": "family_values traditional_values moral_values conservative_values family_structure parental_rights",
+    "marijuana": "marijuana cannabis legalization decriminalization medical_marijuana recreational_use drug_policy",
+
+    # C. Healthcare
+    "medicare": "medicare seniors healthcare_for_elderly retirement_benefits social_security health_insurance_for_seniors",
+    "medicaid": "medicaid low_income_healthcare public_health_insurance safety_net healthcare_assistance",
+    "affordable care act": "affordable_care_act obamacare aca healthcare_reform health_insurance_marketplace pre_existing_conditions",
+    "prescription drugs": "prescription_drugs medication pharmaceutical drug_prices pharmacy medication_costs medicine",
+    "mental health": "mental_health behavioral_health therapy counseling psychological psychiatric depression anxiety treatment",
+    "healthcare costs": "healthcare_costs medical_expenses insurance_premiums deductibles copays out_of_pocket medical_bills",
+
+    # D. Public Safety & Justice
+    "crime": "crime criminal law_enforcement public_safety violence criminal_justice law_and_order crime_rates",
+    "guns": "guns firearms gun_control second_amendment 2A gun_rights gun_safety gun_violence weapons",
+    "police": "police law_enforcement officers cops sheriff police_reform public_safety community_policing blue_lives",
+    "criminal justice reform": "criminal_justice_reform sentencing incarceration prison_reform rehabilitation recidivism prison mandatory_minimums",
+    "border security": "border_security border_wall immigration_enforcement border_patrol border_crisis national_security southern_border",
+    "immigration": "immigration immigrants migrant immigration_policy DACA citizenship naturalization deportation asylum refugee",
+
+    # E. Environment & Energy
+    "climate change": "climate_change global_warming carbon_emissions greenhouse_gas environment sustainability climate_crisis",
+    "renewable energy": "renewable_energy solar wind clean_energy green_energy sustainable_energy alternative_energy clean_power",
+    "fossil fuels": "fossil_fuels oil natural_gas coal petroleum traditional_energy carbon_based energy_independence fracking",
+    "conservation": "conservation preservation wildlife natural_resources environmental_protection land_management parks forests",
+    "pollution": "pollution emissions contamination air_quality water_pollution smog industrial_waste environmental_degradation",
+    "water": "water clean_water drinking_water water_quality drought water_resources water_rights lakes rivers oceans",
+
+    # F. Education
+    "public schools": "public_schools k12 elementary_school middle_school high_school education system district_schools",
+    "college affordability": "college_affordability tuition higher_education university college_costs education_expenses financial_aid",
+    "student loans": "student_loans education_debt loan_forgiveness student_debt college_financing financial_aid",
+    "school choice": "school_choice charter_schools vouchers private_schools educational_options alternative_education parental_choice",
+    "teachers": "teachers educators faculty instructors school_staff teaching_profession teacher_pay teacher_benefits",
+    "curriculum": "curriculum coursework education_standards common_core teaching_materials lesson_plans subject_matter education_content",
+
+    # G. Government Reform
+    "corruption": "corruption ethics transparency accountability integrity scandal government_reform drain_the_swamp",
+    "election integrity": "election_integrity voting_security ballot_security election_security fraud_prevention secure_elections",
+    "voting rights": "voting_rights voter_access ballot_access franchise democracy participation voter_suppression",
+    "campaign finance": "campaign_finance political_donations fundraising dark_money super_pacs election_funding political_money",
+    "term limits": "term_limits legislative_reform congressional_reform political_reform career_politicians government_reform",
+    "lobbying": "lobbying special_interests influence influence_peddling industry_advocacy corporate_influence"
+}
+
+# III. Candidate & Entity Identifiers
+ENTITY_TERMS = {
+    "candidate": "candidate nominee contender politician officeholder office_seeker election_candidate",
+    "democrat": "democratic democrat blue_party liberal progressive left left_leaning",
+    "republican": "republican gop grand_old_party conservative right right_leaning red_party",
+    "independent": "independent non_partisan non_affiliated third_party unaffiliated",
+    "opposition": "opponent rival competition adversary challenger opposing_candidate competition",
+    "endorsement": "endorsement support backing approval recommendation testimonial"
+}
+
+# IV. Communication Style & Format
+COMMUNICATION_TERMS = {
+    "positive": "positive supportive uplifting optimistic hopeful promising favorable",
+    "negative": "negative critical unfavorable disapproving hostile unflattering pessimistic",
+    "contrast": "contrast comparison difference distinction distinguish comparing contrasting",
+    "attack": "attack criticism hit_piece negative offensive accusatory aggressive hostile",
+    "informational": "informational educational explanatory descriptive instructive informative",
+    "mailer": "mailer mail_piece direct_mail political_mail campaign_literature flyer brochure"
+}
+
+# V-VII. Additional Categories
+ADDITIONAL_TERMS = {
+    "election": "election vote ballot polling campaign contest race runoff primary general special",
+    "campaign": "campaign election candidate race messaging strategy platform advertising outreach",
+    "targeting": "targeting demographic audience segment voters constituents focus directed",
+    "state level": "state statewide governor legislature statehouse assembly senate district",
+    "local": "local municipal city county township borough mayor council alderman commissioner"
+}
+
+# Compound terms across categories
+COMPOUND_TERMS = {
+    "tax increase": "tax_increase revenue_raising fiscal_adjustment tax_hike levy_adjustment government_revenue tax_policy",
+    "tax cut": "tax_reduction tax_relief fiscal_stimulus revenue_decrease taxpayer_benefit burden_reduction lower_taxes",
+    "school board": "education_committee board_of_education school_trustees education_oversight school_district administration",
+    "property tax": "real_estate_tax land_tax housing_tax municipal_revenue home_assessment local_tax county_tax",
+    "minimum wage": "wage_floor lowest_legal_wage base_pay wage_standard labor_cost entry_level_pay hourly_minimum",
+    "border wall": "border_barrier border_fence immigration_enforcement border_security border_protection southern_border",
+    "election day": "voting_day polls ballot_casting election_date democracy_in_action civic_duty voting",
+    "voter id": "voter_identification election_security ballot_integrity identity_verification voting_requirements",
+    "campaign ad": "political_advertisement campaign_commercial electoral_messaging candidate_promotion political_messaging"
+}
+
+# Temporal context
+TEMPORAL_TERMS = {
+    "recent": "recent current latest present contemporary modern up_to_date",
+    "past": "past previous former historical earlier prior old",
+    "future": "future upcoming planned proposed prospective forthcoming",
+    "election cycle": "election_cycle campaign_period voting_season electoral_period political_season"
+}
+
+# Geographic context
+GEOGRAPHIC_TERMS = {
+    "state": "state regional local district county municipal jurisdiction",
+    "national": "national federal countrywide nationwide domestic",
+    "local": "local community neighborhood district municipal county",
+    "district": "district constituency precinct ward division electoral_area"
+}
+
+# Document type context
+DOCUMENT_TYPES = {
+    "mailer": "mailer direct_mail campaign_literature political_mail flyer brochure",
+    "ad": "advertisement commercial spot announcement promotion marketing",
+    "email": "email message correspondence communication electronic_mail",
+    "social media": "social_media post tweet status_update social_network"
+}
+
+# Sentiment context
+SENTIMENT_TERMS = {
+    "positive": "positive favorable supportive approving optimistic hopeful",
+    "negative": "negative critical opposing disapproving pessimistic unfavorable",
+    "neutral": "neutral objective impartial balanced unbiased factual"
+}
+
+# Campaign strategy context
+STRATEGY_TERMS = {
+    "attack": "attack criticism negative opposition contrast comparison",
+    "defense": "defense response rebuttal counterargument explanation justification",
+    "promotion": "promotion positive support endorsement advocacy recommendation",
+    "contrast": "contrast comparison difference distinction opposing alternative"
+}
+
+# Words that, together with a capitalised word, suggest the query names a politician
+POLITICIAN_NAME_TRIGGERS = ["vote", "election", "candidate",
+                            "campaign", "senator", "representative", "governor"]
+POLITICIAN_NAME_CONTEXT = "politician candidate election campaign office position representative political"
+
+# Vocabulary groups in the order their context is appended to a query. Terms
+# in 'unique' groups are only added once across those groups.
+ENRICHMENT_GROUPS = [
+    ('taxonomy', TAXONOMY_TERMS, True),
+    ('entity', ENTITY_TERMS, True),
+    ('communication', COMMUNICATION_TERMS, True),
+    ('additional', ADDITIONAL_TERMS, True),
+    ('compound', COMPOUND_TERMS, False),
+    ('temporal', TEMPORAL_TERMS, False),
+    ('geographic', GEOGRAPHIC_TERMS, False),
+    ('document_type', DOCUMENT_TYPES, False),
+    ('sentiment', SENTIMENT_TERMS, False),
+    ('strategy', STRATEGY_TERMS, False),
+]
+
+# One piece of context, added when any of its patterns occurs in the query.
+# whole_word patterns must not be part of a longer word; needs_name entries
+# also require a capitalised word in the original query.
+_Entry = namedtuple('_Entry', 'patterns context whole_word needs_name')
+
+
+class _Automaton:
+    """Aho-Corasick automaton reporting every (end index, pattern id) in a text"""
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for pattern_id, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(pattern_id)
+
+        # Breadth-first failure links; each state inherits its fallback's outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> Iterator[Tuple[int, int]]:
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for pattern_id in self._output[state]:
+                yield index, pattern_id
+
+
+def _is_whole_word(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else ' '
+    after = text[end + 1] if end + 1 < len(text) else ' '
+    return not before.isalnum() and not after.isalnum()
+
+
+class QueryEnricher:
+    """Compiled enrichment vocabulary"""
+
+    def __init__(self, taxonomy_vocabulary: Optional[List[Tuple[str, List[str]]]] = None):
+        """
+        Args:
+            taxonomy_vocabulary: Optional (term, synonyms) pairs from the
+                keyword taxonomy, matched as whole words
+        """
+        entries = []
+        unique_terms = set()
+
+        for name, terms, unique in ENRICHMENT_GROUPS:
+            for term, context in terms.items():
+                if unique:
+                    if term in unique_terms:
+                        continue
+                    unique_terms.add(term)
+                entries.append(_Entry((term,), context, False, False))
+
+            if name == 'additional' and taxonomy_vocabulary:
+                # Taxonomy terms the static vocabulary doesn't already cover
+                for term, synonyms in taxonomy_vocabulary:
+                    key = term.lower()
+                    if len(key) < 3 or key in unique_terms:
+                        continue
+                    unique_terms.add(key)
+                    words = [key] + [s.lower() for s in synonyms if s]
+                    entries.append(_Entry(
+                        tuple(words), " ".join(w.replace(' ', '_') for w in words), True, False))
+
+            if name == 'compound':
+                entries.append(_Entry(
+                    tuple(POLITICIAN_NAME_TRIGGERS), POLITICIAN_NAME_CONTEXT, False, True))
+
+        self._entries = entries
+        patterns = []
+        pattern_ids = {}
+        self._pattern_entries: List[List[int]] = []
+        for entry_index, entry in enumerate(entries):
+            for pattern in entry.patterns:
+                pattern_id = pattern_ids.get(pattern)
+                if pattern_id is None:
+                    pattern_id = pattern_ids[pattern] = len(patterns)
+                    patterns.append(pattern)
+                    self._pattern_entries.append([])
+                self._pattern_entries[pattern_id].append(entry_index)
+        self._automaton = _Automaton(patterns)
+
+    def enrich(self, query: str) -> str:
+        """
+        Append context for every vocabulary term found in the query
+
+        Args:
+            query: Search query
+
+        Returns:
+            Lowercased query followed by the matching context
+        """
+        lowered = query.lower()
+        patterns = self._automaton.patterns
+
+        matched = set()
+        for end, pattern_id in self._automaton.find(lowered):
+            for entry_index in self._pattern_entries[pattern_id]:
+                if entry_index in matched:
+                    continue
+                if self._entries[entry_index].whole_word and not _is_whole_word(
+                        lowered, end - len(patterns[pattern_id]) + 1, end):
+                    continue
+                matched.add(entry_index)
+
+        if not matched:
+            return lowered
+
+        has_name = any(word[0].isupper() for word in query.split())
+        parts = [lowered]
+        for entry_index in sorted(matched):
+            entry = self._entries[entry_index]
+            if entry.needs_name and not has_name:
+                continue
+            parts.append(entry.context)
+        return " ".join(parts)
+
+
+# Static vocabulary, compiled at import
+_static_enricher = QueryEnricher()
+_taxonomy_enricher: Optional[QueryEnricher] = None
+_taxonomy_generation = 0
+
+
+def get_query_enricher() -> QueryEnricher:
+    """Enricher including the current taxonomy, or the static one if it isn't loaded"""
+    global _taxonomy_enricher, _taxonomy_generation
+    try:
+        from src.catalog.services.taxonomy_index import taxonomy_index
+
+        vocabulary = taxonomy_index.vocabulary()
+        if not vocabulary:
+            return _static_enricher
+        if _taxonomy_enricher is None or taxonomy_index.generation != _taxonomy_generation:
+            generation = taxonomy_index.generation
+            _taxonomy_enricher = QueryEnricher(vocabulary)
+            _taxonomy_generation = generation
+            logger.info(
+                f"Compiled query enrichment vocabulary with {len(vocabulary)} taxonomy terms")
+        return _taxonomy_enricher
+    except Exception as e:
+        logger.error(f"Error loading taxonomy vocabulary for enrichment: {str(e)}")
+        return _static_enricher
+
+
+def enrich_query(query: str) -> str:
+    """Lowercased query with context for every vocabulary term it contains"""
+    return get_query_enricher().enrich(query)
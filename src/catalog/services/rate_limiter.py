@@ -0,0 +1,320 @@
+# src/catalog/services/rate_limiter.py
+"""
+Cluster-wide token buckets for upstream API calls.
+
+Each API in API_RATE_LIMITS gets two buckets in Redis, one for requests and
+one for tokens, both refilling continuously at the per-minute limit. A Lua
+script refills, checks and takes from both atomically, so every web and
+Celery worker draws from the same quota. A call that fits goes ahead without
+waiting; one that does not learns exactly how long until it would fit and
+sleeps only that long.
+
+Calls made on behalf of an interactive request pass priority=True. Other
+calls must leave the API_PRIORITY_RESERVE share of both buckets untouched,
+so a backfill draining the quota still leaves capacity for search queries.
+
+Token use is reserved from an estimate before the call and trued up with
+adjust() once the response reports actual usage. A 429 puts the API on hold()
+for its Retry-After so every worker backs off together. A call that would
+wait longer than max_wait is not made; acquire() returns False. Without Redis
+each process falls back to its own buckets with the same limits.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from src.catalog.constants import (API_PRIORITY_RESERVE, API_RATE_LIMITS, API_TOKEN_LIMITS,
+                                   RATE_LIMITER_SETTINGS)
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] bucket hash
+# ARGV request capacity, token capacity, request cost, token cost, force, hold ms,
+#      reserve (fraction of each bucket the call must leave untouched)
+# Returns granted (0/1), wait ms, requests left, tokens left
+_BUCKET_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000 + math.floor(tonumber(now_parts[2]) / 1000)
+local request_capacity = tonumber(ARGV[1])
+local token_capacity = tonumber(ARGV[2])
+local request_cost = tonumber(ARGV[3])
+local token_cost = tonumber(ARGV[4])
+local force = tonumber(ARGV[5])
+local hold_ms = tonumber(ARGV[6])
+local reserve = tonumber(ARGV[7])
+
+local state = redis.call('HMGET', KEYS[1], 'requests', 'tokens', 'updated', 'held_until')
+local requests = tonumber(state[1]) or request_capacity
+local tokens = tonumber(state[2]) or token_capacity
+local updated = tonumber(state[3]) or now
+local held_until = tonumber(state[4]) or 0
+
+local elapsed = math.max(0, now - updated)
+requests = math.min(request_capacity, requests + elapsed * request_capacity / 60000)
+tokens = math.min(token_capacity, tokens + elapsed * token_capacity / 60000)
+if hold_ms > 0 then
+    held_until = math.max(held_until, now + hold_ms)
+end
+
+local wait_ms = 0
+if force == 0 and (request_cost > 0 or token_cost > 0) then
+    if held_until > now then
+        wait_ms = held_until - now
+    end
+    local requests_needed = request_cost + reserve * request_capacity
+    local tokens_needed = token_cost + reserve * token_capacity
+    if requests < requests_needed then
+        wait_ms = math.max(wait_ms, math.ceil((requests_needed - requests) * 60000 / request_capacity))
+    end
+    if tokens < tokens_needed then
+        wait_ms = math.max(wait_ms, math.ceil((tokens_needed - tokens) * 60000 / token_capacity))
+    end
+end
+
+local granted = 0
+if wait_ms == 0 then
+    requests = math.min(request_capacity, requests - request_cost)
+    tokens = math.min(token_capacity, tokens - token_cost)
+    granted = 1
+end
+
+redis.call('HSET', KEYS[1], 'requests', requests, 'tokens', tokens,
+           'updated', now, 'held_until', held_until)
+redis.call('PEXPIRE', KEYS[1], 120000 + math.max(0, held_until - now))
+return {granted, wait_ms, tostring(requests), tostring(tokens)}
+"""
+
+
+class _LocalBuckets:
+    """Per-process buckets with the script's arithmetic, used without Redis"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict[str, list] = {}
+
+    def evaluate(self, key: str, request_capacity: float, token_capacity: float,
+                 request_cost: float, token_cost: float, force: bool,
+                 hold_ms: int, reserve: float) -> Tuple[bool, int, float, float]:
+        now = time.time() * 1000
+        with self._lock:
+            requests, tokens, updated, held_until = self._state.get(
+                key, [request_capacity, token_capacity, now, 0])
+
+            elapsed = max(0, now - updated)
+            requests = min(request_capacity, requests + elapsed * request_capacity / 60000)
+            tokens = min(token_capacity, tokens + elapsed * token_capacity / 60000)
+            if hold_ms > 0:
+                held_until = max(held_until, now + hold_ms)
+
+            wait_ms = 0
+            if not force and (request_cost > 0 or token_cost > 0):
+                if held_until > now:
+                    wait_ms = held_until - now
+                requests_needed = request_cost + reserve * request_capacity
+                tokens_needed = token_cost + reserve * token_capacity
+                if requests < requests_needed:
+                    wait_ms = max(wait_ms, (requests_needed - requests) * 60000 / request_capacity)
+                if tokens < tokens_needed:
+                    wait_ms = max(wait_ms, (tokens_needed - tokens) * 60000 / token_capacity)
+
+            granted = wait_ms == 0
+            if granted:
+                requests = min(request_capacity, requests - request_cost)
+                tokens = min(token_capacity, tokens - token_cost)
+
+            self._state[key] = [requests, tokens, now, held_until]
+            return granted, int(wait_ms + 0.999), requests, tokens
+
+
+class RateLimitTimeout(Exception):
+    """No capacity for a call within max_wait; the call was not made"""
+
+
+class APIRateLimiter:
+    """Request and token buckets per upstream API, shared through Redis"""
+
+    def __init__(self, key_prefix: str, max_wait: float):
+        self.key_prefix = key_prefix
+        self.max_wait = max_wait
+
+        self._redis = None
+        self._redis_retry_at = 0.0
+        self._script = None
+        self._local = _LocalBuckets()
+
+        self.stats = {'granted': 0, 'waited': 0, 'wait_seconds': 0.0, 'timeouts': 0}
+
+    def limits(self, api: str) -> Tuple[int, int]:
+        """
+        Requests and tokens per minute for an API
+
+        <API>_REQUESTS_PER_MINUTE and <API>_TOKENS_PER_MINUTE environment
+        variables override API_RATE_LIMITS and API_TOKEN_LIMITS.
+        """
+        requests = int(os.getenv(f"{api}_REQUESTS_PER_MINUTE", API_RATE_LIMITS[api]))
+        tokens = int(os.getenv(f"{api}_TOKENS_PER_MINUTE", API_TOKEN_LIMITS[api]))
+        return requests, tokens
+
+    def _get_redis(self):
+        """Connect lazily; back off for a minute after a connection failure"""
+        if self._redis is not None or time.time() < self._redis_retry_at:
+            return self._redis
+
+        try:
+            import redis
+            from src.catalog.config import get_redis_uri
+
+            self._redis = redis.Redis.from_url(
+                get_redis_uri(), socket_timeout=0.5, socket_connect_timeout=0.5)
+            self._script = self._redis.register_script(_BUCKET_SCRIPT)
+        except Exception as e:
+            logger.warning(f"API rate limiter running without Redis: {str(e)}")
+            self._redis_retry_at = time.time() + 60
+        return self._redis
+
+    def _evaluate(self, api: str, request_cost: float, token_cost: float,
+                  force: bool = False, hold_ms: int = 0,
+                  priority: bool = False) -> Tuple[bool, int, float, float]:
+        """Run the bucket script in Redis, or locally when Redis is unavailable"""
+        request_capacity, token_capacity = self.limits(api)
+        reserve = 0.0 if priority else API_PRIORITY_RESERVE.get(api, 0.0)
+        # A single call larger than the bucket could never fit; let it drain
+        # the bucket down to the reserve
+        token_cost = min(token_cost, token_capacity * (1 - reserve))
+
+        client = self._get_redis()
+        if client is not None:
+            try:
+                granted, wait_ms, requests, tokens = self._script(
+                    keys=[self.key_prefix + api],
+                    args=[request_capacity, token_capacity, request_cost, token_cost,
+                          1 if force else 0, hold_ms, reserve],
+                    client=client)
+                return bool(granted), int(wait_ms), float(requests), float(tokens)
+            except Exception as e:
+                logger.warning(f"API rate limiter Redis error: {str(e)}")
+                self._redis = None
+                self._redis_retry_at = time.time() + 60
+
+        return self._local.evaluate(self.key_prefix + api, request_capacity, token_capacity,
+                                    request_cost, token_cost, force, hold_ms, reserve)
+
+    def try_acquire(self, api: str, tokens: int = 0, priority: bool = False) -> Tuple[bool, float]:
+        """
+        Take one request and the given tokens if both buckets allow it
+
+        Args:
+            api: Key in API_RATE_LIMITS ('CLAUDE', 'OPENAI')
+            tokens: Estimated tokens the call will use
+            priority: Interactive call that may use the API_PRIORITY_RESERVE share
+
+        Returns:
+            (granted, seconds until the call would fit when not granted)
+        """
+        granted, wait_ms, _, _ = self._evaluate(api, 1, tokens, priority=priority)
+        return granted, wait_ms / 1000.0
+
+    def _next_wait(self, api: str, tokens: int, started: float,
+                   max_wait: Optional[float], priority: bool) -> Optional[float]:
+        """Seconds to sleep before trying again; 0 once granted, None on timeout"""
+        granted, wait = self.try_acquire(api, tokens, priority)
+        if granted:
+            waited = time.time() - started
+            self.stats['granted'] += 1
+            if waited > 0:
+                self.stats['waited'] += 1
+                self.stats['wait_seconds'] += waited
+            return 0
+
+        limit = self.max_wait if max_wait is None else max_wait
+        if time.time() - started + wait > limit:
+            self.stats['timeouts'] += 1
+            logger.warning(f"{api} rate limit wait of {wait:.1f}s exceeds {limit}s; giving up")
+            return None
+        # Jitter so workers released together do not retry in lockstep
+        return wait + random.uniform(0, 0.05)
+
+    def acquire(self, api: str, tokens: int = 0, max_wait: Optional[float] = None,
+                priority: bool = False) -> bool:
+        """
+        Take capacity for a call, sleeping only as long as the buckets need
+
+        Args:
+            api: Key in API_RATE_LIMITS
+            tokens: Estimated tokens the call will use
+            max_wait: Longest total wait in seconds (default RATE_LIMITER_SETTINGS['MAX_WAIT'])
+            priority: Interactive call that may use the API_PRIORITY_RESERVE share
+
+        Returns:
+            True once granted, False if the wait would exceed max_wait, in
+            which case the call must not be made
+        """
+        started = time.time()
+        while True:
+            wait = self._next_wait(api, tokens, started, max_wait, priority)
+            if wait is None:
+                return False
+            if wait == 0:
+                return True
+            time.sleep(wait)
+
+    async def acquire_async(self, api: str, tokens: int = 0, max_wait: Optional[float] = None,
+                            priority: bool = False) -> bool:
+        """acquire() for coroutines; waits with asyncio.sleep"""
+        started = time.time()
+        while True:
+            wait = self._next_wait(api, tokens, started, max_wait, priority)
+            if wait is None:
+                return False
+            if wait == 0:
+                return True
+            await asyncio.sleep(wait)
+
+    def adjust(self, api: str, tokens: int):
+        """
+        Correct a reservation once actual usage is known
+
+        Args:
+            api: Key in API_RATE_LIMITS
+            tokens: Actual minus estimated tokens; negative returns the difference
+        """
+        if tokens:
+            self._evaluate(api, 0, tokens, force=True)
+
+    def hold(self, api: str, seconds: float):
+        """Stop every worker from calling an API for the given time, e.g. after a 429"""
+        self._evaluate(api, 0, 0, hold_ms=int(seconds * 1000))
+        logger.warning(f"{api} rate limited upstream; holding calls for {seconds:.1f}s")
+
+    def headroom(self, api: str) -> Dict:
+        """
+        Capacity available right now
+
+        Returns:
+            Requests and tokens left in the buckets, and the per-minute limits
+        """
+        _, _, requests, tokens = self._evaluate(api, 0, 0)
+        requests_per_minute, tokens_per_minute = self.limits(api)
+        return {
+            'requests': max(0, int(requests)),
+            'tokens': max(0, int(tokens)),
+            'requests_per_minute': requests_per_minute,
+            'tokens_per_minute': tokens_per_minute
+        }
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for text, about four characters per token"""
+    return len(text or '') // 4 + 1
+
+
+# Shared instance
+api_rate_limiter = APIRateLimiter(
+    key_prefix=RATE_LIMITER_SETTINGS['KEY_PREFIX'],
+    max_wait=RATE_LIMITER_SETTINGS['MAX_WAIT']
+)
@@ -0,0 +1,69 @@
+# src/catalog/services/search_document_service.py
+"""
+Denormalized search rows.
+
+search_documents holds one row per document with everything search reads:
+the combined weighted tsvector, the filter columns (year, tone, campaign
+type, normalized location, taxonomy IDs) and both embeddings. Statement
+triggers on the source tables call refresh_search_documents() for the
+documents a write touched, so the table is normally current without any
+application code; this service covers backfills and repairs.
+"""
+
+import logging
+from typing import List
+
+from sqlalchemy import func, select
+
+from src.catalog import db
+from src.catalog.constants import SEARCH_DOCUMENT_SETTINGS
+from src.catalog.models import Document
+
+logger = logging.getLogger(__name__)
+
+
+class SearchDocumentService:
+    """Rebuilds search_documents rows from the source tables"""
+
+    def refresh(self, document_ids: List[int]) -> int:
+        """
+        Recompute the search rows of the given documents; the caller commits
+
+        Args:
+            document_ids: Document IDs
+
+        Returns:
+            Number of documents refreshed
+        """
+        if not document_ids:
+            return 0
+        db.session.execute(select(func.refresh_search_documents(list(document_ids))))
+        return len(document_ids)
+
+    def rebuild_all(self) -> int:
+        """
+        Recompute the search row of every document, in batches
+
+        Returns:
+            Number of documents refreshed
+        """
+        refreshed = 0
+        last_id = 0
+        batch_size = SEARCH_DOCUMENT_SETTINGS['REBUILD_BATCH_SIZE']
+        while True:
+            document_ids = [
+                document_id for (document_id,) in db.session.query(Document.id)
+                .filter(Document.id > last_id)
+                .order_by(Document.id)
+                .limit(batch_size)
+            ]
+            if not document_ids:
+                break
+            refreshed += self.refresh(document_ids)
+            db.session.commit()
+            last_id = document_ids[-1]
+        return refreshed
+
+
+# Shared instance
+search_documents = SearchDocumentService()
@@ -1,18 +1,36 @@
+import bisect
 import logging
 import time
 import datetime
 from typing import List, Dict, Any, Optional, Set, Union, Tuple
 
-from sqlalchemy import or_, func, desc, asc, case, text
-from sqlalchemy.orm import joinedload
+from sqlalchemy import and_, or_, func, desc, asc, case, cast, text, select, null, true, false, tuple_, literal
+from sqlalchemy import values, column, Integer, Text
+from sqlalchemy.dialects.postgresql import ARRAY, REAL
+from flask import abort
 
 from src.catalog import db, cache
 
-from src.catalog.models import Document, LLMAnalysis, ExtractedText, DesignElement
-from src.catalog.models import KeywordTaxonomy, KeywordSynonym, LLMKeyword
+from src.catalog.models import Document, DocumentCard, SearchDocument, KeywordTaxonomy
 from src.catalog.constants import CACHE_TIMEOUTS, DEFAULTS, SEARCH_TYPES, DOCUMENT_STATUSES
+from src.catalog.constants import SEARCH_RANKING_SETTINGS, VECTOR_INDEX_SETTINGS
+from src.catalog.constants import BATCH_SEARCH_SETTINGS, DOCUMENT_CARD_SETTINGS, FULL_TEXT_SEARCH_SETTINGS
+from src.catalog.constants import TRIGRAM_SEARCH_SETTINGS
 from src.catalog.services.preview_service import PreviewService
 from src.catalog.services.embeddings_service import EmbeddingsService
+from src.catalog.services.http_clients import run_sync
+from src.catalog.services.vector_index import document_vector_index
+from src.catalog.services.facet_service import facet_service
+from src.catalog.services.filter_index import filter_index
+from src.catalog.services.card_service import document_cards
+from src.catalog.services.taxonomy_index import taxonomy_index
+from src.catalog.utils.query_builders import build_ranked_id_query, get_document
+from src.catalog.utils.query_builders import build_id_set_query, build_vector_similarity_query
+from src.catalog.utils.ranking import fuse_rankings
+from src.catalog.utils.cursors import search_fingerprint, encode_cursor, decode_cursor, InvalidCursorError
+from src.catalog.utils.cache_keys import SEARCH as SEARCH_NAMESPACE, make_cache_key, preview_cache_key
+from src.catalog.utils.search_profiler import stage
+from src.catalog.utils.tsquery import compile_tsquery, tokenize
 
 logger = logging.getLogger(__name__)
 
@@ -33,20 +51,33 @@ class SearchService:
             self._embeddings_service = EmbeddingsService()
         return self._embeddings_service
 
-    def search(self, query: str, **kwargs) -> Tuple[List[Dict], Dict, float]:
+    def search(self, query: str, **kwargs) -> Tuple[List[Dict], Optional[Dict], Dict, Any, float]:
         """
         Main search method that orchestrates different search strategies
 
         Args:
             query: The search query string
-            **kwargs: Additional search parameters (page, sort_by, etc.)
+            **kwargs: Additional search parameters (page, sort_by, etc.);
+                profile is an optional SearchProfile that records per-stage
+                timings for this call
 
         Returns:
             Tuple containing:
             - List of formatted document results
-            - Pagination info dictionary
+            - Pagination info dictionary (None if the search failed)
+            - Taxonomy and filter facets
+            - Expanded query (None when there was no query)
             - Response time in milliseconds
+
+        Raises:
+            InvalidCursorError: The cursor was tampered with or issued for
+                different search parameters
         """
+        profile = kwargs.pop('profile', None)
+        if profile is not None:
+            with profile.activate():
+                return self.search(query, **kwargs)
+
         start_time = time.time()
 
         # Extract search parameters
@@ -66,97 +97,367 @@ class SearchService:
         # Search strategy selection
         search_type = kwargs.get('search_type', SEARCH_TYPES['HYBRID'])
 
+        # Keyset pagination: any cursor value (even empty, for the first
+        # page) switches from page numbers to cursors
+        cursor = kwargs.get('cursor')
+        use_cursor = cursor is not None
+        include_total = kwargs.get('include_total', False)
+
         # Default values
         expanded_query = None
         formatted_documents = []
         taxonomy_facets = {}
 
+        filters = {
+            'filter_type': filter_type,
+            'filter_year': filter_year,
+            'filter_location': filter_location,
+            'primary_category': primary_category,
+            'subcategory': subcategory,
+            'specific_term': specific_term
+        }
+        relevance_scores = {}
+
         try:
-            # Process query if present
+            # Expand query with related terms
             if query:
-                # Expand query with related terms
-                expanded_query = self.expand_query(query)
-
-                # Perform search based on strategy
-                if search_type == SEARCH_TYPES['KEYWORD']:
+                with stage('expand_query'):
+                    expanded_query = self.expand_query(query)
+
+            # Cursors are only valid for the query they were issued for
+            fingerprint = search_fingerprint(
+                query=query, search_type=search_type, sort_by=sort_by,
+                sort_dir=sort_direction, per_page=per_page, **filters)
+            after = decode_cursor(cursor, fingerprint) if use_cursor else None
+            next_cursor = None
+
+            if query and sort_by == 'relevance':
+                # Rank once, then page through the cached fused ranking
+                document_ids, relevance_scores, total_count, has_next = self._search_by_relevance(
+                    query, expanded_query, search_type, page, per_page, filters, after)
+                rows, _ = self._execute_search_plan(ordered_ids=document_ids)
+                if has_next and document_ids:
+                    next_cursor = encode_cursor(
+                        relevance_scores[document_ids[-1]], document_ids[-1], fingerprint)
+            else:
+                # Perform search based on strategy; queries over
+                # search_documents take the filters directly
+                if not query:
+                    # No query - return all documents
+                    base_query = self._browse_query(filters)
+                elif search_type == SEARCH_TYPES['KEYWORD']:
                     base_query = self.perform_keyword_search(
-                        query, expanded_query)
+                        query, expanded_query).filter(*self._filter_conditions(**filters))
                 elif search_type == SEARCH_TYPES['VECTOR']:
-                    base_query = self.perform_vector_search(query)
+                    base_query = self._apply_filters(
+                        self.perform_vector_search(query), **filters)
                 else:  # Default to hybrid
-                    base_query = self.perform_hybrid_search(
-                        query, expanded_query)
-            else:
-                # No query - return all documents
-                base_query = db.session.query(Document.id)
-
-            # Apply filters
-            base_query = self._apply_filters(
-                base_query,
-                filter_type=filter_type,
-                filter_year=filter_year,
-                filter_location=filter_location,
-                primary_category=primary_category,
-                subcategory=subcategory,
-                specific_term=specific_term
-            )
-
-            # Get total count for pagination
-            base_query = base_query.distinct()
-            total_count = base_query.count()
-
-            # Apply sorting and pagination
-            sorted_query = self._apply_sorting(
-                db.session.query(Document).filter(Document.id.in_(base_query)),
-                sort_by,
-                sort_direction
-            )
-
-            # Paginate results
-            documents = sorted_query.offset(
-                (page - 1) * per_page).limit(per_page).all()
-
-            # Get document IDs for eager loading
-            document_ids = [doc.id for doc in documents]
+                    base_query = self._apply_filters(
+                        self.perform_hybrid_search(query, expanded_query), **filters)
+
+                if use_cursor:
+                    # Keyset page: fetch one extra row to learn if there is more
+                    rows, _ = self._execute_search_plan(
+                        match_query=base_query,
+                        sort_by=sort_by,
+                        sort_direction=sort_direction,
+                        limit=per_page + 1,
+                        after=after,
+                        with_total=False
+                    )
+                    has_next = len(rows) > per_page
+                    rows = rows[:per_page]
+                    total_count = self._count_matches(
+                        base_query, fingerprint) if include_total else None
+                else:
+                    # Page, total and display fields in a single statement
+                    rows, total_count = self._execute_search_plan(
+                        match_query=base_query,
+                        sort_by=sort_by,
+                        sort_direction=sort_direction,
+                        offset=(page - 1) * per_page,
+                        limit=per_page
+                    )
 
-            # Fetch documents with relationships for display
-            if document_ids:
-                documents = self._fetch_documents_with_relationships(
-                    document_ids)
+                    # Past the last page there is no row to carry the total
+                    if total_count is None and page > 1:
+                        with stage('count'):
+                            total_count = base_query.distinct().count()
+                    elif total_count is None:
+                        total_count = 0
+                    has_next = page * per_page < total_count
 
-                # Get hierarchical keywords for all documents
-                all_keywords = self.get_document_hierarchical_keywords_bulk(
-                    document_ids)
+                if has_next and rows:
+                    last_row = rows[-1]
+                    sort_value = last_row.filename if sort_by == 'filename' else last_row.upload_date
+                    next_cursor = encode_cursor(sort_value, last_row.id, fingerprint)
 
+            if rows:
                 # Format documents for display
-                formatted_documents = self._format_documents_for_display(
-                    documents, all_keywords)
+                formatted_documents = self._format_search_rows(rows)
+
+                # Carry the fused relevance score through to the results
+                if relevance_scores:
+                    for doc in formatted_documents:
+                        doc['relevance_score'] = round(
+                            relevance_scores.get(doc['id'], 0.0), 6)
 
                 # Queue missing previews for generation
-                self._queue_missing_previews(
-                    [doc.filename for doc in documents])
+                self._queue_missing_previews([row.filename for row in rows])
 
             # Calculate pagination info
-            pagination = self._create_pagination_info(
-                page, per_page, total_count)
+            if use_cursor:
+                pagination = self._create_cursor_pagination_info(
+                    per_page, total_count, cursor, next_cursor)
+            else:
+                pagination = self._create_pagination_info(
+                    page, per_page, total_count)
+                pagination['next_cursor'] = next_cursor
 
             # Generate taxonomy facets for filtering
-            taxonomy_facets = self.generate_taxonomy_facets(
-                primary_category, subcategory, specific_term)
+            with stage('facets'):
+                taxonomy_facets = self.generate_taxonomy_facets(
+                    primary_category, subcategory, specific_term)
+                taxonomy_facets['filters'] = self.generate_filter_facets(filters)
 
             # Calculate response time
             response_time = (time.time() - start_time) * 1000
 
             return formatted_documents, pagination, taxonomy_facets, expanded_query, response_time
 
+        except InvalidCursorError:
+            # The caller answers with a 400 rather than silently restarting at page 1
+            raise
         except Exception as e:
             self.logger.error(f"Search error: {str(e)}", exc_info=True)
             response_time = (time.time() - start_time) * 1000
             return [], None, {}, None, response_time
 
+    def search_batch(self, queries: List[Dict], include_facets: bool = False) -> List[Dict]:
+        """
+        Run many relevance-ranked searches, sharing upstream and SQL work
+
+        Rankings not already cached are computed together: every query text
+        is embedded in one embeddings API call, the keyword stage for all
+        queries is a single statement, and the pages of every query are
+        fetched in one page statement.
+
+        Args:
+            queries: Dictionaries with 'q' and optionally 'id', 'search_type',
+                'page', 'per_page' and the filter parameters of search()
+            include_facets: Add taxonomy facets to each result (computed once
+                per distinct category selection)
+
+        Returns:
+            One result dictionary per query, in request order, with 'id',
+            'query', 'results', 'pagination' and 'expanded_terms' (or 'error')
+        """
+        filter_names = ('filter_type', 'filter_year', 'filter_location',
+                        'primary_category', 'subcategory', 'specific_term')
+        entries = []
+        for position, item in enumerate(queries):
+            entry = {'id': item.get('id', position),
+                     'query': str(item.get('q') or '').strip(),
+                     'expanded': None}
+            try:
+                if not entry['query']:
+                    raise ValueError("Missing query text")
+                entry.update(
+                    search_type=item.get('search_type') or SEARCH_TYPES['HYBRID'],
+                    page=max(int(item.get('page') or 1), 1),
+                    per_page=min(max(int(item.get('per_page') or DEFAULTS['SEARCH_RESULTS_PER_PAGE']), 1),
+                                 BATCH_SEARCH_SETTINGS['MAX_PER_PAGE']),
+                    filters={name: str(item.get(name) or '') for name in filter_names})
+            except (TypeError, ValueError) as e:
+                entry['error'] = str(e)
+            entries.append(entry)
+
+        valid = [entry for entry in entries if 'error' not in entry]
+        with stage('expand_query'):
+            for entry in valid:
+                entry['expanded'] = self.expand_query(entry['query'])
+
+        rankings = self._rank_documents_batch(valid)
+
+        # Page every query, then fetch all pages in one statement
+        for entry in valid:
+            try:
+                page_ids, scores, total_count, _ = self._page_ranking(
+                    rankings[entry['query'], entry['search_type']],
+                    entry['page'], entry['per_page'], entry['filters'])
+                entry.update(page_ids=page_ids, scores=scores, total_count=total_count)
+            except Exception as e:
+                self.logger.error(f"Batch search error for '{entry['query']}': {str(e)}")
+                db.session.rollback()
+                entry['error'] = str(e)
+
+        page_ids = list(dict.fromkeys(
+            doc_id for entry in entries if 'error' not in entry for doc_id in entry['page_ids']))
+        rows, _ = self._execute_search_plan(ordered_ids=page_ids)
+        documents = {doc['id']: doc for doc in self._format_search_rows(rows)}
+        self._queue_missing_previews([row.filename for row in rows])
+
+        facets = {}
+        results = []
+        for entry in entries:
+            if 'error' in entry:
+                results.append({'id': entry['id'], 'query': entry['query'], 'error': entry['error']})
+                continue
+
+            page_documents = []
+            for doc_id in entry['page_ids']:
+                if doc_id in documents:
+                    doc = dict(documents[doc_id])
+                    doc['relevance_score'] = round(entry['scores'].get(doc_id, 0.0), 6)
+                    page_documents.append(doc)
+
+            expanded = entry['expanded']
+            result = {
+                'id': entry['id'],
+                'query': entry['query'],
+                'results': page_documents,
+                'pagination': self._create_pagination_info(
+                    entry['page'], entry['per_page'], entry['total_count']),
+                'expanded_terms': sorted(expanded) if isinstance(expanded, set) else expanded,
+            }
+            if include_facets:
+                selection = (entry['filters']['primary_category'],
+                             entry['filters']['subcategory'],
+                             entry['filters']['specific_term'])
+                if selection not in facets:
+                    with stage('facets'):
+                        facets[selection] = self.generate_taxonomy_facets(*selection)
+                result['taxonomy_facets'] = facets[selection]
+            results.append(result)
+
+        return results
+
+    def _rank_documents_batch(self, entries: List[Dict]) -> Dict[Tuple[str, str], List[Tuple[int, float]]]:
+        """
+        rank_documents for many queries, computing the cache misses together
+
+        Returns:
+            Ranking keyed by (query, search_type)
+        """
+        rankings = {}
+        pending = {}
+        for entry in entries:
+            key = (entry['query'], entry['search_type'])
+            if key in rankings or key in pending:
+                continue
+            cache_key = self._ranking_cache_key(*key)
+            ranked = cache.get(cache_key)
+            if ranked is not None:
+                rankings[key] = ranked
+            else:
+                pending[key] = (cache_key, entry['expanded'])
+
+        if not pending:
+            return rankings
+
+        keyword_keys = [key for key in pending if key[1] != SEARCH_TYPES['VECTOR']]
+        vector_keys = [key for key in pending if key[1] != SEARCH_TYPES['KEYWORD']]
+
+        keyword_ranked = dict(zip(keyword_keys, self.batch_keyword_candidates(
+            [(query, pending[query, search_type][1]) for query, search_type in keyword_keys])))
+        vector_ranked = dict(zip(vector_keys, self.batch_vector_candidates(
+            [query for query, _ in vector_keys])))
+
+        for key, (cache_key, _) in pending.items():
+            query, search_type = key
+            if search_type == SEARCH_TYPES['KEYWORD']:
+                ranked = keyword_ranked[key]
+            elif search_type == SEARCH_TYPES['VECTOR']:
+                ranked = vector_ranked[key] or self.keyword_candidates(query, set([query]))
+            else:
+                ranked = self._fuse_candidates(keyword_ranked[key], vector_ranked[key])
+
+            # Break score ties by ID so cursors over the ranking are stable
+            ranked = sorted(ranked, key=lambda item: (-item[1], item[0]))
+            cache.set(cache_key, ranked, timeout=CACHE_TIMEOUTS['SEARCH'])
+            rankings[key] = ranked
+
+        return rankings
+
+    def _keyword_match(self, query: str, expanded_query: Optional[Union[str, Set[str]]] = None):
+        """
+        Build the keyword match condition and a relevance score for it
+
+        Args:
+            query: Original search query
+            expanded_query: Expanded query terms (optional)
+
+        Returns:
+            Tuple of (match condition, score expression)
+        """
+        tsquery_text = self._tsquery_text(query, expanded_query)
+        if not tsquery_text:
+            # No letters or digits left (punctuation only), so there is no
+            # lexeme or trigram to look up; matches no document
+            return false(), literal(0.0)
+        return self._full_text_match(tsquery_text)
+
+    def _trigram_match(self, query: str):
+        """
+        Build a pg_trgm fuzzy match condition and word-similarity score
+
+        Used when full-text search finds nothing, typically a misspelled or
+        partial word. The <% operator is served by the GIN trigram index on
+        search_documents.search_text and filters on the session's
+        word_similarity_threshold, which is set from TRIGRAM_SEARCH_SETTINGS
+        for the current transaction.
+
+        Args:
+            query: Original search query
+
+        Returns:
+            Tuple of (match condition, score expression)
+        """
+        search_text = " ".join(tokenize(query))
+        if not search_text:
+            return false(), literal(0.0)
+
+        db.session.execute(select(func.set_config(
+            'pg_trgm.word_similarity_threshold',
+            str(TRIGRAM_SEARCH_SETTINGS['WORD_SIMILARITY_THRESHOLD']), True)))
+        condition = literal(search_text).op('<%')(SearchDocument.search_text)
+        score = func.word_similarity(search_text, SearchDocument.search_text)
+        return condition, score
+
+    @staticmethod
+    def _tsquery_text(query, expanded_query):
+        """Compiled tsquery text for a query and its expansion"""
+        expanded_terms = expanded_query if isinstance(expanded_query, set) else None
+        return compile_tsquery(query, expanded_terms)
+
+    @staticmethod
+    def _full_text_match(search_query):
+        """
+        Build a full-text match condition and weighted ts_rank_cd score
+
+        Both read the combined vector in search_documents, so the match is
+        one GIN index probe and the field weights written by
+        refresh_search_documents() (filename and summary A, main message B,
+        text content C) decide the score.
+
+        Args:
+            search_query: Compiled tsquery text, as a string or a SQL expression
+
+        Returns:
+            Tuple of (match condition, score expression)
+        """
+        settings = FULL_TEXT_SEARCH_SETTINGS
+        tsquery = func.to_tsquery(settings['CONFIG'], search_query)
+        condition = SearchDocument.search_vector.op('@@')(tsquery)
+        score = func.ts_rank_cd(
+            cast(settings['WEIGHTS'], ARRAY(REAL)), SearchDocument.search_vector, tsquery,
+            settings['NORMALIZATION'])
+        return condition, score
+
     def perform_keyword_search(self, query: str, expanded_query: Optional[Union[str, Set[str]]] = None):
         """
-        Perform keyword-based search using PostgreSQL full-text search or ILIKE
+        Perform keyword-based search using PostgreSQL full-text search,
+        falling back to trigram matching when no document matches
 
         Args:
             query: Original search query
@@ -166,86 +467,83 @@ class SearchService:
             SQLAlchemy query object with document IDs
         """
         try:
-            # If we have search_vector column available, use full-text search
-            if hasattr(Document, 'search_vector') and hasattr(LLMAnalysis, 'search_vector'):
-                self.logger.info("Using PostgreSQL full-text search")
-
-                # Format query for tsquery if it's a string of terms
-                if isinstance(expanded_query, str):
-                    search_query = expanded_query
-                elif isinstance(expanded_query, set):
-                    search_query = " | ".join(expanded_query)
-                else:
-                    search_query = query
-
-                # Perform full-text search across multiple tables
-                combined_query = db.session.query(
-                    Document.id
-                ).outerjoin(
-                    LLMAnalysis, Document.id == LLMAnalysis.document_id
-                ).outerjoin(
-                    ExtractedText, Document.id == ExtractedText.document_id
-                ).filter(
-                    or_(
-                        Document.search_vector.op(
-                            '@@')(func.to_tsquery('english', search_query)),
-                        LLMAnalysis.search_vector.op(
-                            '@@')(func.to_tsquery('english', search_query)),
-                        ExtractedText.search_vector.op(
-                            '@@')(func.to_tsquery('english', search_query))
-                    )
-                )
+            condition, _ = self._keyword_match(query, expanded_query)
+            keyword_query = db.session.query(SearchDocument.document_id).filter(condition)
+            if keyword_query.first() is not None:
+                return keyword_query
+
+        except Exception as e:
+            self.logger.error(
+                f"Error in keyword search: {str(e)}", exc_info=True)
+            db.session.rollback()
 
-                return combined_query
+        try:
+            condition, _ = self._trigram_match(query)
+            return db.session.query(SearchDocument.document_id).filter(condition)
+        except Exception as e:
+            self.logger.error(
+                f"Error in trigram search: {str(e)}", exc_info=True)
+            db.session.rollback()
+            return db.session.query(SearchDocument.document_id).filter(false())
 
-            else:
-                # Fall back to basic ILIKE search
-                self.logger.info(
-                    "Using ILIKE search (full-text search not available)")
+    def keyword_candidates(self, query: str, expanded_query: Optional[Union[str, Set[str]]] = None) -> List[Tuple[int, float]]:
+        """
+        Score keyword matches for relevance ranking
 
-                # Prepare search terms
-                if isinstance(expanded_query, set):
-                    search_terms = expanded_query
-                else:
-                    search_terms = {query}
-
-                # Build a query that searches across multiple fields
-                combined_query = db.session.query(
-                    Document.id
-                ).outerjoin(
-                    LLMAnalysis, Document.id == LLMAnalysis.document_id
-                ).outerjoin(
-                    ExtractedText, Document.id == ExtractedText.document_id
-                ).outerjoin(
-                    DesignElement, Document.id == DesignElement.document_id
-                )
+        Args:
+            query: Original search query
+            expanded_query: Expanded query terms (optional)
 
-                # Build conditions for each term and each field
-                conditions = []
-                for term in search_terms:
-                    term_conditions = [
-                        Document.filename.ilike(f'%{term}%'),
-                        LLMAnalysis.summary_description.ilike(f'%{term}%'),
-                        LLMAnalysis.campaign_type.ilike(f'%{term}%'),
-                        LLMAnalysis.election_year.ilike(f'%{term}%'),
-                        ExtractedText.text_content.ilike(f'%{term}%'),
-                        ExtractedText.main_message.ilike(f'%{term}%'),
-                        ExtractedText.supporting_text.ilike(f'%{term}%'),
-                        DesignElement.geographic_location.ilike(f'%{term}%')
-                    ]
-                    conditions.append(or_(*term_conditions))
-
-                # Add the combined conditions to the query
-                if conditions:
-                    combined_query = combined_query.filter(or_(*conditions))
-
-                return combined_query
+        Returns:
+            List of (document_id, score) tuples, best match first
+        """
+        try:
+            with stage('keyword_sql'):
+                rows = self._top_matches(*self._keyword_match(query, expanded_query))
+        except Exception as e:
+            self.logger.error(
+                f"Error scoring keyword matches: {str(e)}", exc_info=True)
+            db.session.rollback()
+            rows = []
+
+        return rows or self.trigram_candidates(query)
+
+    def trigram_candidates(self, query: str) -> List[Tuple[int, float]]:
+        """
+        Score fuzzy trigram matches, for queries full-text search misses
+
+        Args:
+            query: Original search query
 
+        Returns:
+            List of (document_id, word similarity) tuples, best match first
+        """
+        try:
+            with stage('trigram_sql'):
+                return self._top_matches(*self._trigram_match(query))
         except Exception as e:
             self.logger.error(
-                f"Error in keyword search: {str(e)}", exc_info=True)
-            # Return a simple query that matches on filename as fallback
-            return db.session.query(Document.id).filter(Document.filename.ilike(f'%{query}%'))
+                f"Error scoring trigram matches: {str(e)}", exc_info=True)
+            db.session.rollback()
+            return []
+
+    @staticmethod
+    def _top_matches(condition, score) -> List[Tuple[int, float]]:
+        """The best KEYWORD_CANDIDATES matches as (document_id, score) tuples"""
+        rows = db.session.query(
+            SearchDocument.document_id, score.label('score')
+        ).filter(
+            condition
+        ).order_by(
+            desc('score'), SearchDocument.document_id
+        ).limit(SEARCH_RANKING_SETTINGS['KEYWORD_CANDIDATES']).all()
+        return [(doc_id, float(score or 0)) for doc_id, score in rows]
+
+    def _get_query_embeddings(self, query: str):
+        """Generate the embedding for a search query, or None on failure"""
+        # Runs on the process-wide loop so the pooled API connection is reused
+        with stage('query_embedding'):
+            return run_sync(self.embeddings_service.generate_query_embeddings(query))
 
     def search_document_ids(self, query: str, expanded_query=None):
         """
@@ -263,23 +561,11 @@ class SearchService:
             if query:
                 # Attempt vector search if available
                 try:
-                    import asyncio
-
-                    # Create new event loop for each request
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-
-                    try:
-                        # Get embeddings
-                        query_embeddings = loop.run_until_complete(
-                            self.embeddings_service.generate_query_embeddings(query))
-                    finally:
-                        # Always close the loop
-                        loop.close()
+                    query_embeddings = self._get_query_embeddings(query)
 
                     if query_embeddings:
                         # Use vector search from query builders
-                        from catalog.utils.query_builders import search_document_ids_by_vector
+                        from src.catalog.utils.query_builders import search_document_ids_by_vector
                         vector_results = search_document_ids_by_vector(
                             query_embeddings)
 
@@ -302,31 +588,149 @@ class SearchService:
             self.logger.error(f"Error in search_document_ids: {str(e)}")
             return []
 
+    def vector_candidates(self, query: str) -> List[Tuple[int, float]]:
+        """
+        Score semantic matches for relevance ranking
+
+        Args:
+            query: Search query string
+
+        Returns:
+            List of (document_id, similarity) tuples, best match first
+        """
+        try:
+            document_vector_index.ensure_fresh()
+            if not document_vector_index.ready and not hasattr(SearchDocument, 'embedding'):
+                return []
+
+            query_embeddings = self._get_query_embeddings(query)
+            if not query_embeddings:
+                return []
+
+            similarity_threshold = DEFAULTS['VECTOR_SIMILARITY_THRESHOLD']
+
+            with stage('vector_sql'):
+                if document_vector_index.ready:
+                    return document_vector_index.search(
+                        query_embeddings, threshold=similarity_threshold)
+
+                rows = build_vector_similarity_query(
+                    query_embeddings, similarity_threshold
+                ).limit(VECTOR_INDEX_SETTINGS['TOP_K']).all()
+            return [(doc_id, float(similarity)) for doc_id, similarity in rows]
+        except Exception as e:
+            self.logger.error(f"Error scoring vector matches: {str(e)}")
+            db.session.rollback()
+            return []
+
+    def batch_keyword_candidates(self, entries: List[Tuple[str, Optional[Union[str, Set[str]]]]]) -> List[List[Tuple[int, float]]]:
+        """
+        keyword_candidates for many queries in one statement
+
+        The queries are a VALUES list; each is scored by a LATERAL subquery
+        over search_documents that keeps its own top KEYWORD_CANDIDATES matches.
+
+        Args:
+            entries: (query, expanded_query) pairs
+
+        Returns:
+            One list of (document_id, score) tuples per entry, best match first
+        """
+        if not entries:
+            return []
+
+        try:
+            with stage('keyword_sql'):
+                queries = values(
+                    column('query_id', Integer), column('query_text', Text), name='q'
+                ).data([(position, self._tsquery_text(query, expanded))
+                        for position, (query, expanded) in enumerate(entries)])
+                condition, score = self._full_text_match(queries.c.query_text)
+                hits = select(
+                    SearchDocument.document_id, score.label('score')
+                ).where(
+                    condition
+                ).order_by(
+                    desc('score'), SearchDocument.document_id
+                ).limit(SEARCH_RANKING_SETTINGS['KEYWORD_CANDIDATES']).lateral('hits')
+
+                statement = select(
+                    queries.c.query_id, hits.c.document_id, hits.c.score
+                ).select_from(queries).join(hits, true())
+                rows = db.session.execute(statement).all()
+
+            ranked = [[] for _ in entries]
+            for query_id, doc_id, score in rows:
+                ranked[query_id].append((doc_id, float(score or 0)))
+            for candidates in ranked:
+                candidates.sort(key=lambda item: (-item[1], item[0]))
+        except Exception as e:
+            self.logger.error(
+                f"Error scoring batched keyword matches: {str(e)}", exc_info=True)
+            db.session.rollback()
+            ranked = [[] for _ in entries]
+
+        # Queries with no full-text match get the fuzzy fallback
+        return [candidates or self.trigram_candidates(query)
+                for candidates, (query, _) in zip(ranked, entries)]
+
+    def batch_vector_candidates(self, queries: List[str]) -> List[List[Tuple[int, float]]]:
+        """
+        vector_candidates for many queries, embedding them in one API call
+
+        Args:
+            queries: Search query strings
+
+        Returns:
+            One list of (document_id, similarity) tuples per query
+        """
+        if not queries:
+            return []
+
+        try:
+            document_vector_index.ensure_fresh()
+            if not document_vector_index.ready and not hasattr(SearchDocument, 'embedding'):
+                return [[] for _ in queries]
+
+            with stage('query_embedding'):
+                embeddings = run_sync(
+                    self.embeddings_service.generate_query_embeddings_batch(queries))
+
+            similarity_threshold = DEFAULTS['VECTOR_SIMILARITY_THRESHOLD']
+            ranked = []
+            with stage('vector_sql'):
+                for query_embeddings in embeddings:
+                    if not query_embeddings:
+                        ranked.append([])
+                    elif document_vector_index.ready:
+                        ranked.append(document_vector_index.search(
+                            query_embeddings, threshold=similarity_threshold))
+                    else:
+                        rows = build_vector_similarity_query(
+                            query_embeddings, similarity_threshold
+                        ).limit(VECTOR_INDEX_SETTINGS['TOP_K']).all()
+                        ranked.append([(doc_id, float(similarity)) for doc_id, similarity in rows])
+            return ranked
+        except Exception as e:
+            self.logger.error(f"Error scoring batched vector matches: {str(e)}")
+            db.session.rollback()
+            return [[] for _ in queries]
+
     def perform_vector_search(self, query: str):
         """
         Perform vector-based semantic search with pgvector
         """
         try:
+            # Make sure the in-process ANN index is loaded and current
+            document_vector_index.ensure_fresh()
+
             # Check if vector search is available
-            if not hasattr(Document, 'embeddings'):
+            if not document_vector_index.ready and not hasattr(SearchDocument, 'embedding'):
                 self.logger.warning(
-                    "Vector search not available - Document model doesn't have embeddings attribute")
+                    "Vector search not available - SearchDocument model doesn't have embedding attribute")
                 return self.perform_keyword_search(query, set([query]))
 
-            # Run the async function to get query embeddings - changes needed here
-            import asyncio
-
-            # Create a new event loop for each request to avoid issues
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-            try:
-                # Get embeddings and ensure we have a result, not a coroutine
-                query_embeddings = loop.run_until_complete(
-                    self.embeddings_service.generate_query_embeddings(query))
-            finally:
-                # Always close the loop
-                loop.close()
+            query_embeddings = self._get_query_embeddings(query)
 
             if not query_embeddings:
                 # Fall back to keyword search if embeddings generation fails
@@ -337,49 +741,17 @@ class SearchService:
             # Use a lower threshold to catch more semantic relationships
             similarity_threshold = DEFAULTS['VECTOR_SIMILARITY_THRESHOLD']
 
-            # Use cosine similarity with pgvector
-            # Find documents with similar embeddings using pgvector's <=> operator for cosine distance
-            doc_matches = db.session.query(
-                Document.id,
-                (1 - (Document.embeddings.op('<=>')
-                 (query_embeddings))).label('similarity')
-            ).filter(
-                Document.embeddings.is_not(None)
-            ).filter(
-                (1 - (Document.embeddings.op('<=>')
-                 (query_embeddings))) > similarity_threshold
-            ).subquery()
-
-            # Find analysis content with similar embeddings
-            analysis_matches = db.session.query(
-                LLMAnalysis.document_id,
-                (1 - (LLMAnalysis.embeddings.op('<=>')
-                 (query_embeddings))).label('similarity')
-            ).filter(
-                LLMAnalysis.embeddings.is_not(None)
-            ).filter(
-                (1 - (LLMAnalysis.embeddings.op('<=>')
-                 (query_embeddings))) > similarity_threshold
-            ).subquery()
-
-            # Combine the results and order by similarity score
-            combined_query = db.session.query(
-                Document.id
-            ).outerjoin(
-                doc_matches, Document.id == doc_matches.c.id
-            ).outerjoin(
-                analysis_matches, Document.id == analysis_matches.c.document_id
-            ).filter(
-                or_(
-                    doc_matches.c.id.is_not(None),
-                    analysis_matches.c.document_id.is_not(None)
-                )
-            ).order_by(
-                (func.coalesce(doc_matches.c.similarity, 0) +
-                 func.coalesce(analysis_matches.c.similarity, 0)).desc()
-            )
+            # Answer from the in-process index when it is loaded
+            if document_vector_index.ready:
+                with stage('vector_sql'):
+                    ranked = document_vector_index.search(
+                        query_embeddings, threshold=similarity_threshold)
+                return build_ranked_id_query([doc_id for doc_id, _ in ranked])
 
-            return combined_query
+            # Use cosine similarity with pgvector
+            return build_vector_similarity_query(
+                query_embeddings, similarity_threshold
+            ).with_entities(SearchDocument.document_id)
 
         except Exception as e:
             self.logger.error(f"Vector search error: {str(e)}")
@@ -404,7 +776,8 @@ class SearchService:
             vector_results = self.perform_vector_search(query)
 
             # Combine results (union)
-            combined_results = keyword_results.union(vector_results)
+            combined_results = keyword_results.union(
+                vector_results.order_by(None))
 
             return combined_results
         except Exception as e:
@@ -413,7 +786,110 @@ class SearchService:
             # Fall back to keyword search
             return self.perform_keyword_search(query, expanded_query)
 
-    @cache.memoize(timeout=CACHE_TIMEOUTS['TAXONOMY'])
+    def rank_documents(self, query: str, expanded_query: Optional[Union[str, Set[str]]] = None,
+                       search_type: str = SEARCH_TYPES['HYBRID']) -> List[Tuple[int, float]]:
+        """
+        Rank documents by relevance, scoring each strategy once per query
+
+        Keyword rank and vector similarity are fused (reciprocal rank fusion
+        by default) and the ranking is cached so that paging through results
+        doesn't repeat either stage.
+
+        Args:
+            query: Search query string
+            expanded_query: Expanded query terms (optional)
+            search_type: Search strategy
+
+        Returns:
+            List of (document_id, score) tuples, best match first
+        """
+        cache_key = self._ranking_cache_key(query, search_type)
+        ranked = cache.get(cache_key)
+        if ranked is not None:
+            return ranked
+
+        if search_type == SEARCH_TYPES['KEYWORD']:
+            ranked = self.keyword_candidates(query, expanded_query)
+        elif search_type == SEARCH_TYPES['VECTOR']:
+            ranked = self.vector_candidates(query) or self.keyword_candidates(
+                query, set([query]))
+        else:
+            ranked = self._fuse_candidates(
+                self.keyword_candidates(query, expanded_query),
+                self.vector_candidates(query))
+
+        # Break score ties by ID so cursors over the ranking are stable
+        ranked = sorted(ranked, key=lambda item: (-item[1], item[0]))
+
+        cache.set(cache_key, ranked, timeout=CACHE_TIMEOUTS['SEARCH'])
+        return ranked
+
+    @staticmethod
+    def _ranking_cache_key(query, search_type):
+        return make_cache_key(
+            SEARCH_NAMESPACE, 'ranking', search_type, query.strip().lower())
+
+    @staticmethod
+    def _fuse_candidates(keyword_ranked, vector_ranked):
+        """Fuse keyword and vector candidates for hybrid search"""
+        return fuse_rankings(
+            [keyword_ranked, vector_ranked],
+            method=SEARCH_RANKING_SETTINGS['FUSION_METHOD'],
+            weights=[SEARCH_RANKING_SETTINGS['KEYWORD_WEIGHT'],
+                     SEARCH_RANKING_SETTINGS['VECTOR_WEIGHT']],
+            k=SEARCH_RANKING_SETTINGS['RRF_K']
+        )
+
+    def _search_by_relevance(self, query, expanded_query, search_type, page, per_page, filters, after=None):
+        """
+        Page through relevance-ranked results without re-sorting in SQL
+
+        Args:
+            after: Decoded cursor (score and ID of the previous page's last
+                row); when given, page is ignored
+
+        Returns:
+            Tuple of (page of document IDs, score by ID, total count, has next page)
+        """
+        ranked = self.rank_documents(query, expanded_query, search_type)
+        return self._page_ranking(ranked, page, per_page, filters, after)
+
+    def _page_ranking(self, ranked, page, per_page, filters, after=None):
+        """
+        One page of a ranking, after narrowing it with the filters
+
+        Returns:
+            Tuple of (page of document IDs, score by ID, total count, has next page)
+        """
+        scores = dict(ranked)
+
+        # Filters only narrow the ranked set; the order stays the fused one
+        if ranked and any(filters.values()):
+            with stage('filter_index'):
+                allowed = filter_index.filter_ids(list(scores), filters)
+            if allowed is None:
+                filtered_query = db.session.query(SearchDocument.document_id).filter(
+                    SearchDocument.document_id.in_(list(scores)),
+                    *self._filter_conditions(**filters)
+                )
+                with stage('filter_sql'):
+                    allowed = {doc_id for doc_id, in filtered_query.all()}
+            ordered_ids = [doc_id for doc_id, _ in ranked if doc_id in allowed]
+        else:
+            ordered_ids = [doc_id for doc_id, _ in ranked]
+
+        if after is not None:
+            # Resume after the cursor's (score, id) in (-score, id) order
+            cursor_key = (-after['value'], after['id'])
+            start = bisect.bisect_right(
+                [(-scores[doc_id], doc_id) for doc_id in ordered_ids], cursor_key)
+        else:
+            start = (page - 1) * per_page
+
+        page_ids = ordered_ids[start:start + per_page]
+        has_next = start + per_page < len(ordered_ids)
+        return page_ids, scores, len(ordered_ids), has_next
+
     def expand_query(self, query: str) -> Union[str, Set[str]]:
         """
         Expand search query with related terms from taxonomy
@@ -427,192 +903,84 @@ class SearchService:
         if not query or len(query.strip()) < 3:
             return query  # Don't expand very short queries
 
-        expanded_terms = set([query.lower()])  # Start with original query
-
         try:
-            # Find direct matches in taxonomy
-            direct_matches = KeywordTaxonomy.query.filter(
-                KeywordTaxonomy.term.ilike(f"%{query}%")
-            ).all()
-
-            # Find matches in synonyms
-            synonym_matches = db.session.query(
-                KeywordTaxonomy
-            ).join(
-                KeywordSynonym, KeywordTaxonomy.id == KeywordSynonym.taxonomy_id
-            ).filter(
-                KeywordSynonym.synonym.ilike(f"%{query}%")
-            ).all()
-
-            # Combine unique matches
-            all_matches = {
-                term.id: term for term in direct_matches + synonym_matches}
-
-            # Add matched terms and synonyms to expanded terms
-            for term_id, term in all_matches.items():
-                expanded_terms.add(term.term.lower())
-
-                # Find and add all synonyms
-                synonyms = KeywordSynonym.query.filter_by(
-                    taxonomy_id=term.id).all()
-                for syn in synonyms:
-                    expanded_terms.add(syn.synonym.lower())
-
-                # If we have a subcategory, add related terms in the same subcategory
-                if term.subcategory:
-                    related_terms = KeywordTaxonomy.query.filter_by(
-                        primary_category=term.primary_category,
-                        subcategory=term.subcategory
-                    ).all()
-
-                    for related in related_terms:
-                        expanded_terms.add(related.term.lower())
-
-            # Remove very short terms (less than 3 chars) and the original query
+            # Matched terms, their synonyms and same-subcategory siblings
+            expanded_terms = taxonomy_index.expand(query.strip())
+
+            # Remove very short terms (less than 3 chars)
             expanded_terms = {
                 term for term in expanded_terms if len(term) >= 3}
 
-            # Add original query back if it was removed
+            # Always keep the original query
             expanded_terms.add(query.lower())
 
             self.logger.info(f"Expanded query '{query}' to: {expanded_terms}")
 
-            # For PostgreSQL full-text search, format properly
-            if hasattr(Document, 'search_vector'):
-                # Use the | operator for OR in tsquery
-                return " | ".join(expanded_terms)
-            else:
-                # For ILIKE queries, we'll use the expanded terms list directly
-                return expanded_terms
+            # Full-text search compiles the set into a tsquery
+            return expanded_terms
 
         except Exception as e:
             self.logger.error(f"Error in query expansion: {str(e)}")
             return query  # Fall back to original query on error
 
-    @cache.memoize(timeout=CACHE_TIMEOUTS['TAXONOMY'])
     def generate_taxonomy_facets(self, selected_primary=None, selected_subcategory=None, selected_term=None):
         """
-        Generate taxonomy facets for sidebar filtering with terms using LLMKeywords
+        Generate taxonomy facets for sidebar filtering from the materialized
+        document counts in taxonomy_facet_counts
         """
         try:
-            # Query for primary categories through LLMKeyword relationship
-            primary_categories = db.session.query(
-                KeywordTaxonomy.primary_category,
-                func.count(LLMKeyword.id.distinct()).label('count')
-            ).join(
-                LLMKeyword, KeywordTaxonomy.id == LLMKeyword.taxonomy_id
-            ).group_by(
-                KeywordTaxonomy.primary_category
-            ).filter(
-                KeywordTaxonomy.primary_category.isnot(
-                    None)  # Ensure non-null values
-            ).order_by(
-                KeywordTaxonomy.primary_category
-            ).all()
-
-            # Log for debugging
-            self.logger.info(
-                f"Found {len(primary_categories)} primary categories from LLMKeywords")
-
-            # If no results, try direct query on KeywordTaxonomy without joins
-            if not primary_categories:
-                self.logger.warning(
-                    "No primary categories found with LLMKeyword join, trying direct query")
-                primary_categories = db.session.query(
-                    KeywordTaxonomy.primary_category,
-                    func.count(KeywordTaxonomy.id).label('count')
-                ).filter(
-                    KeywordTaxonomy.primary_category.isnot(None)
-                ).group_by(
-                    KeywordTaxonomy.primary_category
-                ).order_by(
-                    KeywordTaxonomy.primary_category
-                ).all()
-
-                self.logger.info(
-                    f"Direct query found {len(primary_categories)} primary categories")
-
-            # Get subcategories if primary category selected
-            subcategories = []
-            if selected_primary:
-                subcategories = db.session.query(
-                    KeywordTaxonomy.subcategory,
-                    func.count(LLMKeyword.id.distinct()).label('count')
-                ).join(
-                    LLMKeyword, KeywordTaxonomy.id == LLMKeyword.taxonomy_id
-                ).filter(
-                    KeywordTaxonomy.primary_category == selected_primary,
-                    KeywordTaxonomy.subcategory.isnot(None)
-                ).group_by(
-                    KeywordTaxonomy.subcategory
-                ).order_by(
-                    KeywordTaxonomy.subcategory
-                ).all()
-
-            # Get terms if both primary and subcategory selected
-            terms = []
-            if selected_primary and selected_subcategory:
-                terms = db.session.query(
-                    KeywordTaxonomy.term,
-                    func.count(LLMKeyword.id.distinct()).label('count')
-                ).join(
-                    LLMKeyword, KeywordTaxonomy.id == LLMKeyword.taxonomy_id
-                ).filter(
-                    KeywordTaxonomy.primary_category == selected_primary,
-                    KeywordTaxonomy.subcategory == selected_subcategory
-                ).group_by(
-                    KeywordTaxonomy.term
-                ).order_by(
-                    KeywordTaxonomy.term
-                ).all()
-
-            # Format results
-            result = {
-                'primary_categories': [
-                    {
-                        'name': cat,
-                        'count': count,
-                        'selected': cat == selected_primary
-                    }
-                    # Skip empty categories
-                    for cat, count in primary_categories if cat
-                ],
-                'subcategories': [
-                    {
-                        'name': subcat,
-                        'count': count,
-                        'selected': subcat == selected_subcategory
-                    }
-                    # Skip empty subcategories
-                    for subcat, count in subcategories if subcat
-                ] if selected_primary else [],
-                'terms': [
-                    {
-                        'name': term,
-                        'count': count,
-                        'selected': term == selected_term
-                    }
-                    for term, count in terms if term  # Skip empty terms
-                ] if selected_primary and selected_subcategory else []
-            }
-
-            return result
+            return facet_service.get_facets(
+                selected_primary, selected_subcategory, selected_term)
         except Exception as e:
             self.logger.error(
                 f"Error generating taxonomy facets: {str(e)}", exc_info=True)
             # Return empty but properly structured result on error
             return {'primary_categories': [], 'subcategories': [], 'terms': []}
 
-    def _apply_filters(self, query, **filters):
+    def _browse_query(self, filters):
         """
-        Apply filters to the search query
+        Documents matching the filters, for browsing without a text query
+
+        The in-process filter index answers when it is loaded, so no
+        filter reaches SQL; otherwise the filters run on search_documents.
+
+        Args:
+            filters: Filter parameters
+
+        Returns:
+            SQLAlchemy query with document IDs
+        """
+        if any(filters.values()):
+            with stage('filter_index'):
+                document_ids = filter_index.matching_ids(filters)
+            if document_ids is not None:
+                return build_id_set_query(document_ids)
+        return db.session.query(SearchDocument.document_id).filter(
+            *self._filter_conditions(**filters))
+
+    def generate_filter_facets(self, filters):
+        """
+        Year, tone and location counts within the documents the filters select
+
+        Returns:
+            Dictionary of field to [{'value', 'count'}], or {} when the
+            filter index isn't available
+        """
+        try:
+            return filter_index.facet_counts(filters) or {}
+        except Exception as e:
+            self.logger.error(f"Error generating filter facets: {str(e)}")
+            return {}
+
+    def _filter_conditions(self, **filters):
+        """
+        Filter conditions on search_documents
 
         Args:
-            query: Base SQLAlchemy query
             **filters: Filter parameters
 
         Returns:
-            SQLAlchemy query with filters applied
+            List of SQLAlchemy conditions, empty when no filter is set
         """
         # Extract filter parameters
         filter_type = filters.get('filter_type', '')
@@ -622,223 +990,260 @@ class SearchService:
         subcategory = filters.get('subcategory', '')
         specific_term = filters.get('specific_term', '')
 
+        conditions = []
+
         # Apply document type filter
         if filter_type:
-            query = query.join(LLMAnalysis, Document.id ==
-                               LLMAnalysis.document_id, isouter=True)
             if ',' in filter_type:
-                doc_type_list = filter_type.split(',')
-                query = query.filter(
-                    LLMAnalysis.document_tone.in_(doc_type_list))
+                conditions.append(
+                    SearchDocument.document_tone.in_(filter_type.split(',')))
             else:
-                query = query.filter(LLMAnalysis.document_tone == filter_type)
+                conditions.append(SearchDocument.document_tone == filter_type)
 
         # Apply year filter
         if filter_year:
-            if not filter_type:  # Only join if not already joined
-                query = query.join(LLMAnalysis, Document.id ==
-                                   LLMAnalysis.document_id, isouter=True)
-            query = query.filter(LLMAnalysis.election_year == filter_year)
+            conditions.append(SearchDocument.election_year == filter_year)
 
-        # Apply location filter
+        # Apply location filter; the column is stored lowercased and
+        # served by a trigram index
         if filter_location:
-            query = query.join(
-                DesignElement, Document.id == DesignElement.document_id, isouter=True
-            ).filter(
-                func.lower(DesignElement.geographic_location).like(
-                    f"%{filter_location.lower()}%")
-            )
+            conditions.append(SearchDocument.location.like(
+                f"%{filter_location.strip().lower()}%"))
 
-        # Apply taxonomy filters with improved performance
+        # Apply taxonomy filters: overlap with the matching taxonomy IDs
         if primary_category:
-            # Use a subquery to get document IDs that match the taxonomy criteria
-            taxonomy_query = db.session.query(LLMKeyword.document_id).join(
-                KeywordTaxonomy, LLMKeyword.taxonomy_id == KeywordTaxonomy.id
-            ).filter(
+            taxonomy_query = select(KeywordTaxonomy.id).where(
                 KeywordTaxonomy.primary_category == primary_category
             )
 
             if subcategory:
-                taxonomy_query = taxonomy_query.filter(
+                taxonomy_query = taxonomy_query.where(
                     KeywordTaxonomy.subcategory == subcategory
                 )
 
             if specific_term:
-                taxonomy_query = taxonomy_query.filter(
+                taxonomy_query = taxonomy_query.where(
                     KeywordTaxonomy.term == specific_term
                 )
 
-            # Use EXISTS for better performance
-            taxonomy_ids = taxonomy_query.subquery()
-            query = query.filter(Document.id.in_(taxonomy_ids))
+            conditions.append(SearchDocument.taxonomy_ids.overlap(
+                func.array(taxonomy_query.scalar_subquery(), type_=ARRAY(Integer))))
 
-        return query
+        return conditions
 
-    def _apply_sorting(self, query, sort_by, sort_direction):
+    def _apply_filters(self, query, **filters):
         """
-        Apply sorting to the query
+        Apply filters to the search query
 
         Args:
-            query: SQLAlchemy query
-            sort_by: Field to sort by
-            sort_direction: Direction to sort (asc/desc)
+            query: Base SQLAlchemy query whose first column is a document ID
+            **filters: Filter parameters
 
         Returns:
-            Sorted SQLAlchemy query
+            SQLAlchemy query of filtered document IDs
         """
-        if sort_by == 'filename':
-            if sort_direction == 'desc':
-                return query.order_by(Document.filename.desc())
-            else:
-                return query.order_by(Document.filename.asc())
-        else:  # Default to upload_date
-            if sort_direction == 'desc':
-                return query.order_by(Document.upload_date.desc())
-            else:
-                return query.order_by(Document.upload_date.asc())
-
-    def _apply_taxonomy_filter(self, query, primary_category=None, subcategory=None, specific_term=None):
-        """Apply taxonomy filter to the search query"""
-        if not primary_category:
+        conditions = self._filter_conditions(**filters)
+        if not conditions:
             return query
 
-        # Use a subquery to get document IDs with taxonomy matches using LLMKeyword
-        taxonomy_query = db.session.query(LLMKeyword.document_id).join(
-            LLMAnalysis, LLMKeyword.llm_analysis_id == LLMAnalysis.id
-        ).join(
-            KeywordTaxonomy, LLMKeyword.taxonomy_id == KeywordTaxonomy.id
-        ).filter(
-            KeywordTaxonomy.primary_category == primary_category
-        )
+        matches = query.order_by(None).subquery('unfiltered')
+        return db.session.query(SearchDocument.document_id).join(
+            matches, list(matches.c)[0] == SearchDocument.document_id
+        ).filter(*conditions)
 
-        if subcategory:
-            taxonomy_query = taxonomy_query.filter(
-                KeywordTaxonomy.subcategory == subcategory
-            )
+    def _sort_columns(self, sort_by, sort_direction, columns=None):
+        """
+        ORDER BY columns for a sort mode, with the document ID as tiebreaker
 
-        if specific_term:
-            taxonomy_query = taxonomy_query.filter(
-                KeywordTaxonomy.term == specific_term
-            )
+        Args:
+            sort_by: Field to sort by
+            sort_direction: Direction to sort (asc/desc)
+            columns: Column collection to sort (default: the documents table)
 
-        # Get document IDs from the subquery
-        taxonomy_ids = taxonomy_query.distinct().subquery()
+        Returns:
+            List of SQLAlchemy order-by expressions
+        """
+        # NULLs sort as PostgreSQL places them by default (last ascending,
+        # first descending), which is the (column, id) index order both ways
+        # and what _keyset_condition assumes
+        columns = Document.__table__.c if columns is None else columns
+        column = columns.filename if sort_by == 'filename' else columns.upload_date
+        if sort_direction == 'desc':
+            return [column.desc().nulls_first(), columns.id.desc()]
+        return [column.asc().nulls_last(), columns.id.asc()]
+
+    def _keyset_condition(self, sort_by, sort_direction, after):
+        """
+        Rows strictly after a cursor in the given sort order
 
-        # Filter the main query with these IDs
-        query = query.filter(Document.id.in_(taxonomy_ids))
+        Args:
+            sort_by: Field to sort by
+            sort_direction: Direction to sort (asc/desc)
+            after: Decoded cursor with the last row's sort value and ID
 
-        return query
+        Returns:
+            SQLAlchemy condition usable as an index range scan on (column, id)
+        """
+        column = Document.filename if sort_by == 'filename' else Document.upload_date
+        after_id = literal(after['id'], type_=Document.id.type)
 
-    def _fetch_documents_with_relationships(self, document_ids):
+        # Rows with a NULL sort value come last ascending and first
+        # descending (see _sort_columns), ordered among themselves by ID
+        if after['value'] is None:
+            if sort_direction == 'desc':
+                return or_(column.isnot(None), and_(column.is_(None), Document.id < after_id))
+            return and_(column.is_(None), Document.id > after_id)
+
+        row_key = tuple_(column, Document.id)
+        cursor_key = tuple_(literal(after['value'], type_=column.type), after_id)
+        if sort_direction == 'desc':
+            return row_key < cursor_key
+        return or_(row_key > cursor_key, column.is_(None))
+
+    def _execute_search_plan(self, match_query=None, ordered_ids=None, sort_by=None,
+                             sort_direction=None, offset=0, limit=None, after=None,
+                             with_total=True):
         """
-        Fetch documents with all necessary relationships for display
+        Fetch one page of search results in a single statement
+
+        The matching IDs stay in the database as a CTE. The page, the total
+        (count(*) OVER ()) and each document's precomputed card come back as
+        flat rows in one round trip; card is NULL for documents without a
+        current snapshot.
 
         Args:
-            document_ids: List of document IDs
+            match_query: Query of matching document IDs, filters applied
+            ordered_ids: Explicit page of IDs in display order (instead of match_query)
+            sort_by: Field to sort by
+            sort_direction: Direction to sort (asc/desc)
+            offset: Rows to skip
+            limit: Page size
+            after: Decoded cursor to resume from instead of offset
+            with_total: Compute count(*) OVER (); skipped for cursor pages so
+                the page can stop at the limit
 
         Returns:
-            List of document objects with relationships
+            Tuple of (rows, total_count); total_count is None for ordered_ids
+            or when the page is past the end of the results
         """
-        documents = Document.query.filter(Document.id.in_(document_ids)).options(
-            joinedload(Document.llm_analysis).joinedload(LLMAnalysis.keywords),
-            joinedload(Document.entity),
-            joinedload(Document.design_elements),
-            joinedload(Document.communication_focus),
-            joinedload(Document.extracted_text)
-        ).all()
-
-        # Convert to a dictionary keyed by ID for correct ordering
-        id_to_doc = {doc.id: doc for doc in documents}
+        page_columns = [Document.id, Document.filename,
+                        Document.upload_date, Document.status]
+
+        if match_query is not None:
+            matches = match_query.order_by(None).distinct().subquery('matches')
+            sort_columns = self._sort_columns(sort_by, sort_direction)
+            total = func.count().over() if with_total else null()
+            page = db.session.query(
+                *page_columns,
+                total.label('total_count')
+            ).join(
+                matches, list(matches.c)[0] == Document.id
+            )
+            page = page.order_by(*sort_columns)
+            if after is not None:
+                page = page.filter(self._keyset_condition(
+                    sort_by, sort_direction, after))
+            else:
+                page = page.offset(offset)
+            page = page.limit(limit).cte('page')
+            page_order = self._sort_columns(sort_by, sort_direction, page.c)
+        else:
+            if not ordered_ids:
+                return [], None
+            position = case(
+                {doc_id: index for index, doc_id in enumerate(ordered_ids)},
+                value=Document.id
+            )
+            page = db.session.query(
+                *page_columns,
+                null().label('total_count'),
+                position.label('position')
+            ).filter(Document.id.in_(ordered_ids)).cte('page')
+            page_order = [page.c.position]
+
+        statement = select(
+            page.c.id, page.c.filename, page.c.upload_date, page.c.status,
+            page.c.total_count, DocumentCard.card
+        ).select_from(page).outerjoin(
+            DocumentCard, and_(
+                DocumentCard.document_id == page.c.id,
+                DocumentCard.version == DOCUMENT_CARD_SETTINGS['VERSION']
+            )
+        ).order_by(*page_order)
 
-        # Return documents in the same order as document_ids
-        return [id_to_doc[doc_id] for doc_id in document_ids if doc_id in id_to_doc]
+        with stage('page_fetch'):
+            rows = db.session.execute(statement).all()
+        total_count = rows[0].total_count if rows else None
+        return rows, total_count
 
-    def _format_documents_for_display(self, documents, all_keywords):
+    def _format_search_rows(self, rows):
         """
-        Format documents for display with all necessary data
+        Format flat search plan rows for display
+
+        Each result is the document's card plus its ID, filename, upload
+        date, status and preview. Cards missing from document_cards are
+        built and stored on the way.
         """
+        missing_cards = [row.id for row in rows if row.card is None]
+        built_cards = {}
+        if missing_cards:
+            with stage('card_build'):
+                built_cards = document_cards.ensure(missing_cards)
+
+        with stage('preview_lookup'):
+            previews = self._cached_previews([row.filename for row in rows])
+
         formatted_docs = []
-        for doc in documents:
+        for row in rows:
             try:
-                # Get preview if possible
-                preview = None
-                try:
-                    preview = self.preview_service.get_preview(doc.filename)
-                except Exception as e:
-                    self.logger.error(
-                        f"Preview generation failed for {doc.filename}: {str(e)}")
-
-                # Format document data
-                document_data = {
-                    'id': doc.id,
-                    'filename': doc.filename,
-                    'upload_date': doc.upload_date.strftime('%Y-%m-%d %H:%M:%S'),
-                    'status': doc.status,
+                # Fall back to the preview service for previews not cached yet
+                preview = previews.get(row.filename)
+                if preview is None:
+                    try:
+                        with stage('preview_lookup'):
+                            preview = self.preview_service.get_preview(row.filename)
+                    except Exception as e:
+                        self.logger.error(
+                            f"Preview generation failed for {row.filename}: {str(e)}")
+
+                card = row.card if row.card is not None else built_cards.get(row.id, {})
+                formatted_docs.append({
+                    'id': row.id,
+                    'filename': row.filename,
+                    'upload_date': row.upload_date.strftime('%Y-%m-%d %H:%M:%S') if row.upload_date else '',
+                    'status': row.status,
                     'preview': preview,
-
-                    # LLM Analysis data
-                    'summary': doc.llm_analysis.summary_description if hasattr(doc, 'llm_analysis') and doc.llm_analysis else '',
-                    'document_type': doc.llm_analysis.campaign_type if hasattr(doc, 'llm_analysis') and doc.llm_analysis else '',
-                    'election_year': doc.llm_analysis.election_year if hasattr(doc, 'llm_analysis') and doc.llm_analysis else '',
-                    'document_tone': doc.llm_analysis.document_tone if hasattr(doc, 'llm_analysis') and doc.llm_analysis else '',
-
-                    # Entity data
-                    'client': doc.entity.client_name if hasattr(doc, 'entity') and doc.entity else '',
-                    'opponent': doc.entity.opponent_name if hasattr(doc, 'entity') and doc.entity else '',
-
-                    # Design elements
-                    'location': doc.design_elements.geographic_location if hasattr(doc, 'design_elements') and doc.design_elements else '',
-                    'target_audience': doc.design_elements.target_audience if hasattr(doc, 'design_elements') and doc.design_elements else '',
-
-                    # Communication focus
-                    'primary_issue': doc.communication_focus.primary_issue if hasattr(doc, 'communication_focus') and doc.communication_focus else '',
-
-                    # Extract text
-                    'main_message': doc.extracted_text.main_message if hasattr(doc, 'extracted_text') and doc.extracted_text else '',
-
-                    # Hierarchical keywords - format LLMKeywords
-                    'hierarchical_keywords': [
-                        {
-                            'term': kw.keyword,
-                            'primary_category': kw.category,
-                            'subcategory': '',  # LLMKeyword doesn't have subcategory
-                            'relevance_score': kw.relevance_score / 100 if kw.relevance_score else 0
-                        } for kw in (doc.llm_analysis.keywords if hasattr(doc, 'llm_analysis') and doc.llm_analysis and hasattr(doc.llm_analysis, 'keywords') else [])
-                    ]
-                }
-
-                # Log the hierarchical keywords for debugging
-                self.logger.debug(
-                    f"Document {doc.id} hierarchical keywords: {document_data['hierarchical_keywords']}")
-
-                formatted_docs.append(document_data)
+                    **card
+                })
             except Exception as e:
                 self.logger.error(
-                    f"Error formatting document {doc.id}: {str(e)}")
+                    f"Error formatting document {row.id}: {str(e)}")
                 # Skip documents that can't be formatted
                 continue
 
         return formatted_docs
 
-    # Also update the get_document_hierarchical_keywords_bulk method to ensure it uses the new manager
-    def get_document_hierarchical_keywords_bulk(self, document_ids: List[int]) -> Dict[int, List[Dict]]:
+    def _cached_previews(self, filenames):
         """
-        Efficiently get hierarchical keywords for multiple documents at once
+        Cached previews for a page of files, in one cache round trip
 
         Args:
-            document_ids: List of document IDs
+            filenames: List of filenames
 
         Returns:
-            Dictionary mapping document IDs to their keywords
+            Dictionary mapping filename to preview, for the cached ones
         """
+        if not filenames:
+            return {}
         try:
-            # Use the DocumentKeywordManager for consistent keyword retrieval
-            from src.catalog.services.keyword_manager import DocumentKeywordManager
-            return DocumentKeywordManager.get_bulk_document_keywords(document_ids)
+            values = cache.get_many(*[preview_cache_key(filename) for filename in filenames])
         except Exception as e:
-            self.logger.error(
-                f"Error getting hierarchical keywords: {str(e)}")
-            return {doc_id: [] for doc_id in document_ids}
+            self.logger.error(f"Error reading cached previews: {str(e)}")
+            return {}
+        return {
+            filename: value for filename, value in zip(filenames, values)
+            if value is not None
+        }
 
     def _queue_missing_previews(self, filenames):
         """
@@ -848,11 +1253,10 @@ class SearchService:
             filenames: List of filenames to check
         """
         try:
-            missing_previews = []
-            for filename in filenames:
-                cache_key = f"preview:{filename}"
-                if not cache.get(cache_key):
-                    missing_previews.append(filename)
+            with stage('preview_lookup'):
+                cached = self._cached_previews(filenames)
+            missing_previews = [
+                filename for filename in filenames if not cached.get(filename)]
 
             if missing_previews:
                 try:
@@ -865,6 +1269,47 @@ class SearchService:
         except Exception as e:
             self.logger.error(f"Error checking for missing previews: {str(e)}")
 
+    def _count_matches(self, match_query, fingerprint):
+        """
+        Exact number of matches, cached separately from the pages
+
+        Args:
+            match_query: Query of matching document IDs, filters applied
+            fingerprint: search_fingerprint identifying the query
+
+        Returns:
+            Total count
+        """
+        cache_key = make_cache_key(SEARCH_NAMESPACE, 'total', fingerprint)
+        total_count = cache.get(cache_key)
+        if total_count is None:
+            with stage('count'):
+                total_count = match_query.order_by(None).distinct().count()
+            cache.set(cache_key, total_count,
+                      timeout=CACHE_TIMEOUTS['DOCUMENT_COUNT'])
+        return total_count
+
+    def _create_cursor_pagination_info(self, per_page, total_count, cursor, next_cursor):
+        """
+        Create pagination information dictionary for keyset pagination
+
+        Args:
+            per_page: Items per page
+            total_count: Total item count, or None when not requested
+            cursor: Cursor the page was requested with
+            next_cursor: Cursor for the following page, or None on the last page
+
+        Returns:
+            Dictionary with pagination information
+        """
+        return {
+            'per_page': per_page,
+            'total': total_count,
+            'cursor': cursor or None,
+            'next_cursor': next_cursor,
+            'has_next': next_cursor is not None
+        }
+
     def _create_pagination_info(self, page, per_page, total_count):
         """
         Create pagination information dictionary
@@ -896,6 +1341,9 @@ class SearchService:
         """
         Get taxonomy term suggestions for autocomplete
 
+        Matches at the start of a term rank first, then matches at a word
+        start, then anywhere; ties go to the terms tagged on more documents.
+
         Args:
             query: Search query string
 
@@ -906,32 +1354,16 @@ class SearchService:
             if not query or len(query) < 2:
                 return []
 
-            # Search for matching taxonomy terms
-            terms = KeywordTaxonomy.query.filter(
-                KeywordTaxonomy.term.ilike(f'%{query}%')
-            ).limit(10).all()
-
-            # Search for matching synonyms
-            synonym_matches = db.session.query(
-                KeywordTaxonomy
-            ).join(
-                KeywordSynonym, KeywordTaxonomy.id == KeywordSynonym.taxonomy_id
-            ).filter(
-                KeywordSynonym.synonym.ilike(f'%{query}%')
-            ).limit(10).all()
-
-            # Combine and deduplicate
-            unique_terms = {term.id: term for term in terms + synonym_matches}
-
-            # Format for autocomplete
+            # Terms whose name or synonym contains the query, from the in-memory index
             suggestions = []
-            for term in unique_terms.values():
+            for term in taxonomy_index.suggest(query):
                 suggestions.append({
-                    'id': term.id,
-                    'value': term.term,
-                    'label': f"{term.term} ({term.primary_category}: {term.subcategory})",
-                    'category': term.primary_category,
-                    'subcategory': term.subcategory
+                    'id': term['id'],
+                    'value': term['term'],
+                    'label': f"{term['term']} ({term['primary_category']}: {term['subcategory']})",
+                    'category': term['primary_category'],
+                    'subcategory': term['subcategory'],
+                    'document_count': term['document_count']
                 })
 
             return suggestions
@@ -950,50 +1382,15 @@ class SearchService:
             List of related term dictionaries
         """
         try:
-            term = KeywordTaxonomy.query.get_or_404(term_id)
-
-            # Get all related terms (parent, children, siblings)
-            related_terms = []
-
-            # Add parent if exists
-            if term.parent_id:
-                parent = KeywordTaxonomy.query.get(term.parent_id)
-                if parent:
-                    related_terms.append(parent)
-
-            # Add siblings (other terms with same parent)
-            if term.parent_id:
-                siblings = KeywordTaxonomy.query.filter(
-                    KeywordTaxonomy.parent_id == term.parent_id,
-                    KeywordTaxonomy.id != term.id
-                ).all()
-                related_terms.extend(siblings)
-
-            # Add children
-            children = KeywordTaxonomy.query.filter(
-                KeywordTaxonomy.parent_id == term.id
-            ).all()
-            related_terms.extend(children)
-
-            # Format for response
-            result = [self._format_taxonomy_term(t) for t in related_terms]
-            return result
+            # Parent, siblings and children from the in-memory index
+            related_terms = taxonomy_index.related(term_id)
+            if related_terms is None:
+                abort(404)
+            return related_terms
         except Exception as e:
             self.logger.error(f"Error getting related terms: {str(e)}")
             raise
 
-    def _format_taxonomy_term(self, term):
-        """Format a taxonomy term for API response"""
-        return {
-            'id': term.id,
-            'term': term.term,
-            'primary_category': term.primary_category,
-            'subcategory': term.subcategory,
-            'specific_term': term.specific_term,
-            'parent_id': term.parent_id,
-            'synonyms': [s.synonym for s in term.synonyms] if term.synonyms else []
-        }
-
     def record_search_feedback(self, data):
         """
         Record search feedback from users
@@ -1025,7 +1422,7 @@ class SearchService:
                 }
 
             # Get document to verify it exists
-            document = Document.query.get(data['document_id'])
+            document = get_document(data['document_id'], 'status_only')
             if not document:
                 logger.warning(f"Document not found: {data['document_id']}")
                 return {
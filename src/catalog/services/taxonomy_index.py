@@ -0,0 +1,329 @@
+# src/catalog/services/taxonomy_index.py
+"""
+In-process index of the keyword taxonomy.
+
+Terms and synonyms are loaded once per worker into trigram postings for
+substring lookups, together with the subcategory, parent and child adjacency
+used by query expansion and each term's document frequency. Query expansion
+and autocomplete read the index without touching the database; a one-row
+version counter, bumped by triggers on every taxonomy write, reloads it when
+the taxonomy tables change, and document frequencies are re-read on their
+own, shorter interval.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import text
+
+from src.catalog import db
+from src.catalog.constants import TAXONOMY_INDEX_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+GRAM_SIZE = 3
+
+
+def _grams(value: str) -> Set[str]:
+    return {value[i:i + GRAM_SIZE] for i in range(len(value) - GRAM_SIZE + 1)}
+
+
+def _position_rank(lowered: str, needle: str, index: int) -> int:
+    """0 for a prefix match, 1 at the start of a later word, 2 inside a word"""
+    if index == 0:
+        return 0
+    # Later word starts: the first occurrence may be mid-word and a later one not
+    while index > 0:
+        if not lowered[index - 1].isalnum():
+            return 1
+        index = lowered.find(needle, index + 1)
+    return 2
+
+
+class _Snapshot:
+    """Immutable view of the taxonomy; replaced wholesale on reload"""
+
+    def __init__(self, term_rows, synonym_rows, frequencies=None):
+        self.terms: Dict[int, dict] = {}
+        # Documents tagged with each term; replaced on frequency refresh
+        self.frequencies: Dict[int, int] = frequencies or {}
+        self.synonyms: Dict[int, List[str]] = defaultdict(list)
+        self.by_subcategory: Dict[tuple, List[int]] = defaultdict(list)
+        self.children: Dict[int, List[int]] = defaultdict(list)
+
+        # Every searchable string as (lowercased text, term id, is synonym)
+        self.strings: List[tuple] = []
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+
+        for row in term_rows:
+            term = dict(row._mapping)
+            self.terms[term['id']] = term
+            if term['subcategory']:
+                self.by_subcategory[(term['primary_category'], term['subcategory'])].append(term['id'])
+            if term['parent_id']:
+                self.children[term['parent_id']].append(term['id'])
+            self._add_string(term['term'], term['id'], False)
+
+        for taxonomy_id, synonym in synonym_rows:
+            if taxonomy_id not in self.terms:
+                continue
+            self.synonyms[taxonomy_id].append(synonym)
+            self._add_string(synonym, taxonomy_id, True)
+
+    def _add_string(self, value, term_id, is_synonym):
+        if not value:
+            return
+        position = len(self.strings)
+        lowered = value.lower()
+        self.strings.append((lowered, term_id, is_synonym))
+        for gram in _grams(lowered):
+            self.postings[gram].add(position)
+
+    def match(self, query: str) -> List[int]:
+        """
+        IDs of terms whose name or a synonym contains query
+
+        Ranked by match position (start of the string, start of a later
+        word, anywhere else), then term names before synonyms, then by
+        document frequency.
+        """
+        needle = query.lower()
+        if len(needle) < GRAM_SIZE:
+            positions = range(len(self.strings))
+        else:
+            lists = sorted((self.postings.get(g, ()) for g in _grams(needle)), key=len)
+            positions = set(lists[0]).intersection(*lists[1:]) if lists[0] else ()
+
+        best = {}
+        for position in positions:
+            lowered, term_id, is_synonym = self.strings[position]
+            index = lowered.find(needle)
+            if index < 0:
+                continue
+            rank = (_position_rank(lowered, needle, index), is_synonym)
+            if term_id not in best or rank < best[term_id]:
+                best[term_id] = rank
+
+        frequencies = self.frequencies
+        return sorted(best, key=lambda term_id: (
+            best[term_id], -frequencies.get(term_id, 0),
+            self.terms[term_id]['term'].lower(), term_id))
+
+
+class TaxonomyIndex:
+    """Versioned, per-process taxonomy lookup structure"""
+
+    _TERMS_SQL = text("""
+        SELECT id, term, primary_category, subcategory, specific_term, parent_id
+        FROM keyword_taxonomy
+    """)
+    _SYNONYMS_SQL = text("""
+        SELECT taxonomy_id, synonym FROM keyword_synonyms ORDER BY id
+    """)
+    # Bumped at commit by triggers on keyword_taxonomy and keyword_synonyms
+    # (add_taxonomy_version), so checking never scans either table
+    _VERSION_SQL = text("""
+        SELECT version FROM taxonomy_version WHERE id = 1
+    """)
+    # Documents per term, from the materialized term-level facet counts
+    # (kept current from llm_keywords by FacetService)
+    _FREQUENCY_SQL = text("""
+        SELECT kt.id, fc.document_count
+        FROM keyword_taxonomy kt
+        JOIN taxonomy_facet_counts fc
+          ON fc.level = 'term'
+         AND fc.primary_category = kt.primary_category
+         AND fc.subcategory = COALESCE(kt.subcategory, '')
+         AND fc.term = kt.term
+    """)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self.version = None
+        self.generation = 0  # incremented on every reload
+        self._last_check = 0.0
+        self._last_load = 0.0
+        self._last_frequency_refresh = 0.0
+
+    @property
+    def loaded(self):
+        return self._snapshot is not None
+
+    def _current_version(self):
+        return tuple(db.session.execute(self._VERSION_SQL).one())
+
+    def _frequencies(self) -> Dict[int, int]:
+        return {term_id: count for term_id, count in db.session.execute(self._FREQUENCY_SQL)}
+
+    def load(self):
+        """Read the whole taxonomy and swap in a fresh snapshot"""
+        with self._lock:
+            try:
+                started = time.time()
+                version = self._current_version()
+                snapshot = _Snapshot(
+                    db.session.execute(self._TERMS_SQL).all(),
+                    db.session.execute(self._SYNONYMS_SQL).all(),
+                    self._frequencies())
+
+                self._snapshot = snapshot
+                self.version = version
+                self.generation += 1
+                self._last_check = self._last_load = self._last_frequency_refresh = time.time()
+                logger.info(
+                    f"Loaded taxonomy index with {len(snapshot.terms)} terms and "
+                    f"{len(snapshot.strings) - len(snapshot.terms)} synonyms "
+                    f"in {time.time() - started:.3f}s")
+            except Exception as e:
+                logger.error(f"Failed to load taxonomy index: {str(e)}")
+                db.session.rollback()
+                self._last_check = time.time()
+
+    def refresh_frequencies(self):
+        """Re-read document frequencies without rebuilding the snapshot"""
+        with self._lock:
+            self._last_frequency_refresh = time.time()
+            try:
+                # Swapped in whole, so readers see the old or the new counts
+                self._snapshot.frequencies = self._frequencies()
+            except Exception as e:
+                logger.error(f"Failed to refresh taxonomy frequencies: {str(e)}")
+                db.session.rollback()
+
+    def ensure_fresh(self):
+        """Load on first use, then reload when the taxonomy version changes"""
+        if self._lock.locked():
+            # Another thread is reloading; keep serving the current snapshot
+            return
+
+        now = time.time()
+        if self._snapshot is None:
+            # First use, or retry a failed load once the check interval passes
+            if now - self._last_check > TAXONOMY_INDEX_SETTINGS['VERSION_CHECK_INTERVAL']:
+                self.load()
+        elif now - self._last_load > TAXONOMY_INDEX_SETTINGS['FULL_RELOAD_INTERVAL']:
+            self.load()
+        elif now - self._last_check > TAXONOMY_INDEX_SETTINGS['VERSION_CHECK_INTERVAL']:
+            self._last_check = now
+            try:
+                if self._current_version() != self.version:
+                    self.load()
+            except Exception as e:
+                logger.error(f"Failed to check taxonomy version: {str(e)}")
+                db.session.rollback()
+        elif now - self._last_frequency_refresh > TAXONOMY_INDEX_SETTINGS['FREQUENCY_REFRESH_INTERVAL']:
+            self.refresh_frequencies()
+
+    def invalidate(self):
+        """Force a version check on next use, after writing taxonomy terms"""
+        self._last_check = 0.0
+
+    def _ready_snapshot(self) -> Optional[_Snapshot]:
+        self.ensure_fresh()
+        return self._snapshot
+
+    def expand(self, query: str) -> Set[str]:
+        """
+        Terms related to a query
+
+        Args:
+            query: Search text
+
+        Returns:
+            Lowercased names and synonyms of every matching term, plus the
+            other terms in the same subcategory
+        """
+        snapshot = self._ready_snapshot()
+        expanded = set()
+        if snapshot is None:
+            return expanded
+
+        for term_id in snapshot.match(query):
+            term = snapshot.terms[term_id]
+            expanded.add(term['term'].lower())
+            expanded.update(s.lower() for s in snapshot.synonyms.get(term_id, ()))
+
+            if term['subcategory']:
+                for related_id in snapshot.by_subcategory[(term['primary_category'], term['subcategory'])]:
+                    expanded.add(snapshot.terms[related_id]['term'].lower())
+        return expanded
+
+    def suggest(self, query: str, limit: Optional[int] = None) -> List[dict]:
+        """
+        Terms whose name or synonym contains query, best match first
+
+        Returns:
+            Term dictionaries with synonyms and 'document_count'
+        """
+        snapshot = self._ready_snapshot()
+        if snapshot is None:
+            return []
+        limit = limit or TAXONOMY_INDEX_SETTINGS['SUGGESTION_LIMIT']
+        suggestions = []
+        for term_id in snapshot.match(query)[:limit]:
+            term = self._term_dict(snapshot, term_id)
+            term['document_count'] = snapshot.frequencies.get(term_id, 0)
+            suggestions.append(term)
+        return suggestions
+
+    def related(self, term_id: int) -> Optional[List[dict]]:
+        """
+        Parent, siblings and children of a term
+
+        Returns:
+            List of term dictionaries, or None if the term does not exist
+        """
+        snapshot = self._ready_snapshot()
+        if snapshot is None or term_id not in snapshot.terms:
+            return None
+
+        related_ids = []
+        parent_id = snapshot.terms[term_id]['parent_id']
+        if parent_id:
+            if parent_id in snapshot.terms:
+                related_ids.append(parent_id)
+            related_ids.extend(
+                sibling for sibling in snapshot.children.get(parent_id, ()) if sibling != term_id)
+        related_ids.extend(snapshot.children.get(term_id, ()))
+
+        return [self._term_dict(snapshot, related_id) for related_id in related_ids]
+
+    def term_ids(self, primary_category: str, subcategory: Optional[str] = None,
+                 term: Optional[str] = None) -> Optional[Set[int]]:
+        """
+        IDs of the terms under a facet selection
+
+        Returns:
+            Set of term IDs, or None if the index isn't loaded
+        """
+        snapshot = self._ready_snapshot()
+        if snapshot is None:
+            return None
+        return {
+            term_id for term_id, row in snapshot.terms.items()
+            if row['primary_category'] == primary_category
+            and (not subcategory or row['subcategory'] == subcategory)
+            and (not term or row['term'] == term)
+        }
+
+    def vocabulary(self) -> List[tuple]:
+        """(term, synonyms) for every taxonomy term, for query enrichment"""
+        snapshot = self._ready_snapshot()
+        if snapshot is None:
+            return []
+        return [(term['term'], list(snapshot.synonyms.get(term_id, ())))
+                for term_id, term in snapshot.terms.items() if term['term']]
+
+    @staticmethod
+    def _term_dict(snapshot, term_id):
+        term = dict(snapshot.terms[term_id])
+        term['synonyms'] = list(snapshot.synonyms.get(term_id, ()))
+        return term
+
+
+# Shared per-process index
+taxonomy_index = TaxonomyIndex()
@@ -7,6 +7,7 @@ import os
 from io import StringIO
 from catalog.models import KeywordTaxonomy, KeywordSynonym
 from src.catalog import db
+from src.catalog.services.taxonomy_index import taxonomy_index
 from sqlalchemy.exc import SQLAlchemyError
 from flask import current_app
 
@@ -86,6 +87,7 @@ class TaxonomyService:
 
             # Commit all changes
             db.session.commit()
+            taxonomy_index.invalidate()
             logger.info(
                 f"Taxonomy initialization complete: {counter['created']} terms created, {counter['errors']} errors")
             return True, f"Successfully created {counter['created']} taxonomy terms"
@@ -206,6 +208,7 @@ class TaxonomyService:
                             db.session.add(synonym)
 
                     db.session.commit()
+                    taxonomy_index.invalidate()
 
                 return existing_term
 
@@ -230,6 +233,7 @@ class TaxonomyService:
                         db.session.add(synonym)
 
             db.session.commit()
+            taxonomy_index.invalidate()
             logger.info(
                 f"Created new taxonomy term: {term} ({primary_category})")
             return new_term
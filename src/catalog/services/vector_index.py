@@ -0,0 +1,484 @@
+# src/catalog/services/vector_index.py
+"""
+In-process approximate nearest-neighbour index over document embeddings.
+
+Postgres cannot use the ivfflat index for a `1 - (embeddings <=> q) > threshold`
+filter, so every semantic query used to scan both embedding columns. This
+module keeps the vectors in a NumPy float32 matrix per worker and answers
+top-k queries with an inverted-file (IVF) index instead.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+
+from src.catalog import db
+from src.catalog.constants import DEFAULTS, MODEL_SETTINGS, VECTOR_INDEX_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+
+def to_vector(value, dimensions: int) -> Optional[np.ndarray]:
+    """Convert a stored embedding (pgvector text, JSON list or array) to float32"""
+    if value is None:
+        return None
+
+    try:
+        if isinstance(value, str):
+            vector = np.fromstring(value.strip().strip('[]'), sep=',', dtype=np.float32)
+        else:
+            vector = np.asarray(value, dtype=np.float32)
+    except (TypeError, ValueError):
+        return None
+
+    if vector.shape != (dimensions,):
+        return None
+    return vector
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalise rows so that a dot product equals cosine similarity"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32, copy=False)
+
+
+class VectorIndex:
+    """IVF index over L2-normalised float32 vectors keyed by document id"""
+
+    def __init__(self, name: str, dimensions: int, nprobe: int, brute_force_threshold: int):
+        self.name = name
+        self.dimensions = dimensions
+        self.nprobe = nprobe
+        self.brute_force_threshold = brute_force_threshold
+
+        self._lock = threading.RLock()
+        self._vectors = np.zeros((0, dimensions), dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._size = 0
+        self._rows: Dict[int, int] = {}
+
+        # IVF state: centroids, one row list per centroid and each row's list
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._trained_size = 0
+
+        # Retraining runs outside the lock; rows written meanwhile are
+        # collected here and placed once the new quantizer is swapped in.
+        # build() bumps the generation so a stale retrain is discarded.
+        self._pending_rows: Optional[set] = None
+        self._generation = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def build(self, items: Iterable[Tuple[int, np.ndarray]]):
+        """Replace the index contents and retrain the coarse quantizer"""
+        ids = []
+        vectors = []
+        for document_id, vector in items:
+            ids.append(document_id)
+            vectors.append(vector)
+
+        matrix = _normalize(np.vstack(vectors)) if vectors else np.zeros(
+            (0, self.dimensions), dtype=np.float32)
+        trained = self._fit(matrix, np.arange(len(ids)))
+
+        with self._lock:
+            self._vectors = matrix
+            self._ids = np.asarray(ids, dtype=np.int64)
+            self._size = len(ids)
+            self._rows = {document_id: row for row, document_id in enumerate(ids)}
+            self._assignments = np.zeros(len(ids), dtype=np.int32)
+            self._trained_size = len(ids)
+            self._generation += 1
+            self._install(trained, len(ids))
+
+    def upsert(self, document_id: int, vector: np.ndarray):
+        """Insert or replace a single vector without rebuilding the index"""
+        vector = _normalize(vector.reshape(1, -1))[0]
+
+        with self._lock:
+            row = self._rows.get(document_id)
+            if row is None:
+                if self._size == len(self._vectors):
+                    self._grow()
+                row = self._size
+                self._size += 1
+                self._rows[document_id] = row
+                self._ids[row] = document_id
+            elif self._centroids is not None:
+                self._lists[self._assignments[row]].remove(row)
+
+            self._vectors[row] = vector
+            if self._centroids is not None:
+                cluster = int(np.argmax(self._centroids @ vector))
+                self._assignments[row] = cluster
+                self._lists[cluster].append(row)
+
+            if self._pending_rows is not None:
+                self._pending_rows.add(row)
+                return
+
+            # Retrain once the index has doubled since the last training run
+            if len(self._rows) < max(2 * self._trained_size, self.brute_force_threshold):
+                return
+            snapshot = self._vectors[:self._size].copy()
+            live_rows = np.flatnonzero(self._ids[:self._size] >= 0)
+            generation = self._generation
+            self._trained_size = len(live_rows)
+            self._pending_rows = set()
+
+        self._retrain(snapshot, live_rows, generation)
+
+    def remove(self, document_id: int):
+        """Drop a vector; its row is left as a tombstone until the next build"""
+        with self._lock:
+            row = self._rows.pop(document_id, None)
+            if row is None:
+                return
+            self._ids[row] = -1
+            if self._centroids is not None:
+                self._lists[self._assignments[row]].remove(row)
+            if self._pending_rows is not None:
+                self._pending_rows.add(row)
+
+    def search(self, query: np.ndarray, top_k: int, threshold: Optional[float] = None) -> List[Tuple[int, float]]:
+        """
+        Find the most similar vectors to the query
+
+        Args:
+            query: Query embedding
+            top_k: Maximum number of results
+            threshold: Minimum cosine similarity (optional)
+
+        Returns:
+            List of (document_id, similarity) tuples, best match first
+        """
+        query = _normalize(np.asarray(query, dtype=np.float32).reshape(1, -1))[0]
+
+        with self._lock:
+            if not self._rows:
+                return []
+
+            if self._centroids is None:
+                candidates = np.arange(self._size)
+            else:
+                centroid_scores = self._centroids @ query
+                nprobe = min(self.nprobe, len(centroid_scores))
+                probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+                candidates = np.fromiter(
+                    (row for cluster in probe for row in self._lists[cluster]),
+                    dtype=np.int64)
+
+            if not len(candidates):
+                return []
+
+            scores = self._vectors[candidates] @ query
+            keep = self._ids[candidates] >= 0
+            if threshold is not None:
+                keep &= scores > threshold
+            candidates = candidates[keep]
+            scores = scores[keep]
+
+            if len(scores) > top_k:
+                best = np.argpartition(-scores, top_k - 1)[:top_k]
+                candidates = candidates[best]
+                scores = scores[best]
+
+            order = np.argsort(-scores)
+            return [(int(self._ids[candidates[i]]), float(scores[i])) for i in order]
+
+    def _grow(self):
+        """Double the capacity of the backing arrays"""
+        capacity = max(1024, 2 * len(self._vectors))
+        vectors = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        vectors[:self._size] = self._vectors[:self._size]
+        ids = np.full(capacity, -1, dtype=np.int64)
+        ids[:self._size] = self._ids[:self._size]
+        assignments = np.zeros(capacity, dtype=np.int32)
+        assignments[:self._size] = self._assignments[:self._size]
+        self._vectors, self._ids, self._assignments = vectors, ids, assignments
+
+    def _retrain(self, snapshot: np.ndarray, live_rows: np.ndarray, generation: int):
+        """
+        Train on a snapshot without holding the lock, then swap the result in
+
+        Searches keep using the current quantizer while k-means runs.
+        """
+        try:
+            trained = self._fit(snapshot, live_rows)
+        except Exception as e:
+            logger.error(f"Failed to retrain {self.name} vector index: {str(e)}")
+            with self._lock:
+                self._pending_rows = None
+            return
+
+        with self._lock:
+            pending, self._pending_rows = self._pending_rows, None
+            if generation != self._generation:
+                # Rebuilt while training; this quantizer describes old rows
+                return
+            self._install(trained, len(snapshot), pending)
+
+    def _install(self, trained, trained_rows: int, pending: Iterable[int] = ()):
+        """
+        Swap in a trained quantizer; called with the lock held
+
+        Args:
+            trained: Result of _fit(), or None to answer queries exactly
+            trained_rows: Number of rows in the snapshot that was trained on
+            pending: Rows written or removed since the snapshot was taken
+        """
+        if trained is None:
+            self._centroids = None
+            self._lists = []
+            return
+
+        centroids, fitted, lists = trained
+        assignments = np.zeros(len(self._vectors), dtype=np.int32)
+        assignments[:trained_rows] = fitted
+
+        # Re-place rows that changed during training; fitted is -1 for rows
+        # that were not live in the snapshot
+        for row in pending:
+            if row < trained_rows and fitted[row] >= 0:
+                lists[fitted[row]].remove(row)
+            if self._ids[row] >= 0:
+                cluster = int(np.argmax(centroids @ self._vectors[row]))
+                assignments[row] = cluster
+                lists[cluster].append(row)
+
+        self._centroids = centroids
+        self._assignments = assignments
+        self._lists = lists
+
+    def _fit(self, vectors: np.ndarray, live_rows: np.ndarray, iterations: int = 10):
+        """
+        Train a coarse quantizer with spherical k-means
+
+        Reads only its arguments, so it can run without the lock.
+
+        Args:
+            vectors: Normalised vectors, one row per index row
+            live_rows: Rows to cluster (tombstones excluded)
+            iterations: k-means iterations
+
+        Returns:
+            (centroids, assignment per row or -1, row lists per centroid), or
+            None when the index is small enough to answer exactly
+        """
+        # Small indexes are answered exactly; clustering would only cost recall
+        if len(live_rows) < self.brute_force_threshold:
+            return None
+
+        nlist = int(min(4096, max(1, np.sqrt(len(live_rows)))))
+        rng = np.random.default_rng(0)
+        sample = vectors[rng.choice(
+            live_rows, size=min(len(live_rows), nlist * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.bincount(labels, minlength=nlist) == 0
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = _normalize(sums)
+
+        assignments = np.full(len(vectors), -1, dtype=np.int32)
+        for start in range(0, len(live_rows), 65536):
+            chunk = live_rows[start:start + 65536]
+            assignments[chunk] = np.argmax(vectors[chunk] @ centroids.T, axis=1)
+
+        lists = [[] for _ in range(nlist)]
+        for row in live_rows:
+            lists[assignments[row]].append(int(row))
+
+        logger.info(
+            f"Trained {self.name} vector index: {len(live_rows)} vectors in {nlist} lists")
+        return centroids, assignments, lists
+
+
+class DocumentVectorIndex:
+    """
+    Document and analysis embedding indexes for one worker process.
+
+    Loads both embedding columns once, then pulls rows whose embedding_date
+    has moved on a fixed interval so vectors written by Celery workers become
+    searchable without a restart.
+    """
+
+    def __init__(self):
+        self.dimensions = MODEL_SETTINGS['EMBEDDINGS']['DIMENSIONS']
+        self.documents = self._new_index('documents')
+        self.analysis = self._new_index('analysis')
+
+        self._lock = threading.Lock()
+        self.loaded = False
+        self.available = True
+        self._last_refresh = 0.0
+        self._last_full_load = 0.0
+        self._document_watermark = None
+        self._analysis_watermark = None
+
+    def _new_index(self, name):
+        return VectorIndex(
+            name,
+            self.dimensions,
+            nprobe=VECTOR_INDEX_SETTINGS['NPROBE'],
+            brute_force_threshold=VECTOR_INDEX_SETTINGS['BRUTE_FORCE_THRESHOLD']
+        )
+
+    @property
+    def ready(self):
+        """True when the index is loaded and can answer queries"""
+        return self.loaded and self.available
+
+    def load(self):
+        """Load every stored embedding from the database"""
+        with self._lock:
+            try:
+                started = time.time()
+                document_rows = self._fetch_rows(self._DOCUMENT_SQL)
+                analysis_rows = self._fetch_rows(self._ANALYSIS_SQL)
+
+                self.documents.build(self._parse_rows(document_rows))
+                self.analysis.build(self._parse_rows(analysis_rows))
+                self._document_watermark = self._watermark(document_rows, None)
+                self._analysis_watermark = self._watermark(analysis_rows, None)
+
+                self.loaded = True
+                self.available = True
+                self._last_refresh = self._last_full_load = time.time()
+                logger.info(
+                    f"Loaded vector index with {len(self.documents)} document and "
+                    f"{len(self.analysis)} analysis embeddings in {time.time() - started:.2f}s")
+            except Exception as e:
+                # Leave the SQL path in charge if the embedding columns are missing
+                logger.error(f"Failed to load vector index: {str(e)}")
+                db.session.rollback()
+                self.available = False
+
+    def refresh(self):
+        """Apply embeddings written since the last load or refresh"""
+        with self._lock:
+            try:
+                document_rows = self._fetch_rows(
+                    self._DOCUMENT_SQL, self._document_watermark, incremental=True)
+                analysis_rows = self._fetch_rows(
+                    self._ANALYSIS_SQL, self._analysis_watermark, incremental=True)
+
+                for document_id, vector in self._parse_rows(document_rows):
+                    self.documents.upsert(document_id, vector)
+                for document_id, vector in self._parse_rows(analysis_rows):
+                    self.analysis.upsert(document_id, vector)
+
+                self._document_watermark = self._watermark(
+                    document_rows, self._document_watermark)
+                self._analysis_watermark = self._watermark(
+                    analysis_rows, self._analysis_watermark)
+                self._last_refresh = time.time()
+            except Exception as e:
+                logger.error(f"Failed to refresh vector index: {str(e)}")
+                db.session.rollback()
+
+    def ensure_fresh(self):
+        """Load on first use, then refresh on the configured intervals"""
+        if not self.available or self._lock.locked():
+            # Another thread is already loading; callers use the SQL path meanwhile
+            return
+        now = time.time()
+        if not self.loaded or now - self._last_full_load > VECTOR_INDEX_SETTINGS['FULL_RELOAD_INTERVAL']:
+            self.load()
+        elif now - self._last_refresh > VECTOR_INDEX_SETTINGS['REFRESH_INTERVAL']:
+            self.refresh()
+
+    def record(self, document_id: int, document_embedding=None, analysis_embedding=None):
+        """Apply freshly generated embeddings to this process's index"""
+        if not self.loaded:
+            return
+
+        document_vector = to_vector(document_embedding, self.dimensions)
+        if document_vector is not None:
+            self.documents.upsert(document_id, document_vector)
+
+        analysis_vector = to_vector(analysis_embedding, self.dimensions)
+        if analysis_vector is not None:
+            self.analysis.upsert(document_id, analysis_vector)
+
+    def search(self, query_embedding, top_k: Optional[int] = None,
+               threshold: Optional[float] = None) -> List[Tuple[int, float]]:
+        """
+        Find documents whose document or analysis embedding matches the query
+
+        Scores are the sum of both similarities, matching the ordering of the
+        original SQL implementation.
+
+        Args:
+            query_embedding: Query embedding
+            top_k: Maximum number of documents (default from settings)
+            threshold: Minimum similarity for either embedding
+
+        Returns:
+            List of (document_id, score) tuples, best match first
+        """
+        top_k = top_k or VECTOR_INDEX_SETTINGS['TOP_K']
+        if threshold is None:
+            threshold = DEFAULTS['VECTOR_SIMILARITY_THRESHOLD']
+
+        query = to_vector(query_embedding, self.dimensions)
+        if query is None:
+            return []
+
+        scores: Dict[int, float] = {}
+        for index in (self.documents, self.analysis):
+            for document_id, similarity in index.search(query, top_k, threshold):
+                scores[document_id] = scores.get(document_id, 0.0) + similarity
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:top_k]
+
+    _DOCUMENT_SQL = (
+        "SELECT id, embeddings::text, embedding_date FROM documents "
+        "WHERE embeddings IS NOT NULL"
+    )
+    _ANALYSIS_SQL = (
+        "SELECT document_id, embeddings::text, embedding_date FROM llm_analysis "
+        "WHERE embeddings IS NOT NULL AND document_id IS NOT NULL"
+    )
+
+    def _fetch_rows(self, sql, since=None, incremental=False):
+        """Fetch embedding rows, or only those written after `since` when incremental"""
+        if not incremental:
+            return db.session.execute(text(sql)).fetchall()
+        if since is None:
+            # Nothing had been stamped at load time, so stamped rows are all new
+            return db.session.execute(text(
+                sql + " AND embedding_date IS NOT NULL")).fetchall()
+        return db.session.execute(
+            text(sql + " AND embedding_date > :since"), {'since': since}).fetchall()
+
+    @staticmethod
+    def _watermark(rows, current):
+        """Latest embedding_date seen so far"""
+        dates = [row[2] for row in rows if row[2] is not None]
+        if current is not None:
+            dates.append(current)
+        return max(dates) if dates else None
+
+    def _parse_rows(self, rows):
+        """Yield (document_id, vector) pairs, skipping malformed embeddings"""
+        for document_id, value, _ in rows:
+            vector = to_vector(value, self.dimensions)
+            if vector is not None:
+                yield document_id, vector
+
+
+# Shared per-process index used by the search service and embedding writers
+document_vector_index = DocumentVectorIndex()
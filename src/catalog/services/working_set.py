@@ -0,0 +1,224 @@
+# src/catalog/services/working_set.py
+"""
+Per-document working set for a pipeline run.
+
+The original bytes, the rasterized first page and the base64 payload sent to
+Claude are produced once and shared by every stage that needs them: the
+response cache key, each analysis call and the preview. Artifacts live in a
+private scratch directory (tmpfs when there is room) created on first use and
+removed by cleanup(), so concurrent runs never collide on /tmp/{filename}.
+
+    with DocumentWorkingSet(filename) as working_set:
+        llm_service.analyze_document_modular(filename, working_set=working_set)
+        preview_service.generate_from_working_set(working_set)
+"""
+
+import base64
+import hashlib
+import io
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, Optional
+
+from src.catalog.constants import WORKING_SET_SETTINGS
+
+logger = logging.getLogger(__name__)
+
+# Media types of files sent to Claude as they are
+IMAGE_MEDIA_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif'
+}
+
+
+def scratch_root() -> str:
+    """
+    Directory to create working sets in
+
+    DOCUMENT_SCRATCH_DIR wins when set; otherwise the first configured tmpfs
+    root that is writable and has MIN_FREE_BYTES free, then the system temp dir.
+    """
+    override = os.getenv("DOCUMENT_SCRATCH_DIR")
+    if override:
+        return override
+
+    for root in WORKING_SET_SETTINGS['SCRATCH_ROOTS']:
+        try:
+            if (os.path.isdir(root) and os.access(root, os.W_OK) and
+                    shutil.disk_usage(root).free >= WORKING_SET_SETTINGS['MIN_FREE_BYTES']):
+                return root
+        except OSError:
+            continue
+    return tempfile.gettempdir()
+
+
+class DocumentWorkingSet:
+    """One document's file and derived artifacts, computed once per run"""
+
+    def __init__(self, filename: str, source_path: Optional[str] = None, storage=None):
+        """
+        Args:
+            filename: Object name in storage
+            source_path: Local copy to use instead of downloading (not removed on cleanup)
+            storage: Storage service (default MinIOStorage)
+        """
+        self.filename = filename
+        self.ext = os.path.splitext(filename)[1].lower()
+        self._source_path = source_path
+        self._storage = storage
+
+        # Reentrant: loaders ask for the artifacts they build on
+        self._lock = threading.RLock()
+        self._directory: Optional[str] = None
+        self._path: Optional[str] = None
+        self._sha256: Optional[str] = None
+        self._page_image_path: Optional[str] = None
+        self._image_payload: Optional[Dict[str, str]] = None
+        self._loaded = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+        return False
+
+    @property
+    def directory(self) -> str:
+        """Private scratch directory, created on first use"""
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix='document-', dir=scratch_root())
+        return self._directory
+
+    def _once(self, name: str, load):
+        """Run a loader the first time an artifact is asked for"""
+        with self._lock:
+            if name not in self._loaded:
+                self._loaded.add(name)
+                load()
+
+    @property
+    def path(self) -> Optional[str]:
+        """Local path of the original file, fetched from storage once"""
+        self._once('path', self._fetch)
+        return self._path
+
+    def _fetch(self):
+        if self._source_path:
+            if os.path.exists(self._source_path):
+                self._path = self._source_path
+            else:
+                logger.warning(f"Document path does not exist: {self._source_path}")
+            return
+
+        try:
+            if self._storage is None:
+                from src.catalog.services.storage_service import MinIOStorage
+                self._storage = MinIOStorage()
+
+            logger.info(f"Retrieving file from storage: {self.filename}")
+            file_data = self._storage.get_file(self.filename)
+            if not file_data:
+                logger.error(f"No data retrieved for {self.filename}")
+                return
+
+            path = os.path.join(self.directory, 'original' + self.ext)
+            with open(path, 'wb') as f:
+                f.write(file_data)
+            self._path = path
+            logger.info(f"File retrieved into working set: {path}")
+        except Exception as e:
+            logger.error(f"Failed to retrieve {self.filename}: {str(e)}")
+
+    def file_bytes(self) -> Optional[bytes]:
+        """Original file bytes"""
+        path = self.path
+        if not path:
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+
+    @property
+    def sha256(self) -> Optional[str]:
+        """SHA-256 of the original bytes"""
+        self._once('sha256', self._hash)
+        return self._sha256
+
+    def _hash(self):
+        path = self.path
+        if not path:
+            return
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        self._sha256 = digest.hexdigest()
+
+    @property
+    def page_image_path(self) -> Optional[str]:
+        """First page rendered as JPEG (the file itself for images)"""
+        self._once('page_image', self._rasterize)
+        return self._page_image_path
+
+    def _rasterize(self):
+        path = self.path
+        if not path:
+            return
+        if self.ext in IMAGE_MEDIA_TYPES:
+            self._page_image_path = path
+            return
+        if self.ext != '.pdf':
+            return
+
+        try:
+            from pdf2image import convert_from_path
+            logger.info(f"Converting first page of PDF to image: {path}")
+            images = convert_from_path(
+                path, first_page=1, last_page=1, dpi=WORKING_SET_SETTINGS['RASTER_DPI'])
+            if images:
+                page_path = os.path.join(self.directory, 'page1.jpg')
+                images[0].save(page_path, "JPEG")
+                self._page_image_path = page_path
+                logger.info(f"PDF first page converted to: {page_path}")
+        except Exception as e:
+            logger.error(f"Failed to convert PDF to image: {str(e)}")
+
+    def image_payload(self) -> Optional[Dict[str, str]]:
+        """Base64 image and media type for Claude, encoded once"""
+        self._once('image_payload', self._encode)
+        return self._image_payload
+
+    def _encode(self):
+        page_path = self.page_image_path
+        if not page_path:
+            return
+        try:
+            with open(page_path, 'rb') as f:
+                encoded = base64.b64encode(f.read()).decode('utf-8')
+            media_type = IMAGE_MEDIA_TYPES.get(self.ext, 'image/jpeg')
+            self._image_payload = {"base64": encoded, "media_type": media_type}
+        except Exception as e:
+            logger.error(f"Failed to encode image {page_path}: {str(e)}")
+
+    def page_image(self):
+        """First page as a PIL image, or None"""
+        page_path = self.page_image_path
+        if not page_path:
+            return None
+        from PIL import Image
+        with open(page_path, 'rb') as f:
+            image = Image.open(io.BytesIO(f.read()))
+            image.load()
+        return image
+
+    def cleanup(self):
+        """Remove the scratch directory and everything in it"""
+        with self._lock:
+            directory, self._directory = self._directory, None
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
@@ -3,29 +3,28 @@ document.addEventListener('DOMContentLoaded', function() {
     // Only initialize if we're on the search page with results
     if (!document.getElementById('resultsGrid')) return;
     
-    let page = 1;
+    // The server renders the first page and hands us the cursor for the next
+    let nextCursor = document.getElementById('resultsGrid').dataset.nextCursor || '';
     let loading = false;
-    let hasMore = true;
+    let hasMore = nextCursor !== '';
     
-    // Get query parameters from the current URL
+    // Get query parameters from the current URL (query, sort and filters)
     const urlParams = new URLSearchParams(window.location.search);
-    let query = urlParams.get('q') || '';
-    const sort_by = urlParams.get('sort_by') || 'upload_date';
-    const sort_dir = urlParams.get('sort_dir') || 'desc';
+    urlParams.delete('page');
     
     // Function to load more results
     function loadMoreResults() {
       if (loading || !hasMore) return;
       
       loading = true;
-      page++;
+      urlParams.set('cursor', nextCursor);
       
       // Show loading indicator
       const loadingIndicator = document.getElementById('loadingIndicator');
       if (loadingIndicator) loadingIndicator.classList.remove('hidden');
       
       // Fetch more results
-      fetch(`/api/search?q=${encodeURIComponent(query)}&page=${page}&sort_by=${sort_by}&sort_dir=${sort_dir}`, {
+      fetch(`/api/search?${urlParams.toString()}`, {
         headers: {
           'X-Requested-With': 'XMLHttpRequest'
         }
@@ -39,8 +38,9 @@ document.addEventListener('DOMContentLoaded', function() {
           // Append new results to the grid
           appendResults(data.results);
           
-          // Check if there are more pages
-          hasMore = data.pagination.has_next;
+          // Continue from where this page ended
+          nextCursor = data.pagination.next_cursor || '';
+          hasMore = nextCursor !== '';
         } else {
           hasMore = false;
         }
@@ -1,6 +1,7 @@
 # src/catalog/tasks/analysis_utils.py
 import logging
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, load_only
 from flask import current_app
 
 logger = logging.getLogger(__name__)
@@ -19,12 +20,16 @@ def check_minimum_analysis(document_id: int) -> bool:
         db.session.close()
 
         # Explicitly use separate queries with commit between checks
-        llm_analysis = LLMAnalysis.query.filter_by(
-            document_id=document_id).first()
+        # Only the columns logged below; skip the embedding and the text body
+        llm_analysis = LLMAnalysis.query.options(
+            load_only(LLMAnalysis.id, LLMAnalysis.summary_description)
+        ).filter_by(document_id=document_id).first()
         has_llm_analysis = llm_analysis is not None
 
-        extracted_text = ExtractedText.query.filter_by(
-            document_id=document_id).first()
+        extracted_text = db.session.query(
+            ExtractedText.id,
+            func.coalesce(func.length(ExtractedText.text_content), 0).label('text_length')
+        ).filter(ExtractedText.document_id == document_id).first()
         has_extracted_text = extracted_text is not None
 
         logger.info(
@@ -42,7 +47,7 @@ def check_minimum_analysis(document_id: int) -> bool:
         if extracted_text:
             logger.info(f"Found extracted text with ID {extracted_text.id}")
             logger.info(
-                f"Extracted text content length: {len(extracted_text.text_content or '')}")
+                f"Extracted text content length: {extracted_text.text_length}")
         else:
             logger.warning(
                 f"No extracted text found for document ID {document_id}")
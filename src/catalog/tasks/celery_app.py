@@ -2,6 +2,7 @@
 import os
 import logging
 from celery import Celery
+from celery.signals import worker_process_shutdown, worker_shutdown
 
 # Setup basic logging
 logging.basicConfig(level=logging.INFO)
@@ -71,6 +72,17 @@ except Exception as e:
     logger.error(f"Failed to connect to Redis: {str(e)}")
 
 
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def close_http_clients(**kwargs):
+    """Close pooled upstream connections when a worker process exits"""
+    try:
+        from src.catalog.services.http_clients import shutdown_http_clients
+        shutdown_http_clients()
+    except Exception as e:
+        logger.error(f"Error shutting down HTTP clients: {str(e)}")
+
+
 @celery_app.task(name='debug.list_tasks')
 def list_registered_tasks():
     """List all registered tasks"""
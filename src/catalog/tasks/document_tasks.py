@@ -10,10 +10,15 @@ from datetime import datetime, timedelta
 from src.catalog import db, cache
 from src.catalog.services.preview_service import PreviewService
 from src.catalog.services.search_service import SearchService
+from src.catalog.services.card_service import document_cards
+from src.catalog.utils.cache_keys import invalidate_document, preview_cache_key
+from src.catalog.utils.query_builders import build_document_query, get_document
 from src.catalog.services.storage_service import MinIOStorage
+from src.catalog.services.working_set import DocumentWorkingSet
+from src.catalog.services.rate_limiter import RateLimitTimeout
 import logging
 import traceback
-from src.catalog.constants import DOCUMENT_STATUSES
+from src.catalog.constants import DOCUMENT_STATUSES, RATE_LIMITER_SETTINGS
 from src.catalog.tasks.analysis_utils import check_minimum_analysis
 from src.catalog.services.llm_parser import LLMResponseParser
 
@@ -75,7 +80,7 @@ def test_document_processing(self, document_id):
 
         with app.app_context():
             # Update document status
-            doc = Document.query.get(document_id)
+            doc = get_document(document_id, 'status_only')
             if doc:
                 logger.info(f"Found document: {doc.filename}")
                 doc.status = DOCUMENT_STATUSES['COMPLETED']
@@ -95,31 +100,15 @@ preview_service = PreviewService()
 
 def invalidate_document_cache(document_id):
     """Invalidate all cache related to a specific document"""
-    # Import the SearchService here to avoid circular imports
-    from catalog.services.search_service import SearchService
-    search_service = SearchService()
-
     try:
         # Invalidate document preview cache
-        document = Document.query.get(document_id)
+        document = get_document(document_id, 'status_only')
         if document:
-            # Clear preview cache for this document
-            cache_key = f"preview:{document.filename}"
-            cache.delete(cache_key)
-
-        # Clear any memoized cache related to search
-        # Using a broader approach to avoid specific function references
-        if hasattr(cache, 'delete_memoized'):
-            # If a search service exists with these methods, clear them
-            if hasattr(search_service, 'get_document_hierarchical_keywords_bulk'):
-                cache.delete_memoized(
-                    search_service.get_document_hierarchical_keywords_bulk)
-
-            if hasattr(search_service, 'generate_taxonomy_facets'):
-                cache.delete_memoized(search_service.generate_taxonomy_facets)
+            cache.delete(preview_cache_key(document.filename))
 
-        # Finally, clear the entire cache to be safe
-        cache.clear()
+        # Bump only the namespaces a document can affect, leaving other
+        # documents' previews and cached entries in place
+        invalidate_document(document_id)
 
     except Exception as e:
         # Log but don't fail if cache invalidation has issues
@@ -129,15 +118,46 @@ def invalidate_document_cache(document_id):
             f"Error invalidating cache for document {document_id}: {str(e)}")
 
 
-def process_batch1(llm_service, filename, document_id):
-    """Process the first batch of document analysis (metadata and text extraction)"""
+# Result keys produced by the first batch's components; everything else is batch 2
+BATCH1_RESULT_KEYS = {
+    "metadata": "document_analysis",
+    "text": "extracted_text",
+}
+
+
+def analyze_all_components(llm_service, filename, working_set=None):
+    """Run every analysis component in one concurrent pass"""
+    return llm_service.analyze_document_modular(
+        filename, components=[
+            "metadata", "text", "classification", "entities",
+            "design", "keywords", "communication"],
+        working_set=working_set
+    ) or {}
+
+
+def _component_response(analysis, component):
+    """A batch 1 component's part of a combined analysis"""
+    key = BATCH1_RESULT_KEYS[component]
+    return {key: analysis[key]} if key in analysis else {}
+
+
+def process_batch1(llm_service, filename, document_id, analysis=None):
+    """
+    Process the first batch of document analysis (metadata and text extraction)
+
+    When analysis holds the combined results of analyze_all_components,
+    they are stored without calling the API again.
+    """
     logger.info(f"Processing batch 1 for document {document_id}: {filename}")
 
     try:
         # Process metadata component with clear error handling
-        metadata_response = llm_service.analyze_document_modular(
-            filename, components=["metadata"]
-        )
+        if analysis is not None:
+            metadata_response = _component_response(analysis, "metadata")
+        else:
+            metadata_response = llm_service.analyze_document_modular(
+                filename, components=["metadata"]
+            )
 
         if metadata_response and "document_analysis" in metadata_response:
             logger.info(
@@ -152,9 +172,12 @@ def process_batch1(llm_service, filename, document_id):
                 "❌ Metadata component processing failed or returned empty results")
 
         # Process text component with clear error handling
-        text_response = llm_service.analyze_document_modular(
-            filename, components=["text"]
-        )
+        if analysis is not None:
+            text_response = _component_response(analysis, "text")
+        else:
+            text_response = llm_service.analyze_document_modular(
+                filename, components=["text"]
+            )
 
         if text_response and "extracted_text" in text_response:
             logger.info(
@@ -181,16 +204,26 @@ def process_batch1(llm_service, filename, document_id):
         return False
 
 
-def process_batch2(llm_service, filename, document_id):
-    """Process the second batch of document analysis (classification, entities, design, keywords, communication)"""
+def process_batch2(llm_service, filename, document_id, analysis=None):
+    """
+    Process the second batch of document analysis (classification, entities, design, keywords, communication)
+
+    When analysis holds the combined results of analyze_all_components,
+    they are stored without calling the API again.
+    """
     logger.info(f"Processing batch 2 for document {document_id}: {filename}")
 
     try:
         # Process all batch 2 components together
-        batch2_response = llm_service.analyze_document_modular(
-            filename, components=[
-                "classification", "entities", "design", "keywords", "communication"]
-        )
+        if analysis is not None:
+            batch1_keys = set(BATCH1_RESULT_KEYS.values())
+            batch2_response = {key: value for key, value in analysis.items()
+                               if key not in batch1_keys}
+        else:
+            batch2_response = llm_service.analyze_document_modular(
+                filename, components=[
+                    "classification", "entities", "design", "keywords", "communication"]
+            )
 
         if batch2_response:
             # First, store the basic components
@@ -232,9 +265,15 @@ def process_batch2(llm_service, filename, document_id):
         return False
 
 
-@celery_app.task(bind=True, name='process_document')
+@celery_app.task(bind=True, name='process_document', max_retries=RATE_LIMITER_SETTINGS['TASK_MAX_RETRIES'])
 def process_document(self, filename, minio_path, document_id):
-    """Process document through the pipeline using truly modular analysis"""
+    """
+    Process document through the pipeline using truly modular analysis
+
+    When Claude has no capacity within MAX_WAIT nothing is stored and the
+    task is retried after TASK_RETRY_DELAY; components that did run are
+    answered from the response cache on the retry.
+    """
     logger.info(f"=== STARTING DOCUMENT PROCESSING ===")
     logger.info(f"Task ID: {self.request.id}")
     logger.info(f"Processing document: {filename}")
@@ -245,9 +284,12 @@ def process_document(self, filename, minio_path, document_id):
     from src.catalog import create_app
     app = create_app()
 
+    # File, page image and payload for every stage of this run
+    working_set = DocumentWorkingSet(filename)
+
     with app.app_context():
         try:
-            doc = Document.query.get(document_id)
+            doc = get_document(document_id, 'status_only')
             if not doc:
                 logger.error(f"Document with ID {document_id} not found")
                 return False
@@ -260,9 +302,14 @@ def process_document(self, filename, minio_path, document_id):
             from src.catalog.services.llm_service import LLMService
             llm_service = LLMService()
 
-            # Process in batches with clear error handling
-            batch1_success = process_batch1(llm_service, filename, document_id)
-            batch2_success = process_batch2(llm_service, filename, document_id)
+            # Call every component concurrently, then store in batch order
+            # so keyword mapping finds the batch 1 analysis row
+            analysis = analyze_all_components(
+                llm_service, filename, working_set)
+            batch1_success = process_batch1(
+                llm_service, filename, document_id, analysis)
+            batch2_success = process_batch2(
+                llm_service, filename, document_id, analysis)
 
             # Check if we have minimum required analysis
             has_minimum_analysis = check_minimum_analysis(document_id)
@@ -272,13 +319,13 @@ def process_document(self, filename, minio_path, document_id):
                 try:
                     # Update status to COMPLETED
                     # Re-fetch to ensure fresh state
-                    doc = Document.query.get(document_id)
+                    doc = get_document(document_id, 'status_only')
                     if doc:
                         doc.status = DOCUMENT_STATUSES['COMPLETED']
                         db.session.commit()
 
                         # Verify the status was updated
-                        db.session.refresh(doc)
+                        db.session.refresh(doc, ['status'])
                         if doc.status == DOCUMENT_STATUSES['COMPLETED']:
                             logger.info(
                                 f"Document processing completed successfully")
@@ -291,14 +338,23 @@ def process_document(self, filename, minio_path, document_id):
                             f"Document {document_id} not found when updating status")
                         return False
 
-                    # Queue preview generation
+                    # Build the preview from the working set; queue it only
+                    # if that fails
                     try:
-                        from src.catalog.tasks.preview_tasks import generate_preview
-                        generate_preview.delay(filename, document_id)
-                        logger.info(
-                            f"Queued preview generation for {filename}")
+                        preview = preview_service.generate_from_working_set(
+                            working_set)
+                        if preview:
+                            # Same long timeout (1 day) as generate_preview
+                            cache.set(preview_cache_key(filename), preview,
+                                      timeout=86400)
+                            logger.info(f"Cached preview for {filename}")
+                        else:
+                            from src.catalog.tasks.preview_tasks import generate_preview
+                            generate_preview.delay(filename, document_id)
+                            logger.info(
+                                f"Queued preview generation for {filename}")
                     except Exception as e:
-                        logger.error(f"Failed to queue preview: {str(e)}")
+                        logger.error(f"Failed to generate preview: {str(e)}")
 
                     return True
                 except Exception as status_e:
@@ -309,7 +365,7 @@ def process_document(self, filename, minio_path, document_id):
             else:
                 # Mark as failed if we don't have minimum analysis
                 try:
-                    doc = Document.query.get(document_id)
+                    doc = get_document(document_id, 'status_only')
                     if doc:
                         doc.status = DOCUMENT_STATUSES['FAILED']
                         db.session.commit()
@@ -323,12 +379,20 @@ def process_document(self, filename, minio_path, document_id):
                     return False
 
         except Exception as e:
+            # Out of shared API capacity before anything was stored
+            if isinstance(e, RateLimitTimeout) and self.request.retries < self.max_retries:
+                logger.warning(
+                    f"Rate limited processing {filename}; retrying in "
+                    f"{RATE_LIMITER_SETTINGS['TASK_RETRY_DELAY']}s: {str(e)}")
+                raise self.retry(
+                    exc=e, countdown=RATE_LIMITER_SETTINGS['TASK_RETRY_DELAY'])
+
             logger.error(
                 f"Document processing failed: {str(e)}", exc_info=True)
 
             try:
                 # Update status to FAILED (not COMPLETED) when an exception occurs
-                doc = Document.query.get(document_id)
+                doc = get_document(document_id, 'status_only')
                 if doc and doc.status != DOCUMENT_STATUSES['FAILED']:
                     # Change to FAILED
                     doc.status = DOCUMENT_STATUSES['FAILED']
@@ -341,6 +405,21 @@ def process_document(self, filename, minio_path, document_id):
 
             return False
 
+        finally:
+            working_set.cleanup()
+
+            # Snapshot the new analysis for search result cards
+            try:
+                document_cards.refresh([document_id])
+                db.session.commit()
+            except Exception as card_e:
+                logger.error(
+                    f"Failed to refresh search card for document {document_id}: {str(card_e)}")
+                db.session.rollback()
+
+            # Status and analysis changed; drop stale search pages and facets
+            invalidate_document(document_id)
+
 
 def store_partial_analysis(document_id: int, response: dict):
     """Store partial analysis results in database"""
@@ -463,6 +542,7 @@ def store_partial_analysis(document_id: int, response: dict):
                                         f"Creating LLMKeyword for term: {taxonomy_term.term}")
                                     keyword = LLMKeyword(
                                         llm_analysis_id=llm_analysis.id,
+                                        taxonomy_id=taxonomy_term.id,
                                         keyword=taxonomy_term.term,
                                         category=taxonomy_term.primary_category,
                                         relevance_score=int(
@@ -717,6 +797,7 @@ def store_analysis_results(document_id: int, response: dict):
             logger.error(f"Failed to queue embeddings generation: {str(e)}")
 
         # Commit all changes to database
+        document_cards.refresh([document_id])
         db.session.commit()
         logger.info(
             f"Successfully stored all analysis results for document {document_id}")
@@ -738,7 +819,7 @@ def recover_pending_documents():
     with app.app_context():
         # Get documents stuck in PENDING state for more than 1 hour
         one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-        stuck_documents = Document.query.filter_by(status='PENDING') \
+        stuck_documents = build_document_query('status_only').filter_by(status='PENDING') \
             .filter(Document.upload_date < one_hour_ago) \
             .all()
 
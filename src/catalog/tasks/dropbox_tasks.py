@@ -1,7 +1,6 @@
 
 
 from celery import shared_task
-import time
 from .celery_app import celery_app, logger
 from src.catalog.constants import DOCUMENT_STATUSES, DROPBOX_SYNC_SETTINGS
 from src.catalog.services.dropbox_service import DropboxService
@@ -31,15 +30,8 @@ def sync_dropbox(self):
             dropbox_token = os.getenv('DROPBOX_ACCESS_TOKEN', 'NOT_SET')
             dropbox_folder = os.getenv('DROPBOX_FOLDER_PATH', '')
 
-            # Rate limiting configuration from constants (with environment variable override)
-            delay_seconds = int(os.getenv(
-                "DOCUMENT_PROCESSING_DELAY",
-                str(DROPBOX_SYNC_SETTINGS['DOCUMENT_PROCESSING_DELAY'])
-            ))
-            batch_size = int(os.getenv(
-                "DROPBOX_BATCH_SIZE",
-                str(DROPBOX_SYNC_SETTINGS['DROPBOX_BATCH_SIZE'])
-            ))
+            # Claude and OpenAI calls are paced by the shared API rate limiter,
+            # so files are queued as fast as they download
             max_concurrent = int(os.getenv(
                 "MAX_CONCURRENT_PROCESSING",
                 str(DROPBOX_SYNC_SETTINGS['MAX_CONCURRENT_PROCESSING'])
@@ -49,7 +41,7 @@ def sync_dropbox(self):
                 f"DROPBOX_ACCESS_TOKEN exists: {'Yes' if dropbox_token != 'NOT_SET' else 'No'}")
             logger.info(f"DROPBOX_FOLDER_PATH value: '{dropbox_folder}'")
             logger.info(
-                f"Rate limiting: {delay_seconds}s delay, batch size: {batch_size}, max concurrent: {max_concurrent}")
+                f"Rate limiting: shared API rate limiter, max concurrent: {max_concurrent}")
 
             # Initialize DropboxService
             try:
@@ -150,7 +142,6 @@ def sync_dropbox(self):
             from catalog.services.storage_service import MinIOStorage
             storage = MinIOStorage()
 
-            # Process files in batches with delays
             for i, file_metadata in enumerate(new_files):
                 temp_file = None
                 try:
@@ -220,20 +211,6 @@ def sync_dropbox(self):
 
                     processed_count += 1
 
-                    # Apply rate limiting
-                    if i < len(new_files) - 1:
-                        # Apply full delay between batches, or a small delay within batches
-                        if (processed_count % batch_size) == 0:
-                            logger.info(
-                                f"Processed batch of {batch_size}. Waiting {delay_seconds}s before next batch...")
-                            time.sleep(delay_seconds)
-                        else:
-                            # Small delay between documents in the same batch
-                            small_delay = 5
-                            logger.info(
-                                f"Adding small delay of {small_delay}s between files in batch")
-                            time.sleep(small_delay)
-
                 except Exception as e:
                     logger.error(
                         f"Error processing file {getattr(file_metadata, 'name', 'unknown')}: {str(e)}")
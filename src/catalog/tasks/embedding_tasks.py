@@ -2,7 +2,8 @@
 from .celery_app import celery_app, logger
 from src.catalog.models import Document
 from src.catalog import db
-import asyncio
+from src.catalog.services.http_clients import run_sync
+from src.catalog.utils.query_builders import build_document_query
 import os
 
 
@@ -24,21 +25,17 @@ def generate_embeddings(document_id=None):
     with app.app_context():
         embeddings_service = EmbeddingsService()
 
-        # Create event loop for async functions
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
         if document_id:
             # Process specific document
             logger.info(f"Generating embeddings for document {document_id}")
-            success = loop.run_until_complete(
+            success = run_sync(
                 embeddings_service.generate_and_store_embeddings_for_document(
                     document_id)
             )
             result = {document_id: "success" if success else "failed"}
         else:
             # Process all documents without embeddings
-            documents = Document.query.filter(
+            documents = build_document_query('status_only').filter(
                 Document.embeddings.is_(None)).all()
             logger.info(
                 f"Generating embeddings for {len(documents)} documents")
@@ -46,7 +43,7 @@ def generate_embeddings(document_id=None):
             result = {}
             for doc in documents:
                 try:
-                    success = loop.run_until_complete(
+                    success = run_sync(
                         embeddings_service.generate_and_store_embeddings_for_document(
                             doc.id)
                     )
@@ -56,5 +53,4 @@ def generate_embeddings(document_id=None):
                         f"Error generating embeddings for document {doc.id}: {str(e)}")
                     result[doc.id] = "error"
 
-        loop.close()
         return result
@@ -21,6 +21,7 @@ def generate_preview(filename, document_id=None):
         from src.catalog import create_app
         from src.catalog.services.preview_service import PreviewService
         from src.catalog import cache
+        from src.catalog.utils.cache_keys import preview_cache_key
 
         app = create_app()
         with app.app_context():
@@ -28,13 +29,12 @@ def generate_preview(filename, document_id=None):
             preview_data = preview_service._generate_preview_internal(filename)
 
             # Store the preview in cache with a long timeout (1 day)
-            cache_key = f"preview:{filename}"
-            cache.set(cache_key, preview_data, timeout=86400)
+            cache.set(preview_cache_key(filename), preview_data, timeout=86400)
 
             # Update document if ID provided
             if document_id:
-                from catalog.models import Document
-                document = Document.query.get(document_id)
+                from src.catalog.utils.query_builders import get_document
+                document = get_document(document_id, 'status_only')
                 if document:
                     document.has_preview = True
                     db.session.commit()
@@ -1,7 +1,7 @@
 # tasks/recovery_tasks.py
 
 from .celery_app import celery_app, logger
-from src.catalog.models import Document
+from src.catalog.utils.query_builders import get_document
 from src.catalog import db
 from src.catalog.constants import DOCUMENT_STATUSES
 
@@ -17,7 +17,7 @@ def reprocess_document(self, filename: str, minio_path: str, document_id: int):
     app = create_app()
 
     with app.app_context():
-        doc = Document.query.get(document_id)
+        doc = get_document(document_id, 'status_only')
 
         if not doc:
             logger.error(f"Document not found: {document_id}")
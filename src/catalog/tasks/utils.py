@@ -15,10 +15,11 @@ def handle_task_failure(task_func):
             logger.error(f"Task failed: {str(e)}", exc_info=True)
             # Update document status to failed if document_id is provided
             try:
-                from catalog.models import Document, db
+                from src.catalog import db
+                from src.catalog.utils.query_builders import get_document
                 document_id = kwargs.get('document_id')
                 if document_id:
-                    doc = Document.query.get(document_id)
+                    doc = get_document(document_id, 'status_only')
                     if doc:
                         doc.status = DOCUMENT_STATUSES['FAILED']
                         db.session.commit()
@@ -0,0 +1,212 @@
+# app/utils/cache_keys.py
+"""
+Namespaced cache keys with generation counters
+
+Every cache entry belongs to one or more namespaces (search, facets,
+doc:{id}). Keys embed the current generation of each namespace, so
+invalidating a namespace is a single counter increment: entries built
+against the old generation are never read again and simply expire.
+
+Counters live in Redis so a bump in a Celery worker reaches every web
+worker; without Redis they fall back to the Flask cache of this process.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from typing import Dict, Iterable, Mapping, Optional
+
+from src.catalog import cache
+
+logger = logging.getLogger(__name__)
+
+SEARCH = 'search'
+FACETS = 'facets'
+
+GENERATION_PREFIX = 'cache_generation:'
+
+# Search parameters and the values that mean "not set". cursor is absent on
+# purpose: an empty cursor asks for the first cursor-shaped page, which is
+# a different response from the page-numbered one
+SEARCH_PARAM_DEFAULTS = {
+    'q': '',
+    'page': '1',
+    'per_page': '12',
+    'sort_by': 'upload_date',
+    'sort_dir': 'desc',
+    'search_type': 'hybrid',
+    'filter_type': '',
+    'filter_year': '',
+    'filter_location': '',
+    'primary_category': '',
+    'subcategory': '',
+    'specific_term': '',
+    'include_total': 'false',
+}
+
+# Parameters the search route reads case-insensitively
+CASE_INSENSITIVE_PARAMS = {'include_total'}
+
+
+def document_namespace(document_id: int) -> str:
+    """Namespace for entries derived from a single document"""
+    return f"doc:{document_id}"
+
+
+class _GenerationStore:
+    """Generation counters in Redis, falling back to the Flask cache"""
+
+    def __init__(self):
+        self._redis = None
+        self._redis_retry_at = 0.0
+
+    def _get_redis(self):
+        """Connect lazily; back off for a minute after a connection failure"""
+        if self._redis is not None or time.time() < self._redis_retry_at:
+            return self._redis
+
+        try:
+            import redis
+            from src.catalog.config import get_redis_uri
+
+            self._redis = redis.Redis.from_url(
+                get_redis_uri(), socket_timeout=0.5, socket_connect_timeout=0.5)
+        except Exception as e:
+            logger.warning(f"Cache generations running without Redis: {str(e)}")
+            self._redis_retry_at = time.time() + 60
+        return self._redis
+
+    def _redis_failed(self, e):
+        logger.warning(f"Cache generation store error: {str(e)}")
+        self._redis = None
+        self._redis_retry_at = time.time() + 60
+
+    def get(self, namespaces) -> Dict[str, int]:
+        keys = [GENERATION_PREFIX + namespace for namespace in namespaces]
+        client = self._get_redis()
+        if client is not None:
+            try:
+                values = client.mget(keys)
+                return {namespace: int(value or 0)
+                        for namespace, value in zip(namespaces, values)}
+            except Exception as e:
+                self._redis_failed(e)
+
+        values = cache.get_many(*keys)
+        return {namespace: int(value or 0)
+                for namespace, value in zip(namespaces, values)}
+
+    def bump(self, namespaces):
+        keys = [GENERATION_PREFIX + namespace for namespace in namespaces]
+        client = self._get_redis()
+        if client is not None:
+            try:
+                pipeline = client.pipeline(transaction=False)
+                for key in keys:
+                    pipeline.incr(key)
+                pipeline.execute()
+                return
+            except Exception as e:
+                self._redis_failed(e)
+
+        for key in keys:
+            cache.set(key, (cache.get(key) or 0) + 1, timeout=0)
+
+
+_generations = _GenerationStore()
+
+
+def namespace_generations(*namespaces: str) -> Dict[str, int]:
+    """Current generation of each namespace"""
+    try:
+        return _generations.get(list(namespaces))
+    except Exception as e:
+        logger.error(f"Error reading cache generations: {str(e)}")
+        return {namespace: 0 for namespace in namespaces}
+
+
+def bump_namespaces(*namespaces: str):
+    """
+    Invalidate every cache entry in the given namespaces
+
+    Args:
+        *namespaces: Namespaces to invalidate, e.g. SEARCH or document_namespace(id)
+    """
+    try:
+        _generations.bump(list(namespaces))
+    except Exception as e:
+        logger.error(f"Error bumping cache generations: {str(e)}")
+
+
+def make_cache_key(namespace: str, *parts, depends_on: Iterable[str] = ()) -> str:
+    """
+    Build a key in namespace that is invalidated with it and with depends_on
+
+    Args:
+        namespace: Primary namespace of the entry
+        *parts: Values identifying the entry within the namespace
+        depends_on: Further namespaces whose bumps invalidate the entry
+
+    Returns:
+        Cache key string
+    """
+    namespaces = [namespace] + [n for n in depends_on if n != namespace]
+    generations = namespace_generations(*namespaces)
+    version = '.'.join(str(generations[n]) for n in namespaces)
+
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+    return f"{namespace}:v{version}:{digest}"
+
+
+def normalize_params(args: Mapping, defaults: Optional[Mapping[str, str]] = None) -> str:
+    """
+    Canonical query string: sorted, whitespace-collapsed, defaults dropped
+
+    Args:
+        args: Request arguments (a MultiDict or plain mapping)
+        defaults: Parameter values that are equivalent to leaving them out
+
+    Returns:
+        Normalised query string
+    """
+    defaults = defaults or {}
+    items = []
+    for key in sorted(set(args.keys())):
+        values = args.getlist(key) if hasattr(args, 'getlist') else [args[key]]
+        for value in values:
+            value = ' '.join(str(value).split())
+            if key in CASE_INSENSITIVE_PARAMS:
+                value = value.lower()
+            if key in defaults and value in ('', defaults[key]):
+                continue
+            items.append(f"{key}={value}")
+    return '&'.join(items)
+
+
+def preview_cache_key(filename: str) -> str:
+    """
+    Key of the cached preview image for a stored file
+
+    Previews depend only on the file, so they are not versioned by a
+    namespace; invalidate_document_cache() deletes the key directly.
+    """
+    return f"preview:{filename}"
+
+
+def invalidate_document(document_id: int):
+    """Invalidate search results, facets and per-document entries after a document changes"""
+    bump_namespaces(SEARCH, FACETS, document_namespace(document_id))
+
+
+def search_page_cache_key(*args, **kwargs) -> str:
+    """Cache key for the search view, shared by equivalent query strings"""
+    from flask import request
+
+    response_format = 'json' if request.headers.get(
+        'X-Requested-With') == 'XMLHttpRequest' else 'html'
+    return make_cache_key(
+        SEARCH, 'view', request.path, response_format,
+        normalize_params(request.args, SEARCH_PARAM_DEFAULTS),
+        depends_on=[FACETS])
@@ -0,0 +1,82 @@
+# app/utils/cursors.py
+"""
+Opaque, signed cursor tokens for keyset pagination
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+
+logger = logging.getLogger(__name__)
+
+CURSOR_SALT = 'search-cursor'
+
+
+class InvalidCursorError(ValueError):
+    """A cursor token that was tampered with or issued for a different search"""
+
+
+def _serializer():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt=CURSOR_SALT)
+
+
+def search_fingerprint(**params) -> str:
+    """Short hash of the parameters a cursor is only valid for"""
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def encode_cursor(sort_value: Any, document_id: int, fingerprint: str) -> str:
+    """
+    Encode the sort key of the last row on a page
+
+    Args:
+        sort_value: Value of the sort column (date, filename or relevance score)
+        document_id: ID of the last row, used as the tiebreaker
+        fingerprint: search_fingerprint of the query the cursor belongs to
+
+    Returns:
+        URL-safe signed token
+    """
+    if isinstance(sort_value, datetime):
+        sort_value = {'dt': sort_value.isoformat()}
+    return _serializer().dumps({'v': sort_value, 'id': document_id, 'f': fingerprint})
+
+
+def decode_cursor(token: Optional[str], fingerprint: str) -> Optional[Dict[str, Any]]:
+    """
+    Decode a cursor token
+
+    Returns:
+        Dictionary with 'value' and 'id', or None when the token is empty
+        (the first page)
+
+    Raises:
+        InvalidCursorError: The token was tampered with or belongs to a
+            different query; restarting from the top would repeat results
+    """
+    if not token:
+        return None
+
+    try:
+        data = _serializer().loads(token)
+    except BadSignature:
+        logger.warning("Rejecting search cursor with a bad signature")
+        raise InvalidCursorError("Invalid cursor")
+
+    if not isinstance(data, dict) or data.get('f') != fingerprint:
+        raise InvalidCursorError("Cursor does not belong to this search")
+
+    value = data.get('v')
+    try:
+        if isinstance(value, dict) and 'dt' in value:
+            value = datetime.fromisoformat(value['dt'])
+        document_id = int(data['id'])
+    except (KeyError, TypeError, ValueError):
+        raise InvalidCursorError("Invalid cursor")
+    return {'value': value, 'id': document_id}
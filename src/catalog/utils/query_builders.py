@@ -3,12 +3,13 @@
 Reusable database query patterns for consistent and optimized database access
 """
 
-from sqlalchemy import or_, func, desc, asc, case, text
-from sqlalchemy.orm import joinedload
+from sqlalchemy import or_, func, desc, asc, case, text, any_, literal, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import joinedload, selectinload, load_only, defer
 from src.catalog import db
 from src.catalog.models import (
     Document, LLMAnalysis, ExtractedText, DesignElement,
-    Classification, Entity, CommunicationFocus, LLMKeyword
+    Classification, Entity, CommunicationFocus, LLMKeyword, SearchDocument
 )
 from src.catalog.models import LLMKeyword, KeywordTaxonomy, KeywordSynonym
 from src.catalog.constants import DOCUMENT_STATUSES
@@ -74,6 +75,123 @@ def build_document_with_relationships_query(
     return query
 
 
+def _document_columns(*names):
+    return load_only(*(getattr(Document, name) for name in names))
+
+
+def _heavy_document_columns():
+    """Defer the embedding and tsvector columns, which no view reads back"""
+    options = [defer(Document.search_vector)]
+    if hasattr(Document, 'embeddings'):
+        options.append(defer(Document.embeddings))
+    return options
+
+
+def _status_only_options():
+    # One narrow documents row, no related tables
+    return [_document_columns('id', 'filename', 'status', 'upload_date',
+                              'processing_time', 'file_size')]
+
+
+def _card_options():
+    # What a search result or listing card shows
+    return [
+        _document_columns('id', 'filename', 'upload_date', 'status', 'file_size',
+                          'page_count', 'processing_time'),
+        selectinload(Document.llm_analysis).options(
+            load_only(LLMAnalysis.id, LLMAnalysis.document_id,
+                      LLMAnalysis.summary_description, LLMAnalysis.campaign_type,
+                      LLMAnalysis.election_year, LLMAnalysis.document_tone),
+            selectinload(LLMAnalysis.keywords),
+        ),
+        selectinload(Document.extracted_text).load_only(
+            ExtractedText.id, ExtractedText.document_id, ExtractedText.main_message),
+        selectinload(Document.design_elements),
+        selectinload(Document.entity),
+        selectinload(Document.communication_focus),
+    ]
+
+
+def _detail_options():
+    # Every analysis table for one document, keywords with their taxonomy
+    return _heavy_document_columns() + [
+        selectinload(Document.llm_analysis).selectinload(
+            LLMAnalysis.keywords).selectinload(LLMKeyword.taxonomy),
+        selectinload(Document.extracted_text),
+        selectinload(Document.design_elements),
+        selectinload(Document.classification),
+        selectinload(Document.entity),
+        selectinload(Document.communication_focus),
+    ]
+
+
+def _full_options():
+    # The old model default: everything joined into a single statement
+    return [
+        joinedload(Document.llm_analysis).joinedload(
+            LLMAnalysis.keywords).joinedload(LLMKeyword.taxonomy),
+        joinedload(Document.extracted_text),
+        joinedload(Document.design_elements),
+        joinedload(Document.classification),
+        joinedload(Document.entity),
+        joinedload(Document.communication_focus),
+    ]
+
+
+# Named loading profiles for Document. The model itself loads nothing eagerly,
+# so each call site states how much of the graph it needs.
+DOCUMENT_LOADING_PROFILES = {
+    'status_only': _status_only_options,  # Status updates in the worker
+    'card': _card_options,                # Listings and search results
+    'detail': _detail_options,            # Single-document views and embedding input
+    'full': _full_options,                # Exports that need every column and relation
+}
+
+
+def document_loading_options(profile: str) -> list:
+    """
+    Loader options for a named Document loading profile
+
+    Args:
+        profile: One of DOCUMENT_LOADING_PROFILES
+
+    Returns:
+        List of SQLAlchemy loader options
+    """
+    try:
+        return DOCUMENT_LOADING_PROFILES[profile]()
+    except KeyError:
+        raise ValueError(f"Unknown document loading profile: {profile}")
+
+
+def build_document_query(profile: str = 'status_only'):
+    """
+    Create a Document query that loads according to a named profile
+
+    Args:
+        profile: One of DOCUMENT_LOADING_PROFILES
+
+    Returns:
+        SQLAlchemy query object for Document
+    """
+    return Document.query.options(*document_loading_options(profile))
+
+
+def get_document(document_id: int, profile: str = 'status_only') -> Optional[Document]:
+    """
+    Fetch one document by primary key with a named loading profile
+
+    Args:
+        document_id: Document ID
+        profile: One of DOCUMENT_LOADING_PROFILES
+
+    Returns:
+        Document or None
+    """
+    return db.session.get(Document, document_id,
+                          options=document_loading_options(profile))
+
+
 def filter_by_status(query, status=None):
     """
     Filter documents by status
@@ -266,7 +384,8 @@ def get_failed_documents_query():
     Returns:
         SQLAlchemy query for failed documents
     """
-    return Document.query.filter_by(status=DOCUMENT_STATUSES['FAILED']).order_by(Document.upload_date.desc())
+    return build_document_query('status_only').filter_by(
+        status=DOCUMENT_STATUSES['FAILED']).order_by(Document.upload_date.desc())
 
 
 def get_stuck_documents_query(hours=1):
@@ -285,12 +404,84 @@ def get_stuck_documents_query(hours=1):
     time_threshold = datetime.utcnow() - timedelta(hours=hours)
 
     # We're specifically looking for PROCESSING documents
-    return Document.query.filter(
+    return build_document_query('status_only').filter(
         Document.status == DOCUMENT_STATUSES['PROCESSING'],
         Document.upload_date < time_threshold
     ).order_by(Document.upload_date.desc())
 
 
+def build_ranked_id_query(document_ids: List[int]):
+    """
+    Build a query of document IDs that preserves a precomputed ranking
+
+    Args:
+        document_ids: Document IDs, best match first
+
+    Returns:
+        SQLAlchemy query with document IDs in ranked order
+    """
+    if not document_ids:
+        return db.session.query(Document.id).filter(text('1 = 0'))
+
+    rank = case(
+        {doc_id: position for position, doc_id in enumerate(document_ids)},
+        value=Document.id
+    )
+    return db.session.query(Document.id).filter(
+        Document.id.in_(document_ids)
+    ).order_by(rank)
+
+
+def build_id_set_query(document_ids):
+    """
+    Build a query over an unordered set of document IDs
+
+    The IDs are bound as one array parameter, so large sets from the
+    in-process filter index don't expand into an IN list.
+
+    Args:
+        document_ids: Document IDs
+
+    Returns:
+        SQLAlchemy query with document IDs
+    """
+    if not document_ids:
+        return db.session.query(Document.id).filter(text('1 = 0'))
+
+    return db.session.query(Document.id).filter(
+        Document.id == any_(literal(list(document_ids), type_=ARRAY(Integer)))
+    )
+
+
+def build_vector_similarity_query(embeddings, similarity_threshold):
+    """
+    Build the pgvector query of (document ID, combined similarity)
+
+    Both embeddings of a document live in its search_documents row; each
+    contributes its cosine similarity when above the threshold.
+
+    Args:
+        embeddings: Query embedding
+        similarity_threshold: Minimum similarity for an embedding to count
+
+    Returns:
+        SQLAlchemy query of (document_id, similarity), most similar first
+    """
+    similarities = [
+        1 - SearchDocument.embedding.op('<=>')(embeddings),
+        1 - SearchDocument.analysis_embedding.op('<=>')(embeddings)
+    ]
+    similarity = sum(case((value > similarity_threshold, value), else_=0)
+                     for value in similarities)
+
+    return db.session.query(
+        SearchDocument.document_id,
+        similarity.label('similarity')
+    ).filter(
+        or_(*[value > similarity_threshold for value in similarities])
+    ).order_by(similarity.desc())
+
+
 def search_document_ids_by_vector(embeddings, similarity_threshold=0.7):
     """
     Search for document IDs using vector similarity (if available)
@@ -303,48 +494,22 @@ def search_document_ids_by_vector(embeddings, similarity_threshold=0.7):
         SQLAlchemy query with document IDs
     """
     try:
+        # Prefer the in-process ANN index over a sequential scan in Postgres
+        from src.catalog.services.vector_index import document_vector_index
+        document_vector_index.ensure_fresh()
+        if document_vector_index.ready:
+            ranked = document_vector_index.search(
+                embeddings, threshold=similarity_threshold)
+            return build_ranked_id_query([doc_id for doc_id, _ in ranked])
+
         # Check if vector search is available
-        if not hasattr(Document, 'embeddings'):
+        if not hasattr(SearchDocument, 'embedding'):
             return None
 
         # Use cosine similarity with pgvector
-        doc_matches = db.session.query(
-            Document.id,
-            (1 - (Document.embeddings.op('<=>')(embeddings))).label('similarity')
-        ).filter(
-            Document.embeddings.is_not(None)
-        ).filter(
-            (1 - (Document.embeddings.op('<=>')(embeddings))) > similarity_threshold
-        ).subquery()
-
-        # Find analysis content with similar embeddings
-        analysis_matches = db.session.query(
-            LLMAnalysis.document_id,
-            (1 - (LLMAnalysis.embeddings.op('<=>')(embeddings))).label('similarity')
-        ).filter(
-            LLMAnalysis.embeddings.is_not(None)
-        ).filter(
-            (1 - (LLMAnalysis.embeddings.op('<=>')(embeddings))) > similarity_threshold
-        ).subquery()
-
-        # Combine the results and order by similarity score
-        combined_query = db.session.query(
-            Document.id
-        ).outerjoin(
-            doc_matches, Document.id == doc_matches.c.id
-        ).outerjoin(
-            analysis_matches, Document.id == analysis_matches.c.document_id
-        ).filter(
-            or_(
-                doc_matches.c.id.is_not(None),
-                analysis_matches.c.document_id.is_not(None)
-            )
-        ).order_by(
-            (func.coalesce(doc_matches.c.similarity, 0) +
-                func.coalesce(analysis_matches.c.similarity, 0)).desc()
-        )
-
-        return combined_query
+        return build_vector_similarity_query(
+            embeddings, similarity_threshold
+        ).with_entities(SearchDocument.document_id)
     except Exception:
         # Return None if vector search fails
         return None
@@ -0,0 +1,71 @@
+# app/utils/ranking.py
+"""
+Helpers for fusing ranked result lists from different search strategies
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+RankedList = List[Tuple[int, float]]
+
+
+def reciprocal_rank_fusion(ranked_lists: Sequence[RankedList],
+                           k: int = 60,
+                           weights: Optional[Sequence[float]] = None) -> RankedList:
+    """
+    Fuse ranked lists with reciprocal rank fusion
+
+    Each document scores sum(weight / (k + rank)) over the lists it appears
+    in, so only the order of each list matters, not its score scale.
+
+    Args:
+        ranked_lists: Lists of (document_id, score), best first
+        k: Damping constant; larger values flatten the rank curve
+        weights: Optional weight per list
+
+    Returns:
+        Fused list of (document_id, score), best first
+    """
+    weights = weights or [1.0] * len(ranked_lists)
+    fused: Dict[int, float] = {}
+
+    for ranked, weight in zip(ranked_lists, weights):
+        for rank, (doc_id, _) in enumerate(ranked, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (k + rank)
+
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+def weighted_score_fusion(ranked_lists: Sequence[RankedList],
+                          weights: Optional[Sequence[float]] = None) -> RankedList:
+    """
+    Fuse ranked lists by a weighted sum of min-max normalised scores
+
+    Args:
+        ranked_lists: Lists of (document_id, score), best first
+        weights: Optional weight per list
+
+    Returns:
+        Fused list of (document_id, score), best first
+    """
+    weights = weights or [1.0] * len(ranked_lists)
+    fused: Dict[int, float] = {}
+
+    for ranked, weight in zip(ranked_lists, weights):
+        if not ranked:
+            continue
+        scores = [score for _, score in ranked]
+        low, high = min(scores), max(scores)
+        spread = high - low
+        for doc_id, score in ranked:
+            normalised = (score - low) / spread if spread else 1.0
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight * normalised
+
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+def fuse_rankings(ranked_lists: Sequence[RankedList], method: str = 'rrf',
+                  weights: Optional[Sequence[float]] = None, k: int = 60) -> RankedList:
+    """Fuse ranked lists with the named method ('rrf' or 'weighted')"""
+    if method == 'weighted':
+        return weighted_score_fusion(ranked_lists, weights)
+    return reciprocal_rank_fusion(ranked_lists, k=k, weights=weights)
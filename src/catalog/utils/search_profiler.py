@@ -0,0 +1,147 @@
+# app/utils/search_profiler.py
+"""
+Per-stage timing and SQL capture for a single search request
+"""
+
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_active_profile: contextvars.ContextVar = contextvars.ContextVar(
+    'search_profile', default=None)
+
+
+class SearchProfile:
+    """Timings, and optionally SQL statements, recorded while a search runs"""
+
+    def __init__(self, capture_sql: bool = False):
+        self.capture_sql = capture_sql
+        self.stages: Dict[str, float] = {}
+        self.statements: List[Dict[str, Any]] = []
+        self._stage_stack: List[list] = []
+        self._started = None
+        self.total_ms = None
+
+    @contextmanager
+    def activate(self):
+        """Make this the profile that stage() and SQL capture record into"""
+        token = _active_profile.set(self)
+        self._started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.total_ms = (time.perf_counter() - self._started) * 1000
+            _active_profile.reset(token)
+
+    @property
+    def current_stage(self) -> Optional[str]:
+        return self._stage_stack[-1][0] if self._stage_stack else None
+
+    def add_time(self, name: str, elapsed_ms: float):
+        self.stages[name] = self.stages.get(name, 0.0) + elapsed_ms
+
+    def record_statement(self, statement: str, parameters):
+        self.statements.append({
+            'stage': self.current_stage,
+            'sql': statement,
+            'parameters': parameters
+        })
+
+    def to_dict(self, include_sql: bool = False) -> Dict[str, Any]:
+        """JSON-serialisable summary, stages in execution order"""
+        timed = sum(self.stages.values())
+        result = {
+            'total_ms': round(self.total_ms or 0.0, 2),
+            'stages_ms': {name: round(ms, 2) for name, ms in self.stages.items()},
+            'untracked_ms': round(max((self.total_ms or 0.0) - timed, 0.0), 2),
+        }
+        if include_sql:
+            result['statements'] = [
+                {key: (value if key != 'parameters' else _json_safe(value))
+                 for key, value in statement.items()}
+                for statement in self.statements
+            ]
+        return result
+
+
+def active_profile() -> Optional[SearchProfile]:
+    return _active_profile.get()
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Time a block as a named search stage
+
+    Does nothing unless a SearchProfile is active. Time spent in a nested
+    stage is counted only there, so the stages add up to the total; SQL is
+    attributed to the innermost stage. Repeated stages accumulate.
+    """
+    profile = _active_profile.get()
+    if profile is None:
+        yield
+        return
+
+    # [name, time spent in nested stages]
+    frame = [name, 0.0]
+    profile.stages.setdefault(name, 0.0)
+    profile._stage_stack.append(frame)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        profile._stage_stack.pop()
+        if profile._stage_stack:
+            profile._stage_stack[-1][1] += elapsed
+        profile.add_time(name, elapsed - frame[1])
+
+
+def explain_statements(profile: SearchProfile, connection):
+    """
+    Attach EXPLAIN ANALYZE plans to the SELECT statements a profile captured
+
+    The statements are executed again, so this is only used by the explain
+    endpoint.
+
+    Args:
+        profile: Profile recorded with capture_sql=True
+        connection: SQLAlchemy connection to run EXPLAIN on
+    """
+    for statement in profile.statements:
+        sql = statement['sql'].lstrip()
+        keyword = sql.split(None, 1)[0].upper() if sql else ''
+        # Only re-run reads; set_config() calls are SELECTs with side effects
+        if keyword not in ('SELECT', 'WITH') or 'set_config(' in sql:
+            continue
+        try:
+            result = connection.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", statement['parameters'])
+            statement['plan'] = result.scalar()
+        except Exception as e:
+            logger.warning(f"EXPLAIN failed for {statement['stage']} statement: {str(e)}")
+            statement['plan_error'] = str(e)
+
+
+def _json_safe(value):
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _capture_statement(conn, cursor, statement, parameters, context, executemany):
+    profile = _active_profile.get()
+    if profile is not None and profile.capture_sql:
+        profile.record_statement(statement, parameters)
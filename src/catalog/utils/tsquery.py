@@ -0,0 +1,127 @@
+# app/utils/tsquery.py
+"""
+Compile search text into PostgreSQL tsquery syntax.
+
+User input and taxonomy terms reach to_tsquery only as quoted lexemes joined
+by explicit operators, so no query can raise a tsquery syntax error:
+
+    compile_tsquery('senior health', {'medicare', 'social security'})
+    "('senior' & 'health':*) | 'medicare' | ('social' <-> 'security')"
+
+Every word of the query itself must match, the last one as a prefix so
+results follow what is being typed. Each expanded term is an alternative,
+multi-word terms as phrases. Plain string handling; no database needed.
+"""
+
+import re
+from typing import Iterable, List, Optional
+
+from src.catalog.constants import FULL_TEXT_SEARCH_SETTINGS
+
+# Runs of letters and digits; everything else, underscores included, separates words
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase words, dropping tsquery operators and punctuation
+
+    Args:
+        text: Raw text
+
+    Returns:
+        List of words in order
+    """
+    if not text:
+        return []
+    return _WORD.findall(text.lower())
+
+
+def quote_lexeme(word: str, prefix: bool = False) -> str:
+    """
+    Quote a word as a tsquery lexeme
+
+    Args:
+        word: Word to quote
+        prefix: Append :* so the lexeme matches as a prefix
+
+    Returns:
+        Quoted lexeme, e.g. 'health' or 'health':*
+    """
+    quoted = "'" + word.replace("\\", "\\\\").replace("'", "''") + "'"
+    return quoted + ':*' if prefix else quoted
+
+
+def _group(parts: List[str], operator: str) -> str:
+    if len(parts) == 1:
+        return parts[0]
+    return '(' + f' {operator} '.join(parts) + ')'
+
+
+def phrase(words: List[str]) -> str:
+    """Words that must appear next to each other, in order"""
+    return _group([quote_lexeme(word) for word in words], '<->')
+
+
+def all_words(words: List[str], prefix_last: bool = False) -> str:
+    """
+    Words that must all appear, anywhere
+
+    Args:
+        words: Words to match
+        prefix_last: Match the final word as a prefix
+
+    Returns:
+        tsquery text
+    """
+    min_length = FULL_TEXT_SEARCH_SETTINGS['PREFIX_MIN_LENGTH']
+    parts = [quote_lexeme(word) for word in words[:-1]]
+    last = words[-1]
+    parts.append(quote_lexeme(last, prefix=prefix_last and len(last) >= min_length))
+    return _group(parts, '&')
+
+
+def _by_relevance(terms: Iterable[str], query_words: List[str]) -> List[str]:
+    """Expanded terms sharing the most words with the query first, then alphabetically"""
+    query_words = set(query_words)
+    return sorted(terms, key=lambda term: (-len(query_words.intersection(tokenize(term))), term))
+
+
+def compile_tsquery(query: str, expanded_terms: Optional[Iterable[str]] = None,
+                    max_terms: Optional[int] = None) -> str:
+    """
+    Build tsquery text for a search query and its expanded terms
+
+    Args:
+        query: Search text as typed
+        expanded_terms: Related taxonomy terms and synonyms, matched as alternatives
+        max_terms: Most alternatives in the result, the query's own counted
+            (default from FULL_TEXT_SEARCH_SETTINGS); the query is always kept
+
+    Returns:
+        tsquery text for to_tsquery, or '' when nothing searchable remains
+    """
+    if max_terms is None:
+        max_terms = FULL_TEXT_SEARCH_SETTINGS['MAX_TERMS']
+
+    alternatives = []
+    seen = set()
+
+    # The query itself comes first and is never cut
+    query_words = tokenize(query)
+    if query_words:
+        alternatives.append(all_words(query_words, prefix_last=True))
+        seen.add(tuple(query_words))
+
+    # Terms closest to the query survive the cap; ties break alphabetically
+    # so the same expansion always compiles to the same text
+    for term in _by_relevance(expanded_terms or (), query_words):
+        if len(alternatives) >= max_terms:
+            break
+        words = tokenize(term)
+        if not words or tuple(words) in seen:
+            continue
+        seen.add(tuple(words))
+        alternatives.append(phrase(words))
+
+    return ' | '.join(alternatives)
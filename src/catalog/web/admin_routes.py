@@ -5,6 +5,7 @@ import logging
 # Import models
 from src.catalog.models import Document, DocumentScorecard
 from src.catalog import db
+from src.catalog.utils.query_builders import build_document_query, document_loading_options
 
 logger = logging.getLogger(__name__)
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
@@ -39,6 +40,29 @@ def get_quality_metrics():
         }), 500
 
 
+@admin_bp.route('/rate-limits', methods=['GET'])
+def get_rate_limits():
+    """Current headroom in the shared Claude and OpenAI rate limit buckets"""
+    try:
+        from src.catalog.constants import API_RATE_LIMITS
+        from src.catalog.services.rate_limiter import api_rate_limiter
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'headroom': {api: api_rate_limiter.headroom(api) for api in API_RATE_LIMITS},
+                'process_stats': api_rate_limiter.stats
+            }
+        })
+    except Exception as e:
+        current_app.logger.error(
+            f"Error getting rate limits: {str(e)}", exc_info=True)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @admin_bp.route('/review-queue', methods=['GET'])
 def get_review_queue():
     """Get documents flagged for review"""
@@ -52,6 +76,8 @@ def get_review_queue():
         # Build query to get documents requiring review - using select_from to fix ambiguity
         query = db.session.query(Document).select_from(DocumentScorecard).join(
             Document, DocumentScorecard.document_id == Document.id
+        ).options(
+            *document_loading_options('status_only')
         ).filter(
             DocumentScorecard.requires_review == True,
             DocumentScorecard.reviewed == False
@@ -194,7 +220,7 @@ def generate_missing_scorecards():
         # Use a clearer subquery approach that's less prone to SQLAlchemy issues
         subquery = db.session.query(DocumentScorecard.document_id).subquery()
 
-        documents_without_scorecards = Document.query.filter(
+        documents_without_scorecards = build_document_query('status_only').filter(
             Document.status == 'COMPLETED',
             not_(Document.id.in_(subquery))
         ).all()
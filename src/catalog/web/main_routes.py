@@ -34,6 +34,7 @@ from src.catalog.models import KeywordTaxonomy, KeywordSynonym
 from sqlalchemy import or_, func, desc, case, extract
 from src.catalog.services.preview_service import PreviewService
 from src.catalog.services.dropbox_service import DropboxService
+from src.catalog.services.facet_service import facet_service
 from flask_wtf.csrf import generate_csrf
 from src.catalog import csrf
 import time
@@ -45,6 +46,7 @@ from src.catalog.tasks.document_tasks import process_document
 from src.catalog.tasks.dropbox_tasks import sync_dropbox
 from functools import wraps
 from src.catalog import cache
+from src.catalog.utils.cache_keys import make_cache_key, document_namespace, preview_cache_key
 from src.catalog.services.document_service import (
     get_document_count,
     get_document_counts_by_status,
@@ -54,7 +56,8 @@ from src.catalog.utils import search_with_timeout, document_has_column, monitor_
 from src.catalog.utils.query_builders import get_failed_documents_query
 from src.catalog.utils.query_builders import (
     get_document_statistics,
-    build_document_with_relationships_query,
+    build_document_query,
+    get_document,
     apply_sorting,
     get_stuck_documents_query,
 )
@@ -201,8 +204,8 @@ def dashboard():
 @main_routes.route("/home")
 def home():
     try:
-        # Get recent documents with relationships, sorted by upload date
-        documents_query = build_document_with_relationships_query()
+        # Get recent documents with what a card shows, sorted by upload date
+        documents_query = build_document_query("card")
         documents_query = apply_sorting(documents_query, "upload_date", "desc")
         documents = documents_query.limit(10).all()
 
@@ -338,7 +341,7 @@ def upload_file():
         if document and document.id:
             try:
                 # Re-fetch the document within a new session scope if needed, or just update status
-                doc_to_fail = Document.query.get(document.id)
+                doc_to_fail = get_document(document.id, "status_only")
                 if doc_to_fail:
                     doc_to_fail.status = "FAILED"
                     db.session.commit()
@@ -368,9 +371,14 @@ def search_documents():
     return redirect(url_for("search_routes.search_documents", **request.args))
 
 
-@cache.memoize(timeout=300)
 def get_document_hierarchical_keywords(document_id):
     """Get hierarchical keywords for a document"""
+    cache_key = make_cache_key(
+        document_namespace(document_id), "hierarchical_keywords")
+    cached_keywords = cache.get(cache_key)
+    if cached_keywords is not None:
+        return cached_keywords
+
     try:
         keywords = (
             db.session.query(LLMKeyword, KeywordTaxonomy)
@@ -392,82 +400,23 @@ def get_document_hierarchical_keywords(document_id):
                 }
             )
 
+        cache.set(cache_key, result, timeout=CACHE_TIMEOUTS["HIERARCHICAL_KEYWORDS"])
         return result
     except Exception as e:
         logger.error(f"Error getting hierarchical keywords: {str(e)}")
         return []
 
 
-@cache.memoize(timeout=300)
 def generate_taxonomy_facets(selected_primary=None, selected_subcategory=None):
     """Generate taxonomy facets for sidebar filtering"""
     try:
-        logger = current_app.logger
-        # Create a CTE for documents that have keywords
-        docs_with_keywords = (
-            db.session.query(
-                LLMKeyword.taxonomy_id,
-                func.count(LLMAnalysis.document_id.distinct()).label("doc_count"),
-            )
-            .join(LLMAnalysis, LLMKeyword.llm_analysis_id == LLMAnalysis.id)
-            .group_by(LLMKeyword.taxonomy_id)
-            .cte("docs_with_keywords")
-        )
-
-        # Get primary categories with counts
-        primary_categories = (
-            db.session.query(
-                KeywordTaxonomy.primary_category,
-                func.sum(docs_with_keywords.c.doc_count).label("count"),
-            )
-            .join(
-                docs_with_keywords,
-                KeywordTaxonomy.id == docs_with_keywords.c.taxonomy_id,
-            )
-            .group_by(KeywordTaxonomy.primary_category)
-            .order_by(KeywordTaxonomy.primary_category)
-            .all()
-        )
-
-        # If a primary category is selected, get subcategories
-        subcategories = []
-        if selected_primary:
-            subcategories = (
-                db.session.query(
-                    KeywordTaxonomy.subcategory,
-                    func.count(KeywordTaxonomy.id.distinct()).label("count"),
-                )
-                .filter(KeywordTaxonomy.primary_category == selected_primary)
-                .join(LLMKeyword, KeywordTaxonomy.id == LLMKeyword.taxonomy_id)
-                .join(LLMAnalysis, LLMKeyword.llm_analysis_id == LLMAnalysis.id)
-                .group_by(KeywordTaxonomy.subcategory)
-                .order_by(KeywordTaxonomy.subcategory)
-                .all()
-            )
-
-        # Format results
-        result = {
-            "primary_categories": [
-                {"name": cat, "count": count, "selected": cat == selected_primary}
-                for cat, count in primary_categories
-            ],
-            "subcategories": (
-                [
-                    {
-                        "name": subcat,
-                        "count": count,
-                        "selected": subcat == selected_subcategory,
-                    }
-                    for subcat, count in subcategories
-                ]
-                if selected_primary
-                else []
-            ),
+        facets = facet_service.get_facets(selected_primary, selected_subcategory)
+        return {
+            "primary_categories": facets["primary_categories"],
+            "subcategories": facets["subcategories"],
         }
-
-        return result
     except Exception as e:
-        logger.error(f"Error generating taxonomy facets: {str(e)}")
+        current_app.logger.error(f"Error generating taxonomy facets: {str(e)}")
         return {"primary_categories": [], "subcategories": []}
 
 
@@ -597,7 +546,7 @@ def recover_pending():
 def recover_document(document_id):
     """Trigger reprocessing of a stuck document"""
     try:
-        document = Document.query.get_or_404(document_id)
+        document = build_document_query("status_only").get_or_404(document_id)
         current_app.logger.info(
             f"Attempting to recover document {document_id}: {document.filename}"
         )
@@ -681,7 +630,7 @@ def recover_document(document_id):
 def recovery_status(document_id):
     """Get current status of a document"""
     try:
-        document = Document.query.get_or_404(document_id)
+        document = build_document_query("status_only").get_or_404(document_id)
 
         # Add more detailed information
         processing_time = None
@@ -762,8 +711,7 @@ def cache_stats():
 @main_routes.route("/api/preview-status/<path:filename>")
 def preview_status(filename):
     """Check if a preview is available in cache"""
-    cache_key = f"preview:{filename}"
-    preview_data = cache.get(cache_key)
+    preview_data = cache.get(preview_cache_key(filename))
 
     if preview_data:
         return jsonify({"status": "available", "preview_url": preview_data})
@@ -947,7 +895,7 @@ def generate_missing_scorecards():
 
         # Find documents that don't have scorecards
         documents_without_scorecards = (
-            db.session.query(Document)
+            build_document_query("status_only")
             .filter(
                 Document.status == "COMPLETED",
                 ~Document.id.in_(db.session.query(DocumentScorecard.document_id)),
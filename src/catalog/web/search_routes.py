@@ -1,28 +1,57 @@
-from src.catalog.utils.query_builders import (
-    build_document_with_relationships_query,
-    filter_by_document_type,
-    filter_by_year,
-    filter_by_location,
-    filter_by_taxonomy,
-    apply_sorting,
-    apply_pagination,
-)
 from flask import Blueprint, render_template, request, jsonify, current_app
 from src.catalog.services.search_service import SearchService
-from src.catalog import cache, db
-from src.catalog.constants import CACHE_TIMEOUTS
+from src.catalog import cache, csrf, db
+from src.catalog.constants import BATCH_SEARCH_SETTINGS, CACHE_TIMEOUTS, SEARCH_TYPES, TAXONOMY_INDEX_SETTINGS
 from src.catalog.utils import monitor_query
-from src.catalog.models import Document
+from src.catalog.utils.cache_keys import search_page_cache_key
+from src.catalog.utils.cursors import InvalidCursorError
+from src.catalog.utils.search_profiler import SearchProfile, explain_statements
 import time
-from src.catalog.models import LLMAnalysis, LLMKeyword, KeywordTaxonomy
 
 search_routes = Blueprint("search_routes", __name__)
 search_service = SearchService()
 
 
+def _search_debug_enabled():
+    """Stage timings and query plans are only exposed when enabled in config"""
+    return current_app.debug or current_app.config.get("SEARCH_DEBUG_ENABLED", False)
+
+
+def _debug_requested():
+    """True for ?debug=true requests, which bypass the view cache"""
+    return (
+        request.args.get("debug", "false").lower() == "true"
+        and _search_debug_enabled()
+    )
+
+
+def _search_params():
+    """Search service arguments from the request query string"""
+    return {
+        "page": request.args.get("page", 1, type=int),
+        "per_page": request.args.get("per_page", 12, type=int),
+        "sort_by": request.args.get("sort_by", "upload_date"),
+        "sort_dir": request.args.get("sort_dir", "desc"),
+        "filter_type": request.args.get("filter_type", ""),
+        "filter_year": request.args.get("filter_year", ""),
+        "filter_location": request.args.get("filter_location", ""),
+        "primary_category": request.args.get("primary_category", ""),
+        "subcategory": request.args.get("subcategory", ""),
+        "specific_term": request.args.get("specific_term", ""),
+        "search_type": request.args.get("search_type", SEARCH_TYPES["HYBRID"]),
+        # Infinite scroll pages with opaque cursors; the exact total is opt-in
+        "cursor": request.args.get("cursor"),
+        "include_total": request.args.get("include_total", "false").lower() == "true",
+    }
+
+
 @search_routes.route("/")
 @monitor_query
-@cache.cached(timeout=CACHE_TIMEOUTS["SEARCH"], query_string=True)
+@cache.cached(
+    timeout=CACHE_TIMEOUTS["SEARCH"],
+    make_cache_key=search_page_cache_key,
+    unless=_debug_requested,
+)
 def search_documents():
     """Search documents with multiple strategies and filters"""
     start_time = time.time()
@@ -30,126 +59,33 @@ def search_documents():
     try:
         # Extract all parameters from the request
         query = request.args.get("q", "")
-        page = request.args.get("page", 1, type=int)
-        per_page = request.args.get("per_page", 12, type=int)
-        sort_by = request.args.get("sort_by", "upload_date")
-        sort_direction = request.args.get("sort_dir", "desc")
-        filter_type = request.args.get("filter_type", "")
-        filter_year = request.args.get("filter_year", "")
-        filter_location = request.args.get("filter_location", "")
-        primary_category = request.args.get("primary_category", "")
-        subcategory = request.args.get("subcategory", "")
-        specific_term = request.args.get("specific_term", "")
-
-        # Default values
-        expanded_query = None
-        taxonomy_facets = {"primary_categories": [], "subcategories": [], "terms": []}
-
-        # Step 1: Get document IDs matching the search query
-        document_ids = []
-
-        if query:
-            # Use the search service to get document IDs
-            # This part stays in the search service since it's specific to search
-            expanded_query = search_service.expand_query(query)
-
-            if isinstance(expanded_query, set):
-                expanded_query_list = list(expanded_query)
-            else:
-                expanded_query_list = [expanded_query]
-
-            # Based on search strategy, get matching document IDs
-            document_ids = search_service.search_document_ids(query, expanded_query)
-
-        # Step 2: Build base query for documents with relationships
-        if query and document_ids:
-            # Filter by document IDs from search results
-            base_query = build_document_with_relationships_query().filter(
-                Document.id.in_(document_ids)
-            )
+        params = _search_params()
+        sort_by = params["sort_by"]
+        sort_direction = params["sort_dir"]
+        filter_type = params["filter_type"]
+        filter_year = params["filter_year"]
+        filter_location = params["filter_location"]
+        primary_category = params["primary_category"]
+        subcategory = params["subcategory"]
+        specific_term = params["specific_term"]
+
+        # Per-stage timings for ?debug=true, returned with the JSON response
+        profile = SearchProfile() if _debug_requested() else None
+
+        # The service matches, filters, sorts and pages in the database, so
+        # matching document IDs are never pulled into Python
+        (
+            formatted_documents,
+            pagination,
+            taxonomy_facets,
+            expanded_query,
+            _,
+        ) = search_service.search(query, profile=profile, **params)
+
+        if isinstance(expanded_query, set):
+            expanded_query_list = list(expanded_query)
         else:
-            # No search query, get all documents
-            base_query = build_document_with_relationships_query()
-
-        # Step 3: Apply filters
-        if filter_type:
-            base_query = filter_by_document_type(base_query, filter_type)
-
-        if filter_year:
-            base_query = filter_by_year(base_query, filter_year)
-
-        if filter_location:
-            base_query = filter_by_location(base_query, filter_location)
-
-        # Handle taxonomy filtering with proper variable initialization
-        if primary_category:
-            try:
-                # Create the taxonomy query to get matching document IDs
-                taxonomy_query = (
-                    db.session.query(LLMAnalysis.document_id)
-                    .join(LLMKeyword, LLMKeyword.llm_analysis_id == LLMAnalysis.id)
-                    .join(KeywordTaxonomy, LLMKeyword.taxonomy_id == KeywordTaxonomy.id)
-                    .filter(KeywordTaxonomy.primary_category == primary_category)
-                )
-
-                # Apply subcategory filter if present
-                if subcategory:
-                    taxonomy_query = taxonomy_query.filter(
-                        KeywordTaxonomy.subcategory == subcategory
-                    )
-
-                # Apply specific term filter if present
-                if specific_term:
-                    taxonomy_query = taxonomy_query.filter(
-                        KeywordTaxonomy.term == specific_term
-                    )
-
-                # Use the taxonomy query to filter document IDs
-                taxonomy_ids = taxonomy_query.distinct().subquery()
-                base_query = base_query.filter(Document.id.in_(taxonomy_ids))
-
-            except Exception as e:
-                current_app.logger.error(f"Error applying taxonomy filter: {str(e)}")
-                # If there's an error, try using the filter_by_taxonomy function as fallback
-                base_query = filter_by_taxonomy(
-                    base_query,
-                    primary_category=primary_category,
-                    subcategory=subcategory,
-                    specific_term=specific_term,
-                )
-
-        # Step 4: Apply sorting and pagination
-        sorted_query = apply_sorting(base_query, sort_by, sort_direction)
-
-        # Get total count and apply pagination
-        paginated_query, pagination = apply_pagination(sorted_query, page, per_page)
-
-        # Step 5: Get documents
-        documents = paginated_query.all()
-
-        # Step 6: Format documents for display
-        document_ids = [doc.id for doc in documents]
-
-        if document_ids:
-            # Get hierarchical keywords for all documents
-            all_keywords = search_service.get_document_hierarchical_keywords_bulk(
-                document_ids
-            )
-
-            # Format documents for display
-            formatted_documents = search_service._format_documents_for_display(
-                documents, all_keywords
-            )
-
-            # Queue missing previews for generation
-            search_service._queue_missing_previews([doc.filename for doc in documents])
-        else:
-            formatted_documents = []
-
-        # Step 7: Generate taxonomy facets for filtering
-        taxonomy_facets = search_service.generate_taxonomy_facets(
-            primary_category, subcategory, specific_term
-        )
+            expanded_query_list = [expanded_query]
 
         # Calculate response time
         response_time = (time.time() - start_time) * 1000
@@ -157,20 +93,21 @@ def search_documents():
         # Check for AJAX request
         if request.headers.get("X-Requested-With") == "XMLHttpRequest":
             # Return JSON for AJAX requests
-            return jsonify(
-                {
-                    "results": formatted_documents,
-                    "pagination": pagination,
-                    "taxonomy_facets": taxonomy_facets,
-                    "expanded_terms": (
-                        expanded_query_list
-                        if isinstance(expanded_query, set)
-                        else expanded_query
-                    ),
-                    "response_time_ms": round(response_time, 2),
-                    "query": query,
-                }
-            )
+            response = {
+                "results": formatted_documents,
+                "pagination": pagination,
+                "taxonomy_facets": taxonomy_facets,
+                "expanded_terms": (
+                    expanded_query_list
+                    if isinstance(expanded_query, set)
+                    else expanded_query
+                ),
+                "response_time_ms": round(response_time, 2),
+                "query": query,
+            }
+            if profile is not None:
+                response["debug"] = profile.to_dict()
+            return jsonify(response)
         else:
             # Return HTML for browser requests
             return render_template(
@@ -193,6 +130,25 @@ def search_documents():
                 response_time_ms=round(response_time, 2),
             )
 
+    except InvalidCursorError as e:
+        # A bad cursor is a client error; restarting at page 1 would make
+        # infinite scroll append results it already shows
+        if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+            return jsonify({"error": str(e), "results": [], "pagination": None}), 400
+        return render_template(
+            "pages/search.html",
+            documents=[],
+            query=request.args.get("q", ""),
+            error=str(e),
+            taxonomy_facets={
+                "primary_categories": [],
+                "subcategories": [],
+                "terms": [],
+            },
+            expanded_terms=[],
+            response_time_ms=round((time.time() - start_time) * 1000, 2),
+        ), 400
+
     except Exception as e:
         current_app.logger.error(f"Search error: {str(e)}", exc_info=True)
 
@@ -224,17 +180,108 @@ def search_documents():
             )
 
 
+@search_routes.route("/batch", methods=["POST"])
+@csrf.exempt
+def batch_search():
+    """
+    Run many searches in one request, for reporting jobs
+
+    Body: {"queries": [{"id": ..., "q": ..., "search_type": ..., "page": ...,
+    "per_page": ..., filters...}, ...], "include_facets": false}. Results are
+    relevance-ranked pages returned in request order.
+    """
+    start_time = time.time()
+
+    try:
+        data = request.get_json(silent=True) or {}
+        queries = data.get("queries")
+        if not isinstance(queries, list) or not queries:
+            return jsonify({"error": "queries must be a non-empty list"}), 400
+        if len(queries) > BATCH_SEARCH_SETTINGS["MAX_QUERIES"]:
+            return jsonify(
+                {"error": f"At most {BATCH_SEARCH_SETTINGS['MAX_QUERIES']} queries per batch"}
+            ), 400
+        if not all(isinstance(item, dict) for item in queries):
+            return jsonify({"error": "Each query must be an object"}), 400
+
+        results = search_service.search_batch(
+            queries, include_facets=bool(data.get("include_facets", False))
+        )
+
+        return jsonify(
+            {
+                "results": results,
+                "count": len(results),
+                "response_time_ms": round((time.time() - start_time) * 1000, 2),
+            }
+        )
+    except Exception as e:
+        current_app.logger.error(f"Batch search error: {str(e)}", exc_info=True)
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+
+@search_routes.route("/explain")
+def explain_search():
+    """
+    Run a search with the same parameters as the search view and return the
+    time spent in each stage, the SQL each stage issued and its EXPLAIN
+    ANALYZE plan. Never cached; only available when search debugging is
+    enabled.
+    """
+    if not _search_debug_enabled():
+        return jsonify({"error": "Search debugging is disabled"}), 404
+
+    try:
+        query = request.args.get("q", "")
+        profile = SearchProfile(capture_sql=True)
+        results, pagination, _, expanded_query, _ = search_service.search(
+            query, profile=profile, **_search_params()
+        )
+
+        # Plans come from re-running each captured read, after the timed run
+        explain_statements(profile, db.session.connection())
+        db.session.rollback()
+
+        return jsonify(
+            {
+                "query": query,
+                "expanded_terms": (
+                    sorted(expanded_query)
+                    if isinstance(expanded_query, set)
+                    else expanded_query
+                ),
+                "result_count": len(results),
+                "total": pagination.get("total") if pagination else None,
+                "profile": profile.to_dict(include_sql=True),
+            }
+        )
+    except InvalidCursorError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Search explain error: {str(e)}", exc_info=True)
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+
 @search_routes.route("/api/taxonomy/suggestions")
 def taxonomy_suggestions():
     """API endpoint for taxonomy term suggestions/autocomplete"""
     try:
-        query = request.args.get("q", "")
+        query = request.args.get("q", "").strip()
         if not query or len(query) < 2:
             return jsonify([])
 
-        # Use search service to get taxonomy suggestions
+        # Served from the in-process taxonomy index; no database round trip
         suggestions = search_service.get_taxonomy_suggestions(query)
-        return jsonify(suggestions)
+
+        # Let browsers and proxies reuse the response, then revalidate it
+        # with the ETag (304 when the suggestions haven't changed)
+        response = jsonify(suggestions)
+        response.cache_control.public = True
+        response.cache_control.max_age = TAXONOMY_INDEX_SETTINGS["SUGGESTION_MAX_AGE"]
+        response.add_etag()
+        return response.make_conditional(request)
     except Exception as e:
         current_app.logger.error(f"Error getting taxonomy suggestions: {str(e)}")
         return jsonify([])
@@ -82,9 +82,27 @@ def init_storage_async():
         logger.error(traceback.format_exc())
 
 
+# Function to warm the in-process vector index in background
+def init_vector_index_async():
+    """Load document embeddings into the in-process vector index."""
+    try:
+        time.sleep(2)  # Let the main application start first
+
+        with app.app_context():
+            from src.catalog.services.vector_index import document_vector_index
+
+            document_vector_index.load()
+    except Exception as e:
+        logger.error(f"Error warming vector index: {str(e)}")
+        logger.error(traceback.format_exc())
+
+
 # Start storage initialization in background thread
 threading.Thread(target=init_storage_async, daemon=True).start()
 
+# Load the vector index in background so the first search doesn't pay for it
+threading.Thread(target=init_vector_index_async, daemon=True).start()
+
 if __name__ == "__main__":
     # Print environment variables for debugging (excluding secrets)
     print("Environment:")
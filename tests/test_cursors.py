@@ -0,0 +1,73 @@
+# tests/test_cursors.py
+"""Tests for signed search cursors; needs only a Flask app for SECRET_KEY"""
+
+from datetime import datetime
+
+import pytest
+from flask import Flask
+
+from src.catalog.utils.cursors import (InvalidCursorError, decode_cursor, encode_cursor,
+                                       search_fingerprint)
+
+
+@pytest.fixture(autouse=True)
+def app_context():
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test-secret'
+    with app.app_context():
+        yield
+
+
+@pytest.fixture
+def fingerprint():
+    return search_fingerprint(query='health', sort_by='upload_date', sort_direction='desc')
+
+
+def test_round_trip(fingerprint):
+    for value in ['flyer.pdf', 0.4375, None]:
+        token = encode_cursor(value, 42, fingerprint)
+        assert decode_cursor(token, fingerprint) == {'value': value, 'id': 42}
+
+
+def test_datetimes_survive_the_round_trip(fingerprint):
+    uploaded = datetime(2024, 10, 17, 9, 30, 15, 250)
+    token = encode_cursor(uploaded, 7, fingerprint)
+    assert decode_cursor(token, fingerprint) == {'value': uploaded, 'id': 7}
+
+
+def test_empty_token_is_the_first_page(fingerprint):
+    assert decode_cursor(None, fingerprint) is None
+    assert decode_cursor('', fingerprint) is None
+
+
+def test_tampered_token_is_rejected(fingerprint):
+    token = encode_cursor('flyer.pdf', 42, fingerprint)
+    payload, signature = token.rsplit('.', 1)
+    forged = encode_cursor('flyer.pdf', 43, fingerprint).rsplit('.', 1)[0]
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(f"{forged}.{signature}", fingerprint)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(f"{payload}.{signature[:-2]}xx", fingerprint)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor('not-a-cursor', fingerprint)
+
+
+def test_cursor_from_another_search_is_rejected(fingerprint):
+    token = encode_cursor('flyer.pdf', 42, fingerprint)
+    other = search_fingerprint(query='health', sort_by='filename', sort_direction='desc')
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, other)
+
+
+def test_cursor_signed_with_another_key_is_rejected(fingerprint):
+    other_app = Flask(__name__)
+    other_app.config['SECRET_KEY'] = 'other-secret'
+    with other_app.app_context():
+        token = encode_cursor('flyer.pdf', 42, fingerprint)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, fingerprint)
+
+
+def test_fingerprint_ignores_parameter_order():
+    assert search_fingerprint(a=1, b='x') == search_fingerprint(b='x', a=1)
+    assert search_fingerprint(a=1, b='x') != search_fingerprint(a=2, b='x')
@@ -0,0 +1,93 @@
+# tests/test_embedding_cache.py
+"""Tests for the query embedding cache with the Redis tier switched off"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.catalog.services.embedding_cache import QueryEmbeddingCache
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = QueryEmbeddingCache(max_entries=2, ttl=60, key_prefix='test:')
+    monkeypatch.setattr(cache, '_get_redis', lambda: None)
+    return cache
+
+
+def test_equivalent_queries_share_a_key(cache):
+    assert cache.make_key('  Senior  Health ', 'm') == cache.make_key('senior health', 'm')
+    assert cache.make_key('senior health', 'm') != cache.make_key('senior health', 'other')
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    cache.set('a', [1.0])
+    cache.set('b', [2.0])
+    cache.get('a')
+    cache.set('c', [3.0])
+    assert cache.get('a') == [1.0]
+    assert cache.get('b') is None
+
+
+def test_computed_embedding_is_reused(cache):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return [0.5]
+
+    async def run():
+        first = await cache.get_or_compute('health care', 'm', compute)
+        second = await cache.get_or_compute('Health  care', 'm', compute)
+        return first, second
+
+    assert asyncio.run(run()) == ([0.5], [0.5])
+    assert len(calls) == 1
+    assert cache.stats['misses'] == 1
+
+
+def test_concurrent_requests_from_threads_share_one_call(cache):
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    async def compute():
+        calls.append(1)
+        started.set()
+        await asyncio.get_running_loop().run_in_executor(None, release.wait)
+        return [0.25]
+
+    results = []
+
+    def request():
+        results.append(asyncio.run(cache.get_or_compute('tax', 'm', compute)))
+
+    leader = threading.Thread(target=request)
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=request) for _ in range(3)]
+    for follower in followers:
+        follower.start()
+    deadline = time.monotonic() + 5
+    while cache.stats['coalesced'] < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert results == [[0.25]] * 4
+    assert len(calls) == 1
+
+
+def test_failed_computation_is_not_cached(cache):
+    async def fail():
+        raise RuntimeError('upstream error')
+
+    async def compute():
+        return [1.0]
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_compute('tax', 'm', fail))
+    assert asyncio.run(cache.get_or_compute('tax', 'm', compute)) == [1.0]
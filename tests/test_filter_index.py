@@ -0,0 +1,89 @@
+# tests/test_filter_index.py
+"""Tests for the filter index bitmaps; pure NumPy, no database"""
+
+import numpy as np
+
+from src.catalog.services.filter_index import (Bitmap, ordinals_to_words, popcount,
+                                               words_for, words_to_ordinals)
+
+
+def members(bitmap):
+    if bitmap.words is not None:
+        return set(words_to_ordinals(bitmap.words).tolist())
+    return set(bitmap.ordinals.tolist())
+
+
+def test_words_and_ordinals_round_trip():
+    ordinals = np.array([0, 1, 63, 64, 65, 200], dtype=np.int64)
+    words = ordinals_to_words(ordinals, words_for(201))
+    assert len(words) == 4
+    assert popcount(words) == 6
+    assert words_to_ordinals(words).tolist() == ordinals.tolist()
+
+
+def test_few_spread_out_members_stay_sparse():
+    bitmap = Bitmap([5, 1000, 5, 70000])
+    assert bitmap.words is None
+    assert bitmap.count == 3
+    assert members(bitmap) == {5, 1000, 70000}
+
+
+def test_many_close_members_are_stored_dense():
+    bitmap = Bitmap(range(0, 640, 2))
+    assert bitmap.ordinals is None
+    assert bitmap.count == 320
+    assert members(bitmap) == set(range(0, 640, 2))
+
+
+def test_sparse_add_and_discard():
+    bitmap = Bitmap([1000, 2000])
+    bitmap.add(1500)
+    bitmap.add(1500)
+    bitmap.discard(2000)
+    bitmap.discard(99)
+    assert bitmap.words is None
+    assert bitmap.count == 2
+    assert members(bitmap) == {1000, 1500}
+
+
+def test_filling_in_switches_to_dense_and_back():
+    bitmap = Bitmap([1000])
+    for ordinal in range(0, 1000, 3):
+        bitmap.add(ordinal)
+    assert bitmap.ordinals is None
+    assert bitmap.count == 335
+
+    # Adding past the end grows the words
+    bitmap.add(5000)
+    assert bitmap.count == 336
+    assert 5000 in members(bitmap)
+
+    for ordinal in range(0, 1000, 3):
+        bitmap.discard(ordinal)
+    assert bitmap.words is None
+    assert members(bitmap) == {1000, 5000}
+    assert bitmap.count == 2
+
+
+def test_dense_add_and_discard_keep_the_count():
+    bitmap = Bitmap(range(128))
+    bitmap.add(5)
+    bitmap.discard(5)
+    bitmap.discard(5)
+    assert bitmap.count == 127
+    assert members(bitmap) == set(range(128)) - {5}
+
+
+def test_count_in_matches_set_intersection():
+    selection = set(range(0, 500, 7))
+    words = ordinals_to_words(np.array(sorted(selection), dtype=np.int64), words_for(500))
+    for ordinals in [[], [3, 7, 14, 15, 496], range(0, 400, 2), [7, 10000]]:
+        bitmap = Bitmap(ordinals)
+        assert bitmap.count_in(words) == len(selection & set(ordinals))
+
+
+def test_or_into_sets_members_within_the_words():
+    words = np.zeros(words_for(256), dtype=np.uint64)
+    Bitmap([1, 300]).or_into(words)
+    Bitmap(range(64, 192)).or_into(words)
+    assert words_to_ordinals(words).tolist() == [1] + list(range(64, 192))
@@ -0,0 +1,51 @@
+# tests/test_llm_service.py
+"""Tests for fused-call grouping; no API calls"""
+
+import pytest
+
+from src.catalog.constants import LLM_ANALYSIS_SETTINGS, MODEL_SETTINGS
+from src.catalog.services.llm_service import LLMService
+
+ALL_COMPONENTS = ["metadata", "classification", "entities", "text",
+                  "design", "keywords", "communication"]
+
+
+@pytest.fixture
+def llm_service(monkeypatch):
+    monkeypatch.setenv("CLAUDE_API_KEY", "test-key")
+    monkeypatch.delenv("CLAUDE_MODEL", raising=False)
+    return LLMService()
+
+
+def test_default_config_has_usable_fused_groups(llm_service):
+    assert llm_service.model == MODEL_SETTINGS['CLAUDE']['MODEL']
+    groups = llm_service._fused_groups(ALL_COMPONENTS)
+    assert groups
+    for group in groups:
+        assert llm_service._fused_max_tokens(group) <= llm_service._output_token_limit()
+
+
+def test_default_fused_groups_need_fewer_calls_than_components(llm_service):
+    groups = llm_service._fused_groups(ALL_COMPONENTS)
+    grouped = [c for group in groups for c in group]
+    assert len(grouped) == len(set(grouped))
+    assert len(groups) + len(set(ALL_COMPONENTS) - set(grouped)) < len(ALL_COMPONENTS)
+
+
+def test_group_too_large_for_the_model_runs_modular(llm_service, monkeypatch):
+    monkeypatch.setitem(LLM_ANALYSIS_SETTINGS, 'FUSED_GROUPS', [ALL_COMPONENTS])
+    assert llm_service._fused_groups(ALL_COMPONENTS) == []
+
+    llm_service.model = 'claude-3-5-sonnet-20241022'
+    assert llm_service._fused_groups(ALL_COMPONENTS) == [ALL_COMPONENTS]
+
+
+def test_single_member_groups_are_not_fused(llm_service):
+    assert llm_service._fused_groups(["metadata", "design"]) == []
+
+
+def test_output_limit_by_model_prefix(llm_service):
+    llm_service.model = 'claude-3-5-haiku-20241022'
+    assert llm_service._output_token_limit() == 8192
+    llm_service.model = 'unknown-model'
+    assert llm_service._output_token_limit() == MODEL_SETTINGS['CLAUDE']['MAX_TOKENS']
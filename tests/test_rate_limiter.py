@@ -0,0 +1,80 @@
+# tests/test_rate_limiter.py
+"""Tests for the API rate limiter's per-process buckets, with Redis switched off"""
+
+import pytest
+
+from src.catalog.services.rate_limiter import APIRateLimiter
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setenv('OPENAI_REQUESTS_PER_MINUTE', '10')
+    monkeypatch.setenv('OPENAI_TOKENS_PER_MINUTE', '1000')
+    limiter = APIRateLimiter(key_prefix='test:', max_wait=1)
+    monkeypatch.setattr(limiter, '_get_redis', lambda: None)
+    return limiter
+
+
+def test_background_calls_leave_the_priority_reserve(limiter):
+    # 20% of 10 requests per minute is held back for priority calls
+    granted = 0
+    while limiter.try_acquire('OPENAI')[0]:
+        granted += 1
+    assert granted == 8
+
+    assert limiter.try_acquire('OPENAI', priority=True)[0]
+    assert limiter.try_acquire('OPENAI', priority=True)[0]
+    assert not limiter.try_acquire('OPENAI', priority=True)[0]
+
+
+def test_priority_query_is_granted_while_backfill_waits(limiter):
+    for _ in range(8):
+        assert limiter.acquire('OPENAI', max_wait=0)
+    assert not limiter.acquire('OPENAI', max_wait=0)
+    assert limiter.acquire('OPENAI', max_wait=0, priority=True)
+
+
+def test_token_reserve_applies_to_large_background_calls(limiter):
+    granted, wait = limiter.try_acquire('OPENAI', tokens=750)
+    assert granted
+    granted, wait = limiter.try_acquire('OPENAI', tokens=100)
+    assert not granted and wait > 0
+    assert limiter.try_acquire('OPENAI', tokens=100, priority=True)[0]
+
+
+def test_calls_are_granted_until_the_bucket_is_empty(limiter):
+    for _ in range(8):
+        granted, wait = limiter.try_acquire('OPENAI')
+        assert granted and wait == 0
+    granted, wait = limiter.try_acquire('OPENAI')
+    # One request refills every six seconds at ten per minute
+    assert not granted and 0 < wait <= 6
+
+
+def test_acquire_gives_up_without_sleeping_past_max_wait(limiter, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr('src.catalog.services.rate_limiter.time.sleep', sleeps.append)
+    for _ in range(8):
+        assert limiter.acquire('OPENAI')
+    assert not limiter.acquire('OPENAI')
+    assert sleeps == []
+    assert limiter.stats['timeouts'] == 1
+
+
+def test_acquire_sleeps_until_capacity_refills(limiter, monkeypatch):
+    monkeypatch.setenv('OPENAI_REQUESTS_PER_MINUTE', '6000')
+    limiter.max_wait = 5
+    while limiter.try_acquire('OPENAI')[0]:
+        pass
+    assert limiter.acquire('OPENAI')
+    assert limiter.stats['waited'] == 1
+
+
+def test_hold_blocks_every_call_and_adjust_returns_tokens(limiter):
+    assert limiter.try_acquire('OPENAI', tokens=600)[0]
+    limiter.adjust('OPENAI', -500)
+    assert limiter.headroom('OPENAI')['tokens'] >= 899
+
+    limiter.hold('OPENAI', 30)
+    granted, wait = limiter.try_acquire('OPENAI', priority=True)
+    assert not granted and 29 < wait <= 30
@@ -0,0 +1,79 @@
+# tests/test_tsquery.py
+"""Tests for the tsquery compiler; plain string handling, no database"""
+
+from src.catalog.utils.tsquery import compile_tsquery, quote_lexeme, tokenize
+
+
+def test_single_word_is_prefix_matched():
+    assert compile_tsquery('health') == "'health':*"
+
+
+def test_query_words_are_all_required():
+    assert compile_tsquery('senior health') == "('senior' & 'health':*)"
+
+
+def test_short_last_word_is_not_prefix_matched():
+    assert compile_tsquery('tax on') == "('tax' & 'on')"
+
+
+def test_expanded_terms_are_alternatives_and_phrases():
+    assert compile_tsquery('senior health', {'medicare', 'social security'}) == (
+        "('senior' & 'health':*) | 'medicare' | ('social' <-> 'security')")
+
+
+def test_tsquery_operators_in_input_are_dropped():
+    assert compile_tsquery("health & !tax | (care) <-> x:* 'a'") == (
+        "('health' & 'tax' & 'care' & 'x' & 'a')")
+    assert compile_tsquery('a:*b<2>c') == "('a' & 'b' & '2' & 'c')"
+
+
+def test_quotes_and_apostrophes():
+    assert compile_tsquery('"school board"') == "('school' & 'board':*)"
+    assert compile_tsquery("O'Brien's") == "('o' & 'brien' & 's')"
+    assert compile_tsquery('', {"o'brien"}) == "('o' <-> 'brien')"
+
+
+def test_quote_lexeme_escapes_quotes_and_backslashes():
+    assert quote_lexeme("o'brien") == "'o''brien'"
+    assert quote_lexeme('back\\slash') == "'back\\\\slash'"
+    assert quote_lexeme('care', prefix=True) == "'care':*"
+
+
+def test_empty_input():
+    assert compile_tsquery('') == ''
+    assert compile_tsquery(None) == ''
+    assert compile_tsquery('   ') == ''
+    assert compile_tsquery('&|!():*<->') == ''
+    assert compile_tsquery('', set()) == ''
+    assert compile_tsquery('', {'', '!!'}) == ''
+    assert tokenize('') == []
+
+
+def test_expansion_only():
+    assert compile_tsquery('', {'medicare'}) == "'medicare'"
+
+
+def test_duplicate_terms_compile_once():
+    assert compile_tsquery('medicare', {'Medicare', 'medicare!'}) == "'medicare':*"
+
+
+def test_max_terms_caps_all_alternatives():
+    terms = {f'term{i:02d}' for i in range(10)}
+    compiled = compile_tsquery('health', terms, max_terms=3)
+    assert compiled.split(' | ') == ["'health':*", "'term00'", "'term01'"]
+
+
+def test_query_is_kept_when_the_cap_is_reached():
+    assert compile_tsquery('health', {'care'}, max_terms=1) == "'health':*"
+
+
+def test_terms_sharing_query_words_survive_the_cap():
+    terms = {'aardvark', 'abacus', 'senior housing', 'health care'}
+    compiled = compile_tsquery('senior health', terms, max_terms=3)
+    assert compiled == (
+        "('senior' & 'health':*) | ('health' <-> 'care') | ('senior' <-> 'housing')")
+
+
+def test_compiled_text_is_deterministic():
+    terms = ['medicare', 'social security', 'medicaid']
+    assert compile_tsquery('health', terms) == compile_tsquery('health', list(reversed(terms)))